@@ -7,6 +7,7 @@ from ports.account_port import AccountPort
 from schemas.models import AccountResponse, UserInfoData
 from infra.db.orm.models import User, UserInfo
 from infra.db.storage import repo
+from infra.db.storage import profile_repo
 from infra.security import hash_password, verify_password, decrypt_token, TokenInvalidError
 from config.logger import get_logger
 from config.settings import security
@@ -223,6 +224,8 @@ class AccountAdapter(AccountPort):
                         setattr(info, field, value)
 
             updated_info = await repo.save_user_info(user_info=info, db=self.db)
+            # 나이 등이 바뀌면 분석 기준값 다시 계산
+            await profile_repo.mark_profile_stale(db=self.db, user_id=user_id)
 
             return AccountResponse(
                 id=user.id,
@@ -1,20 +1,54 @@
+import base64
 from fastapi import HTTPException
-from typing import List, Tuple
+from typing import Dict, List, Tuple, Set, Optional
 from uuid import UUID
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone, timedelta, date
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ports.training_port import TrainingPort
 from schemas.models import (ActivityData, 
                             LapData, 
-                            StreamData, 
+                            StreamArrays,
                             TrainResponse, 
-                            TrainDetailResponse)
+                            TrainDetailResponse,
+                            SyncStateData,
+                            BackfillStateData,
+                            ZoneTimeData,
+                            ZoneSummaryResponse,
+                            TrainLoadData,
+                            BestEffortData,
+                            PersonalRecordsResponse,
+                            PhysiologyProfileData,
+                            SessionBundle,
+                            TrainSessionPage)
 from infra.db.storage import activity_repo as repo
+from infra.db.storage import sync_state_repo
+from infra.db.storage import train_load_repo
+from infra.db.storage import best_effort_repo
+from infra.db.storage import profile_repo
+from infra.db.storage import repo as user_repo
+from domains.training_load import load_series
+from domains.best_efforts import predict_race_times
+from domains.physiology import build_profile, DEFAULT_MAX_HR
 from config.logger import get_logger
+from config.constants import BEST_EFFORT_DISTANCES, PROFILE_LOOKBACK_DAYS, PROFILE_RECORD_DAYS, SCHEDULE_PAGE_SIZE, SCHEDULE_MAX_PAGE_SIZE
 
 logger = get_logger(__file__)
 
+
+def _encode_cursor(train_date:datetime, session_id:UUID) -> str:
+    """목록 커서 (마지막 세션 날짜, id) -> url-safe 문자열"""
+    raw = f"{train_date.isoformat()}|{session_id.hex}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(cursor:str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        train_date, session_id = raw.split("|")
+        return datetime.fromisoformat(train_date), UUID(session_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
 class TrainingAdapter(TrainingPort):
     def __init__(self, db:AsyncSession):
         self.db = db
@@ -22,43 +56,170 @@ class TrainingAdapter(TrainingPort):
     async def save_session(self, user_id:UUID, 
                      activity:ActivityData,
                      laps:List[LapData],
-                     stream:StreamData
+                     stream:StreamArrays,
+                     zones:Optional[ZoneTimeData] = None,
+                     efforts:Optional[List[BestEffortData]] = None
                      )->bool:
-        """훈련 세션  (TrainSession , Stream, Lap) 저장 
-            같은 훈련은 스킵
+        """훈련 세션  (TrainSession , Stream, Lap, Zone, BestEffort) 저장 
+            같은 훈련은 스킵. 부하가 있으면 일별 부하 갱신
         """
+        saved = await self.save_sessions(user_id=user_id,
+                                         bundles=[SessionBundle(activity=activity,
+                                                                laps=laps,
+                                                                stream=stream,
+                                                                zones=zones,
+                                                                efforts=efforts)])
+        return saved[0]
+        
+    async def save_sessions(self, user_id:UUID, bundles:List[SessionBundle]) -> List[bool]:
+        """여러 세션 한번에 저장 (테이블마다 multi-row insert, 커밋 1번)
+            같은 훈련은 스킵. 부하는 저장된 세션 중 가장 이른 날부터 한번만 갱신
+            return: bundles 순서대로 저장 여부
+        """
+        if not bundles:
+            return []
         try:
-            session = await repo.add_train_session(db=self.db,
-                                   user_id=user_id,
-                                activity=activity)
-            
-            # 이미 db에 저장된 세션.
-            if session is None:
-                return False
+            # 세션/스트림/랩/존/기록/부하를 한 트랜잭션으로
+            session_ids = await repo.add_train_sessions(db=self.db,
+                                                        user_id=user_id,
+                                                        bundles=bundles,
+                                                        commit=False)
+            saved = [session_id is not None for session_id in session_ids]
             
-            await repo.add_train_session_stream(db=self.db,
-                                       session_id=session.id,
-                                       stream=stream)
+            # 전부 이미 db에 저장된 세션.
+            if not any(saved):
+                await self.db.rollback()
+                return saved
             
-            await repo.add_train_session_lap(db=self.db,
-                                             session_id=session.id,
-                                             laps=laps)
+            load_days = [b.activity.start_date.date() for b, ok in zip(bundles, saved)
+                         if ok and b.activity.training_load is not None]
+            if load_days:
+                await self._update_load_series(user_id=user_id,
+                                               day=min(load_days),
+                                               commit=False)
             
-            return True
+            await self.db.commit()
+            return saved
             
         except HTTPException as e:
+            # 중간 실패면 세션만 남지 않도록 전부 취소
+            await self.db.rollback()
             raise
         except Exception as e:
             logger.exception(str(e))
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail="internal server error")
         
         
         
         
+    async def _update_load_series(self, user_id:UUID, day:date, commit:bool = True) -> None:
+        """일별 부하 증분 갱신. day 부터 마지막 훈련일까지만 다시 계산
+            (최근 활동 추가면 보통 하루, 과거 활동 추가면 그 이후 구간)
+            commit: False 면 세션 저장과 같은 트랜잭션
+        """
+        prev = await train_load_repo.get_load_before(db=self.db, user_id=user_id, day=day)
+        # 마지막 저장일과 day 사이 빈 날도 감쇠 반영
+        start = prev.day + timedelta(days=1) if prev else day
+        
+        loads = await train_load_repo.get_daily_session_loads(db=self.db, user_id=user_id, since=start)
+        end = max(loads) if loads else day
+        series = load_series(start=start, end=end, daily_loads=loads,
+                             atl=prev.atl if prev else 0.0,
+                             ctl=prev.ctl if prev else 0.0)
+        await train_load_repo.replace_load_series(db=self.db, user_id=user_id,
+                                                  since=start, series=series, commit=commit)
+        
+        
+    async def get_existing_activity_ids(self, provider:str, activity_ids:List[int]) -> Set[int]:
+        """이미 저장된 활동 id 조회. 중복 다운로드 방지용"""
+        return await repo.get_existing_activity_ids(db=self.db,
+                                                    provider=provider,
+                                                    activity_ids=activity_ids)
+        
+    async def get_sync_state(self, user_id:UUID, provider:str) -> Optional[SyncStateData]:
+        """플랫폼 동기화 상태 (커서) 조회"""
+        state = await sync_state_repo.get_sync_state(db=self.db, user_id=user_id, provider=provider)
+        return SyncStateData.model_validate(state) if state else None
+    
+    async def save_sync_state(self, user_id:UUID, provider:str, **values) -> None:
+        """플랫폼 동기화 상태 저장"""
+        await sync_state_repo.save_sync_state(db=self.db, user_id=user_id, provider=provider, **values)
+        
+    async def get_backfill_state(self, user_id:UUID, provider:str) -> Optional[BackfillStateData]:
+        """전체 기록 가져오기 체크포인트 조회"""
+        state = await sync_state_repo.get_backfill_state(db=self.db, user_id=user_id, provider=provider)
+        return BackfillStateData.model_validate(state) if state else None
+    
+    async def save_backfill_state(self, user_id:UUID, provider:str, **values) -> None:
+        """전체 기록 가져오기 체크포인트 저장"""
+        await sync_state_repo.save_backfill_state(db=self.db, user_id=user_id, provider=provider, **values)
+        
+    async def get_activity_sessions(self, provider:str, activity_ids:List[int]) -> Dict[int, Tuple[UUID, float]]:
+        """activity_id -> (세션 id, 저장한 사용자의 최대심박. 프로필 없으면 기본값). 원본 재분석용"""
+        owners = await repo.get_activity_owners(db=self.db, provider=provider, activity_ids=activity_ids)
+        max_hrs = await profile_repo.get_max_hrs(db=self.db, user_ids=list({u for _, u in owners.values()}))
+        return {activity_id: (session_id, max_hrs.get(user_id, DEFAULT_MAX_HR))
+                for activity_id, (session_id, user_id) in owners.items()}
+        
+    async def get_sessions_for_analysis(self, version:Optional[int], after_id:Optional[UUID],
+                                        limit:int) -> List[Tuple[UUID, float, ActivityData, List[LapData], StreamArrays]]:
+        """재분석 입력 (세션 id, 최대심박, 활동, 랩, 스트림). id 순 keyset 페이지
+            세션/랩/스트림/최대심박 각각 한번씩 조회. 최대심박은 저장된 프로필 값 (없으면 기본값)
+        """
+        sessions = await repo.get_sessions_for_analysis(db=self.db, version=version,
+                                                        after_id=after_id, limit=limit)
+        if not sessions:
+            return []
+        ids = [s.id for s in sessions]
+        laps_by_session = {}
+        for lap in await repo.get_laps_by_sessions(db=self.db, session_ids=ids):
+            laps_by_session.setdefault(lap.session_id, []).append(LapData.model_validate(lap))
+        streams = {row.session_id: row for row in await repo.get_streams_by_sessions(db=self.db, session_ids=ids)}
+        max_hrs = await profile_repo.get_max_hrs(db=self.db, user_ids=list({s.user_id for s in sessions}))
+
+        items = []
+        for session in sessions:
+            laps = laps_by_session.get(session.id, [])
+            row = streams.get(session.id)
+            stream = repo.stream_row_to_arrays(row) if row else None
+            items.append((session.id, max_hrs.get(session.user_id, DEFAULT_MAX_HR),
+                          self._to_activity_data(session, laps), laps, stream))
+        return items
+    
+    def _to_activity_data(self, session, laps:List[LapData]) -> ActivityData:
+        """저장된 세션 -> 분석 입력"""
+        average_hr, max_hr = session.average_heartrate, session.max_heartrate
+        if average_hr is None and max_hr is None:
+            # 심박 컬럼 추가 전에 저장된 세션 -> 랩에서 계산
+            hr_laps = [lap for lap in laps if lap.average_heartrate]
+            hr_time = sum(lap.elapsed_time for lap in hr_laps)
+            average_hr = (sum(lap.average_heartrate * lap.elapsed_time for lap in hr_laps) / hr_time
+                          if hr_time else None)
+            max_hr = max((lap.max_heartrate for lap in laps if lap.max_heartrate), default=None)
+        return ActivityData(
+            activity_id=session.activity_id,
+            provider=session.provider,
+            distance=session.distance,
+            elapsed_time=int(session.total_time or 0),
+            sport_type="Run",  # 러닝만 저장됨
+            start_date=session.train_date,
+            average_speed=session.avg_speed,
+            average_heartrate=average_hr,
+            max_heartrate=max_hr,
+            training_load=session.training_load,
+            gap_speed=session.gap_speed,
+            elevation_gain=session.elevation_gain,
+        )
+    
+    async def update_session_analyses(self, results:List[dict]) -> int:
+        """분석 결과 일괄 업데이트 (세션 id 기준). 재분석용"""
+        return await repo.update_train_session_analysis(db=self.db, results=results)
+        
     def update_session(self, user_id:UUID, 
                      session:ActivityData = None,
                      laps:List[LapData] = None,
-                     stream:StreamData = None)->bool:
+                     stream:StreamArrays = None)->bool:
         """훈련 세션  (TrainSession , Stream, Lap) 업데이트. 수정된 부분만. """
 
         ...
@@ -68,17 +229,20 @@ class TrainingAdapter(TrainingPort):
         ...
         
     async def get_session_detail(self, user_id:UUID, session_id:UUID)->TrainDetailResponse:
-        """훈련 세션 세부 정보 받기 (stream, Lap)"""
+        """훈련 세션 세부 정보 받기 (stream, Lap). 쿼리 2번 (세션+스트림+존 조인, 랩)"""
         try:
-            laps_orm = await repo.get_train_session_laps(user_id=user_id, session_id=session_id, db=self.db)
-            stream_orm = await repo.get_train_session_stream(user_id=user_id, session_id=session_id, db=self.db)
+            stream_orm, zone_orm, laps_orm = await repo.get_train_session_detail(db=self.db,
+                                                                                 user_id=user_id,
+                                                                                 session_id=session_id)
 
             laps = [LapData.model_validate(lap) for lap in laps_orm]
-            stream = StreamData.model_validate(stream_orm) if stream_orm else None
+            stream = repo.stream_row_to_arrays(stream_orm).to_model() if stream_orm else None
+            zones = repo.zone_row_to_data(zone_orm) if zone_orm else None
 
             return TrainDetailResponse(
                 laps=laps,
-                stream=stream
+                stream=stream,
+                zones=zones
             )
         except HTTPException:
             raise
@@ -87,32 +251,144 @@ class TrainingAdapter(TrainingPort):
             raise HTTPException(status_code=500, detail="internal server error")
 
         
-    async def get_sessions_by_date(self, user_id:UUID, start_date:int = None)-> List[TrainResponse]:
-        """기간 내의 훈련 세션 받기"""
+    async def get_sessions_by_date(self, user_id:UUID, start_date:int = None,
+                                   end_date:int = None)-> List[TrainResponse]:
+        """기간 내의 훈련 세션 받기 [start_date, end_date). 기본 최근 14일"""
+        start, end = self._session_range(start_date, end_date)
+        rows = await repo.get_train_session_by_date(db=self.db,
+                                       user_id=user_id,
+                                       start_date=start,
+                                       end_date=end)
+        return [self._to_train_response(row) for row in rows]
+    
+    async def get_session_page(self, user_id:UUID, start_date:int = None, end_date:int = None,
+                               cursor:Optional[str] = None,
+                               limit:int = SCHEDULE_PAGE_SIZE) -> TrainSessionPage:
+        """기간 내 훈련 세션 한 페이지 (날짜, id 순 keyset). cursor 는 이전 페이지의 next_cursor"""
+        start, end = self._session_range(start_date, end_date)
+        limit = min(max(1, limit), SCHEDULE_MAX_PAGE_SIZE)
+        
+        # 한 개 더 읽어서 다음 페이지 여부 확인
+        rows = await repo.get_train_session_by_date(db=self.db,
+                                                    user_id=user_id,
+                                                    start_date=start,
+                                                    end_date=end,
+                                                    after=_decode_cursor(cursor) if cursor else None,
+                                                    limit=limit + 1)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1].train_date, rows[-1].id)
+        return TrainSessionPage(sessions=[self._to_train_response(row) for row in rows],
+                                next_cursor=next_cursor)
+    
+    def _session_range(self, start_date:Optional[int], end_date:Optional[int]) -> Tuple[datetime, Optional[datetime]]:
         if start_date is not None:
-            start_date = datetime.fromtimestamp(start_date, tz=timezone.utc).replace(tzinfo=None)
+            start = datetime.fromtimestamp(start_date, tz=timezone.utc).replace(tzinfo=None)
         else:
             cur = datetime.now(timezone.utc).replace(tzinfo=None)
-            start_date = cur - timedelta(days=14)
-            
-        sessions = await repo.get_train_session_by_date(db=self.db,
-                                       user_id=user_id,
-                                       start_date=start_date)
-        return [
-            TrainResponse(
-                session_id=session.id,
-                train_date=session.train_date,
-                distance=session.distance,
-                avg_speed=session.avg_speed,
-                total_time=session.total_time,
-                activity_title=session.activity_title,
-                analysis_result=session.analysis_result
-            ) for session in sessions
-        ]
+            start = cur - timedelta(days=14)
+        end = (datetime.fromtimestamp(end_date, tz=timezone.utc).replace(tzinfo=None)
+               if end_date is not None else None)
+        return start, end
+    
+    def _to_train_response(self, row) -> TrainResponse:
+        return TrainResponse(
+            session_id=row.id,
+            train_date=row.train_date,
+            distance=row.distance,
+            avg_speed=row.avg_speed,
+            total_time=row.total_time,
+            activity_title=row.activity_title,
+            analysis_result=row.analysis_result,
+            gap_speed=row.gap_speed,
+            elevation_gain=row.elevation_gain
+        )
+        
+        
+    async def get_zone_summary(self, user_id:UUID, start_date:int = None,
+                               end_date:int = None) -> ZoneSummaryResponse:
+        """기간 내 심박/페이스 존별 시간 합계. 기본 최근 14일"""
+        end = (datetime.fromtimestamp(end_date, tz=timezone.utc).replace(tzinfo=None)
+               if end_date is not None else datetime.now(timezone.utc).replace(tzinfo=None))
+        start = (datetime.fromtimestamp(start_date, tz=timezone.utc).replace(tzinfo=None)
+                 if start_date is not None else end - timedelta(days=14))
         
+        totals = await repo.get_zone_totals(db=self.db, user_id=user_id,
+                                            start_date=start, end_date=end)
+        return ZoneSummaryResponse(
+            start_date=start,
+            end_date=end,
+            sessions=totals["sessions"],
+            hr_zones=[totals[c] for c in repo.HR_ZONE_COLUMNS],
+            pace_zones=[totals[c] for c in repo.PACE_ZONE_COLUMNS],
+        )
         
         
+    async def get_load_series(self, user_id:UUID, start_date:int = None,
+                              end_date:int = None) -> List[TrainLoadData]:
+        """기간 내 일별 훈련 부하 [start_date, end_date). 기본 최근 42일
+            마지막 훈련일 이후는 부하 0 으로 감쇠시켜서 채움 (저장 안함)
+        """
+        end = (datetime.fromtimestamp(end_date, tz=timezone.utc).date()
+               if end_date is not None else datetime.now(timezone.utc).date() + timedelta(days=1))
+        start = (datetime.fromtimestamp(start_date, tz=timezone.utc).date()
+                 if start_date is not None else end - timedelta(days=42))
+        
+        rows = await train_load_repo.get_load_series(db=self.db, user_id=user_id,
+                                                     start_day=start, end_day=end)
+        res = [TrainLoadData.model_validate(row) for row in rows]
+        
+        last = await train_load_repo.get_load_before(db=self.db, user_id=user_id, day=end)
+        if last is not None and last.day < end - timedelta(days=1):
+            tail = load_series(start=last.day + timedelta(days=1),
+                               end=end - timedelta(days=1),
+                               daily_loads={}, atl=last.atl, ctl=last.ctl)
+            res += [row for row in tail if row.day >= start]
+        return res
+        
+        
+    async def get_personal_records(self, user_id:UUID, since:int = None) -> PersonalRecordsResponse:
+        """거리별 개인 기록 + Riegel 기록 예측. since 있으면 그 이후 기록만"""
+        if since is not None:
+            since = datetime.fromtimestamp(since, tz=timezone.utc).replace(tzinfo=None)
+        
+        rows = await best_effort_repo.get_personal_records(db=self.db, user_id=user_id, since=since)
+        records = [self._to_effort_data(row) for row in rows]
+        return PersonalRecordsResponse(records=records,
+                                       predictions=predict_race_times(records))
+        
+        
+    def _to_effort_data(self, row) -> BestEffortData:
+        return BestEffortData(distance=row.distance,
+                              name=BEST_EFFORT_DISTANCES.get(row.distance, f"{row.distance}m"),
+                              elapsed_time=row.elapsed_time,
+                              start_offset=row.start_offset,
+                              session_id=row.session_id,
+                              train_date=row.train_date)
+        
+        
+    async def get_physiology_profile(self, user_id:UUID) -> PhysiologyProfileData:
+        """사용자별 분석 기준값
+            캐시가 유효하면 그대로 (쿼리 1번), stale 이면 기록에서 다시 추정 후 저장
+        """
+        row = await profile_repo.get_profile(db=self.db, user_id=user_id)
+        if row is not None and not row.stale:
+            return PhysiologyProfileData.model_validate(row)
+        
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        max_hrs = await profile_repo.get_session_max_hrs(db=self.db, user_id=user_id,
+                                                         since=now - timedelta(days=PROFILE_LOOKBACK_DAYS))
+        records = await best_effort_repo.get_personal_records(db=self.db, user_id=user_id,
+                                                              since=now - timedelta(days=PROFILE_RECORD_DAYS))
+        info = await user_repo.get_user_info(user_id, self.db)
         
+        profile = build_profile(session_max_hrs=max_hrs,
+                                records=[self._to_effort_data(r) for r in records],
+                                age=info.age if info else None)
+        row = await profile_repo.save_profile(db=self.db, user_id=user_id,
+                                              **profile.model_dump(exclude={"updated_at"}))
+        return PhysiologyProfileData.model_validate(row)
         
         
     def delete_session(self, user_id:UUID, session_id:int)->bool:
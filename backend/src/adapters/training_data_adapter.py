@@ -1,21 +1,56 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 import httpx
-import numpy as np
+import asyncio
 from datetime import datetime, timezone, timedelta
 
 
 from ports.training_data_port import TrainingDataPort
-from typing import Optional, List
+from typing import Optional, List, AsyncIterator, Tuple
 from config.settings import strava
+from infra.strava_rate_limiter import StravaRateLimiter, strava_rate_limiter, INTERACTIVE
 from infra.db.storage import third_party_token_repo as repo
 from infra.db.orm.models import ThirdPartyToken
-from schemas.models import LapData, StreamData, ActivityData
+from schemas.models import LapData, StreamArrays, ActivityData
+from infra.strava_codec import decode_activities, decode_laps, decode_stream, split_activities
+from infra.raw_archive import RawArchive, raw_archive
+from infra.executors import executors
+from config.logger import get_logger
+
+logger = get_logger(__file__)
 
 
 class StravaAdapter(TrainingDataPort):
-    def __init__(self, db:AsyncSession):
+    def __init__(self, db:AsyncSession, client:httpx.AsyncClient,
+                 priority:int = INTERACTIVE,
+                 limiter:StravaRateLimiter = strava_rate_limiter,
+                 archive:Optional[RawArchive] = raw_archive):
         self.db = db
+        self.client = client # 앱 공용 클라이언트 (커넥션풀 재사용)
+        self.priority = priority # 사용자 요청 / 백그라운드 작업
+        self.limiter = limiter # 프로세스 공용 호출 스케줄러
+        self.archive = archive # 원본 응답 보관소 (None 이면 보관 안함)
+    
+    async def _request(self, method:str, url:str, user_key:str, **kwargs) -> httpx.Response:
+        """모든 스트라바 호출은 스케줄러를 거침 (호출 한도, 429 재시도)"""
+        return await self.limiter.request(self.client, method, url,
+                                          user_key=user_key,
+                                          priority=self.priority,
+                                          **kwargs)
+    
+    async def _archive_raw(self, items:List[Tuple[int, bytes]], kind:str) -> None:
+        """원본 응답 보관. 파일 io 는 스레드에서"""
+        if self.archive is None or not items:
+            return
+        
+        def _put():
+            for activity_id, raw in items:
+                self.archive.put("strava", activity_id, kind, raw)
+        try:
+            await asyncio.to_thread(_put)
+        except Exception as e:
+            # 보관 실패로 수집을 중단하지 않음
+            logger.exception(str(e))
     
     async def connect(self, auth_code: str) -> dict:
         """플랫폼에 연결. 스트라바 토큰 받기"""
@@ -26,9 +61,7 @@ class StravaAdapter(TrainingDataPort):
             "code": auth_code,
             "grant_type": "authorization_code"
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(strava.token_url, data=payload)
-        
+        response = await self._request("POST", strava.token_url, user_key=auth_code, data=payload)
         response.raise_for_status()
         return response.json()
     
@@ -49,11 +82,10 @@ class StravaAdapter(TrainingDataPort):
         url = strava.deauth_endpoint
         
         # strava 에서 연결 끊기        
-        async with httpx.AsyncClient() as client:
-            try:
-                await client.post(url, headers=headers)
-            except httpx.HTTPError:
-                pass
+        try:
+            await self._request("POST", url, user_key=str(user_id), headers=headers)
+        except httpx.HTTPError:
+            pass
             
         # db 에서 토큰 삭제
         await repo.delete_third_party_token(
@@ -75,14 +107,23 @@ class StravaAdapter(TrainingDataPort):
                         )
     
     async def fetch_activities(self, access_token:str, after_date: int = None) -> List[ActivityData]:
-        """훈련 활동 데이터 가져오기
-            user_id = 사용자 분류
+        """훈련 활동 데이터 가져오기 (모든 페이지)
             after_date = 시작날짜 (timestamp)
             
             return : ActivityData 리스트
         """
-        # get 액세스 토큰
-
+        activities = []
+        async for page in self.iter_activities(access_token=access_token, after_date=after_date):
+            activities.extend(page)
+        return activities
+    
+    async def iter_activities(self, access_token:str, after_date: int = None) -> AsyncIterator[List[ActivityData]]:
+        """훈련 활동 데이터 페이지 단위로 가져오기
+            현재 페이지를 넘겨주는 동안 다음 페이지를 미리 요청.
+            after_date = 시작날짜 (timestamp)
+            
+            yield : 페이지별 ActivityData 리스트
+        """
         # 헤더 
         headers = {"Authorization": f"Bearer {access_token}"}
         
@@ -92,42 +133,46 @@ class StravaAdapter(TrainingDataPort):
         if after_date is None:
             two_weeks_ago = datetime.now(timezone.utc) - timedelta(days=14)
             after_date = int(two_weeks_ago.timestamp())
-            
-        params = {
-            "after": after_date,
-            "per_page": 100   # 최대 200까지 가능
-        }
         
-        # activities
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url=url, headers=headers, params=params)
-            response.raise_for_status()
+        per_page = min(max(1, strava.page_size), 200)   # 최대 200까지 가능
             
-            return self._parse_activity_data(response.json())
-        
-    def _parse_activity_data(self, res:list) -> List[ActivityData]:
-        """액티비티 데이터 포맷 - list > dic """
-        ActivityData_list = [
-            ActivityData(
-                activity_id = activity['id'],
-                provider="strava",
-                distance = activity['distance'],
-                elapsed_time = activity['elapsed_time'],
-                sport_type = activity['sport_type'],
-                start_date = activity['start_date_local'],
-                average_speed = activity['average_speed'],
-                max_speed = activity['max_speed'],
-                average_heartrate = activity['average_heartrate'],
-                max_heartrate = activity['max_heartrate'],
-                average_cadence=activity['average_cadence'] *2
-                ) for activity in res
-        ]
+        async def _get_page(page:int) -> List[ActivityData]:
+            params = {
+                "after": after_date,
+                "page": page,
+                "per_page": per_page
+            }
+            response = await self._request("GET", url, user_key=access_token, headers=headers, params=params)
+            response.raise_for_status()
+            if self.archive is not None:
+                await self._archive_raw(split_activities(response.content), kind="activity")
+            # 큰 페이지 디코딩은 cpu 풀에서
+            return await executors.run_thread(self._parse_activity_data, response.content)
         
-            
-        return ActivityData_list
+        page = 1
+        next_task = asyncio.create_task(_get_page(page))
+        try:
+            while next_task is not None:
+                res = await next_task
+                
+                # 꽉 찬 페이지면 다음 페이지 미리 요청
+                next_task = None
+                if len(res) >= per_page:
+                    page += 1
+                    next_task = asyncio.create_task(_get_page(page))
+                
+                if res:
+                    yield res
+        finally:
+            if next_task is not None and not next_task.done():
+                next_task.cancel()
+        
+    def _parse_activity_data(self, raw:bytes) -> List[ActivityData]:
+        """액티비티 데이터 포맷 - list > dic. 응답 bytes 바로 디코딩"""
+        return decode_activities(raw, provider="strava")
         
     
-    async def fetch_activity_stream(self, access_token:str, activity_id:int) -> StreamData:
+    async def fetch_activity_stream(self, access_token:str, activity_id:int) -> StreamArrays:
 
 
         headers = {"Authorization": f"Bearer {access_token}"}
@@ -138,15 +183,16 @@ class StravaAdapter(TrainingDataPort):
         
         url = strava.api_url + f"activities/{activity_id}/streams"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            
-            # 데이터 파이단틱 모델로 파싱
-            return self._parse_stream_data(response.json())
+        response = await self._request("GET", url, user_key=access_token, headers=headers, params=params)
+        response.raise_for_status()
+        
+        await self._archive_raw([(activity_id, response.content)], kind="streams")
+        
+        # 채널별 배열로 파싱 (디코딩, numpy 변환은 cpu 풀에서)
+        return await executors.run_thread(self._parse_stream_data, response.content)
             
         
-    def _parse_stream_data(self, res:dict) -> StreamData:
+    def _parse_stream_data(self, raw:bytes) -> StreamArrays:
         """스트림 데이터 포맷 - dictionary 
             {
                 watts, cadence, velocity_smooth, time, heartrate, distance, altitude : {
@@ -156,16 +202,9 @@ class StravaAdapter(TrainingDataPort):
                     resolution:"high"
                 }
             }
+            채널별 numpy 배열로 디코딩 (cadence 는 x2)
         """
-        
-        return StreamData(
-                heartrate=res.get('heartrate',{}).get('data'),
-                cadence=(np.array(res.get('cadence',{}).get('data')) * 2).tolist(),
-                distance=res.get('distance',{}).get('data'), 
-                velocity=res.get('velocity_smooth', {}).get('data'),
-                altitude=res.get("altitude", {}).get('data'),
-                time=res.get('time',{}).get('data'),
-            )
+        return decode_stream(raw)
 
         
             
@@ -173,16 +212,17 @@ class StravaAdapter(TrainingDataPort):
         headers = {"Authorization": f"Bearer {access_token}"}
         url = strava.api_url + f"activities/{activity_id}/laps"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            
-            # 데이터 파싱
-            parsed = self._parse_lap_data(response.json())
-            
-            return parsed
+        response = await self._request("GET", url, user_key=access_token, headers=headers)
+        response.raise_for_status()
+        
+        await self._archive_raw([(activity_id, response.content)], kind="laps")
+        
+        # 데이터 파싱
+        parsed = self._parse_lap_data(response.content)
+        
+        return parsed
     
-    def _parse_lap_data(self, res)->List[LapData]:
+    def _parse_lap_data(self, raw:bytes)->List[LapData]:
         """랩데이터 포맷 - [ 각 랩별 dic format]
             [
                 {id, resource_state, elapsed_time, distance, average_speed,
@@ -192,23 +232,7 @@ class StravaAdapter(TrainingDataPort):
                 ...
             ]
         """
-        laps = []
-        for lap in res:
-            laps.append(
-                LapData(
-                    lap_index=lap['lap_index'],
-                    distance = lap['distance'],
-                    elapsed_time=lap['elapsed_time'],
-                    average_speed = lap['average_speed'],
-                    max_speed = lap['max_speed'],
-                    average_heartrate= lap['average_heartrate'],
-                    max_heartrate= lap['max_heartrate'],
-                    average_cadence= lap['average_cadence'] * 2,
-                    elevation_gain= lap['total_elevation_gain'],
-                )
-            )
-            
-        return laps
+        return decode_laps(raw)
         
         
         
@@ -229,10 +253,10 @@ class StravaAdapter(TrainingDataPort):
             "refresh_token": refresh_token
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                                    url=strava.token_url, 
-                                    data=payload)
+        response = await self._request("POST",
+                                       strava.token_url,
+                                       user_key=refresh_token,
+                                       data=payload)
         
         response.raise_for_status()
         return response.json()
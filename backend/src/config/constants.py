@@ -3,4 +3,33 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60
 REFRESH_TOKEN_EXPIRE_DAYS = 30
 
 
-PLATFORM = ['facebook', 'kakao', ]
\ No newline at end of file
+PLATFORM = ['facebook', 'kakao', ]
+
+
+### TRAINING ###
+# 수집/분석 대상 스트라바 sport_type
+SUPPORTED_SPORT_TYPES = ('Run', 'TrailRun', 'VirtualRun', )
+
+# 존 경계 (스트림 존별 시간)
+HR_ZONE_BOUNDS = (0.6, 0.7, 0.8, 0.9)  # 최대심박 비율. z1 < 60% <= z2 < 70% ... <= z5
+PACE_ZONE_BOUNDS = (420, 360, 300, 240)  # 페이스 (sec/km). z1 7'00" 보다 느림 ... z5 4'00" 보다 빠름
+STREAM_MAX_GAP = 30  # 샘플 간격이 이보다 길면 (초) 정지로 보고 시간 합산 안함
+STREAM_RESAMPLE = None  # 스트림 재샘플링. None (원본 간격) / "time" (1초) / "distance" (5m)
+
+# 훈련 부하 (TRIMP, ATL/CTL/TSB)
+REST_HR = 60  # 안정시 심박 기본값
+THRESHOLD_PACE = 300  # 심박 없을 때 페이스 기반 부하 추정용 역치 페이스 (sec/km)
+ATL_DAYS = 7  # 피로 (acute) 시간상수
+CTL_DAYS = 42  # 체력 (chronic) 시간상수
+
+# 최고 기록 구간 (m: 표시 이름)
+BEST_EFFORT_DISTANCES = {400: "400m", 1000: "1k", 5000: "5k", 10000: "10k", 21097: "half"}
+RIEGEL_EXPONENT = 1.06  # 기록 예측 T2 = T1 x (D2/D1)^1.06
+
+# 세션 목록 페이지 크기
+SCHEDULE_PAGE_SIZE = 100
+SCHEDULE_MAX_PAGE_SIZE = 500
+
+# 사용자별 분석 기준값 추정 범위
+PROFILE_LOOKBACK_DAYS = 365  # 최대심박: 최근 1년 세션
+PROFILE_RECORD_DAYS = 180  # 역치 페이스: 최근 6개월 최고 기록
@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, field_validator
 from pathlib import Path
+import socket
 
 ENV_DIR = Path(__file__).resolve().parent.parent
 
@@ -61,6 +62,45 @@ class StravaConfig(CommonConfig):
     api_url: str = Field(default="https://www.strava.com/api/v3/", alias="STRAVA_API_URL")
     auth_endpoint: str = Field(default="https://www.strava.com/oauth/authorize", alias="STRAVA_AUTH_ENDPOINT")
     deauth_endpoint: str = Field(default="https://www.strava.com/oauth/deauthorize", alias="STRAVA_DEAUTH_ENDPOINT")
+    fetch_concurrency: int = Field(default=8, alias="STRAVA_FETCH_CONCURRENCY") # 동시 랩/스트림 요청 수
+    page_size: int = Field(default=100, alias="STRAVA_PAGE_SIZE") # 액티비티 목록 페이지 크기 (최대 200)
+    # 호출 한도 초기값. 실제 값은 응답 헤더로 갱신
+    rate_limit_short: int = Field(default=100, alias="STRAVA_RATE_LIMIT_15MIN")
+    rate_limit_daily: int = Field(default=1000, alias="STRAVA_RATE_LIMIT_DAILY")
+    rate_limit_retries: int = Field(default=3, alias="STRAVA_RATE_LIMIT_RETRIES") # 429 재시도 횟수
+
+class HttpClientConfig(CommonConfig):
+    http2: bool = Field(default=True, alias="HTTP_CLIENT_HTTP2")  # h2 패키지가 있을때만 적용
+    max_connections: int = Field(default=100, alias="HTTP_CLIENT_MAX_CONNECTIONS")
+    max_keepalive_connections: int = Field(default=20, alias="HTTP_CLIENT_MAX_KEEPALIVE")
+    keepalive_expiry: float = Field(default=30.0, alias="HTTP_CLIENT_KEEPALIVE_EXPIRY")
+    connect_timeout: float = Field(default=5.0, alias="HTTP_CLIENT_CONNECT_TIMEOUT")
+    # 호스트별 read 타임아웃 (초)
+    strava_timeout: float = Field(default=15.0, alias="HTTP_CLIENT_STRAVA_TIMEOUT")
+    google_timeout: float = Field(default=10.0, alias="HTTP_CLIENT_GOOGLE_TIMEOUT")
+
+class RedisConfig(CommonConfig):
+    url: str = Field(default="redis://localhost:6379/0", alias="REDIS_URL")
+
+class IngestConfig(CommonConfig):
+    queue_backend: str = Field(default="memory", alias="INGEST_QUEUE_BACKEND")  # memory / redis
+    workers: int = Field(default=2, alias="INGEST_WORKERS")
+    worker_name: str = Field(default_factory=socket.gethostname, alias="INGEST_WORKER_NAME")  # 워커 id 앞부분. 재시작해도 같아야 남은 작업 복구
+    job_ttl: int = Field(default=60 * 60 * 24, alias="INGEST_JOB_TTL")  # 작업 상태 보관 시간 (초)
+    write_batch_size: int = Field(default=50, alias="INGEST_WRITE_BATCH_SIZE")  # 이만큼 모이면 한번에 저장
+    write_flush_seconds: float = Field(default=5.0, alias="INGEST_WRITE_FLUSH_SECONDS")  # 가장 오래된 대기 활동이 이보다 오래되면 저장
+
+class ExecutorConfig(CommonConfig):
+    thread_workers: int = Field(default=4, alias="EXECUTOR_THREAD_WORKERS")  # 복호화/디코딩
+    process_workers: int = Field(default=2, alias="EXECUTOR_PROCESS_WORKERS")  # 분석. 0 이면 스레드 풀 사용
+    process_nice: int = Field(default=10, alias="EXECUTOR_PROCESS_NICE")  # 분석 워커 우선순위 (높을수록 양보)
+
+class ArchiveConfig(CommonConfig):
+    enabled: bool = Field(default=True, alias="RAW_ARCHIVE_ENABLED")
+    path: Path = Field(default=ENV_DIR.parent / "archive", alias="RAW_ARCHIVE_PATH")  # 원본 응답 보관 경로
+
+class AdminConfig(CommonConfig):
+    api_key: str = Field(default="", alias="ADMIN_API_KEY")  # 비어있으면 관리자 api 비활성
 
 class LLMConfig(CommonConfig):
     secret:str = Field(default="", alias="OPENAI_SECRET")
@@ -72,4 +112,10 @@ google = GoogleConfig()
 jwt_config = JWTConfig()
 security = SecurityConfig()
 strava = StravaConfig()
-llm = LLMConfig()
\ No newline at end of file
+llm = LLMConfig()
+http_client = HttpClientConfig()
+redis = RedisConfig()
+ingest = IngestConfig()
+executor = ExecutorConfig()
+admin = AdminConfig()
+archive = ArchiveConfig()
\ No newline at end of file
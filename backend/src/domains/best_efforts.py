@@ -0,0 +1,77 @@
+"""최고 기록 구간 (best effort) / 기록 예측
+
+세션 스트림에서 거리별 가장 빠른 구간을 찾아서 저장.
+개인 기록, 예측은 저장된 값으로만 계산 (스트림 다시 안읽음)
+"""
+import math
+import numpy as np
+from typing import List, Optional
+
+from config.constants import BEST_EFFORT_DISTANCES, RIEGEL_EXPONENT
+from schemas.models import StreamArrays, BestEffortData, RacePredictionData
+
+
+def best_efforts(stream:Optional[StreamArrays]) -> List[BestEffortData]:
+    """거리별 가장 빠른 구간
+        끝 샘플 j 마다 거리 d[j] - target 지점을 시작으로 하는 구간 (슬라이딩 윈도우),
+        시작 샘플 i 마다 d[i] + target 지점에서 끝나는 구간 둘 다 비교.
+        누적거리는 단조 증가라 반대쪽 끝은 정렬된 배열에서 한번에 찾음 (searchsorted)
+        반대쪽 끝은 샘플 사이를 선형 보간 -> 정확히 target 거리의 시간
+    """
+    if stream is None or stream.distance is None or stream.time is None:
+        return []
+    n = min(len(stream.distance), len(stream.time))
+    if n < 2:
+        return []
+
+    d = np.maximum.accumulate(stream.distance[:n])  # gps 튐으로 줄어드는 경우 보정
+    t = stream.time[:n]
+
+    res = []
+    for target, name in BEST_EFFORT_DISTANCES.items():
+        if d[-1] - d[0] < target:
+            break  # 목표 거리 오름차순
+
+        end = np.flatnonzero(d - d[0] >= target)  # 끝 후보
+        x = d[end] - target  # 구간 시작 지점 (거리)
+        i = np.searchsorted(d, x, side="right") - 1  # d[i] <= x < d[i+1]
+        i = np.minimum(i, n - 2)
+        span = d[i + 1] - d[i]
+        frac = np.divide(x - d[i], span, out=np.zeros_like(x), where=span > 0)
+        start_t = t[i] + frac * (t[i + 1] - t[i])
+
+        # 시작이 샘플인 구간. 가장 빠른 구간은 시작이나 끝 중 하나가 샘플 위에 있음
+        begin = np.flatnonzero(d + target <= d[-1])
+        y = d[begin] + target  # 구간 끝 지점 (거리)
+        j = np.searchsorted(d, y, side="left")  # d[j-1] < y <= d[j]
+        end_t = t[j - 1] + (y - d[j - 1]) / (d[j] - d[j - 1]) * (t[j] - t[j - 1])
+
+        start_t = np.concatenate((start_t, t[begin]))
+        elapsed = np.concatenate((t[end], end_t)) - start_t
+
+        k = int(np.argmin(elapsed))
+        res.append(BestEffortData(distance=target,
+                                  name=name,
+                                  elapsed_time=round(float(elapsed[k]), 1),
+                                  start_offset=round(float(start_t[k] - t[0]), 1)))
+    return res
+
+
+def predict_race_times(records:List[BestEffortData]) -> List[RacePredictionData]:
+    """Riegel 공식으로 거리별 예상 기록
+        목표 거리와 가장 가까운 다른 거리 (로그 비율) 의 기록을 기준으로 예측
+        (기록이 하나뿐이면 그 기록 기준)
+    """
+    if not records:
+        return []
+
+    res = []
+    for target, name in BEST_EFFORT_DISTANCES.items():
+        others = [r for r in records if r.distance != target] or records
+        base = min(others, key=lambda r: abs(math.log(target / r.distance)))
+        predicted = base.elapsed_time * (target / base.distance) ** RIEGEL_EXPONENT
+        res.append(RacePredictionData(distance=target,
+                                      name=name,
+                                      predicted_time=round(predicted, 1),
+                                      based_on=base.name))
+    return res
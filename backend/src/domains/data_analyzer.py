@@ -1,10 +1,18 @@
 import numpy as np
 from statistics import mean, pstdev, median
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Sequence
 
-from schemas.models import LapData, StreamData, ActivityData
+from schemas.models import LapData, StreamArrays, ActivityData
+from domains.segmentation import segment_laps
+from domains.elevation import apply_lap_gap
 
 
+# 분류 규칙/기준값을 바꾸면 올림 -> 저장된 결과 중 이전 버전만 재분석 (reanalyze)
+ANALYZER_VERSION = 1
+
+# analyze_many 분류 코드 (우선순위 순서)
+INTERVAL, TEMPO, SPEED, JOG, LONG, RECOVERY, DEFAULT = range(7)
+
 
 class DataAnalyzer:
     def __init__(self, max_hr:int=190, pace_gap_thr:float=120.0):
@@ -26,6 +34,18 @@ class DataAnalyzer:
         seconds = int(pace_sec % 60)
         return f"{minutes}'{seconds:02d}\"/km"
     
+    def _lap_speed(self, lap: LapData) -> Optional[float]:
+        """분류용 랩 속도. 경사 보정 속도가 있으면 그것 (언덕 랩이 느린 랩으로 보이지 않게)"""
+        return lap.gap_speed or lap.average_speed
+
+    def _format_activity_pace(self, activity: ActivityData) -> str:
+        """평균 페이스. 경사 보정 페이스와 5초/km 이상 차이나면 같이 표시"""
+        pace = self._format_pace(activity.average_speed)
+        if activity.gap_speed and activity.average_speed \
+                and abs(self._to_pace(activity.gap_speed) - self._to_pace(activity.average_speed)) >= 5:
+            pace += f" (경사 보정 {self._format_pace(activity.gap_speed)})"
+        return pace
+
     def _to_pace(self, speed: float) -> float:
         """평균 속도(m/s) → 페이스(sec/km)"""
         if not speed:
@@ -37,7 +57,7 @@ class DataAnalyzer:
     def analyze(self,
                 activity:ActivityData,
                 laps:List[LapData],
-                stream:StreamData)->Dict[str, str]:
+                stream:StreamArrays)->Dict[str, str]:
         """데이터 분석
         
         return {title: "", detail:""}
@@ -47,6 +67,7 @@ class DataAnalyzer:
         # 순서대로 탐색 (우선순위 있음)
         res = (
             self._classify_intervals(laps)
+            or self._classify_stream_intervals(laps, stream)
             or self._classify_tempo(activity, laps)
             or self._classify_speed_run(activity, laps)
             or self._classify_jogging(activity, laps)
@@ -58,6 +79,97 @@ class DataAnalyzer:
         return res
     
     
+    def analyze_many(self,
+                     activities:Sequence[ActivityData],
+                     laps_list:Sequence[List[LapData]],
+                     streams:Optional[Sequence[StreamArrays]] = None)->List[Dict[str, str]]:
+        """여러 활동 한번에 분석 (재분류용)
+
+        활동/랩을 numpy 배열로 한번만 변환하고 규칙을 마스크로 평가.
+        우선순위, 결과 문구는 analyze 와 같음 (streams 없으면 자동 구간 인터벌 생략)
+        return [{title: "", detail:""}, ...] (activities 순서)
+        """
+        n = len(activities)
+        if n == 0:
+            return []
+
+        dist = np.fromiter((a.distance or 0.0 for a in activities), dtype=np.float64, count=n)
+        elapsed = np.fromiter((a.elapsed_time or 0 for a in activities), dtype=np.float64, count=n)
+        hr = np.fromiter((a.average_heartrate or 0.0 for a in activities), dtype=np.float64, count=n)
+
+        km = dist / 1000
+        hr_pct = hr / self.max_hr * 100
+        # 심박/거리/시간 중 하나라도 없으면 심박 기반 규칙 제외
+        has_hr = (hr != 0) & (dist != 0) & (elapsed != 0)
+
+        lap_arrays = self._lap_arrays(laps_list)
+        groups = self._find_interval_groups(lap_arrays)
+        variability = self._speed_variability(lap_arrays)
+
+        # 랩으로 안 보이는 인터벌은 스트림 자동 구간으로 (활동별)
+        stream_res: List[Optional[Dict[str, str]]] = [None] * n
+        if streams is not None:
+            for k in range(n):
+                if groups[k] is None:
+                    stream_res[k] = self._classify_stream_intervals(laps_list[k], streams[k])
+
+        is_interval = np.fromiter((g is not None or r is not None for g, r in zip(groups, stream_res)),
+                                  dtype=bool, count=n)
+        is_tempo = has_hr & (6 <= km) & (km <= 15) & (75 <= hr_pct) & (hr_pct <= 85) & (variability < 0.3)
+        is_speed = has_hr & (3 <= km) & (km <= 10) & (hr_pct >= 85)
+        is_jog = has_hr & (40 <= hr_pct) & (hr_pct <= 75)
+        is_long = has_hr & (km >= 15) & (65 <= hr_pct) & (hr_pct <= 75)
+        is_recovery = has_hr & (2 <= km) & (km <= 8) & (hr_pct <= 50)
+
+        # 먼저 맞는 규칙이 우선 (analyze 의 or 체인과 같은 순서)
+        codes = np.select(
+            [is_interval, is_tempo, is_speed, is_jog, is_long, is_recovery],
+            [INTERVAL, TEMPO, SPEED, JOG, LONG, RECOVERY],
+            default=DEFAULT,
+        )
+
+        # 문구 생성은 활동별 (analyze 와 같은 포맷 함수)
+        res = []
+        for activity, laps, group, auto, code in zip(activities, laps_list, groups, stream_res, codes.tolist()):
+            if code == INTERVAL:
+                res.append(self._format_intervals(laps, group) if group is not None else auto)
+            elif code == DEFAULT:
+                res.append(self._classify_default(activity))
+            else:
+                res.append(self._formatters[code](self, activity, self._get_hr_percent(activity)))
+        return res
+
+
+    def _lap_arrays(self, laps_list:Sequence[List[LapData]]) -> Dict[str, np.ndarray]:
+        """활동별 랩을 한 줄로 펼친 배열
+            act: 랩이 속한 활동 번호, offsets: 활동별 시작 위치
+        """
+        counts = np.fromiter((len(laps) for laps in laps_list), dtype=np.int64, count=len(laps_list))
+        total = int(counts.sum())
+        speeds = np.fromiter((self._lap_speed(lap) or 0.0 for laps in laps_list for lap in laps),
+                             dtype=np.float64, count=total)
+        return {
+            "counts": counts,
+            "offsets": np.concatenate(([0], np.cumsum(counts)[:-1])),
+            "act": np.repeat(np.arange(len(laps_list)), counts),
+            "speeds": speeds,
+        }
+
+
+    def _speed_variability(self, lap_arrays:Dict[str, np.ndarray]) -> np.ndarray:
+        """활동별 랩 속도 표준편차 (모표준편차, 속도 있는 랩만. 1개 이하면 0)"""
+        n = len(lap_arrays["counts"])
+        act, speeds = lap_arrays["act"], lap_arrays["speeds"]
+        has_speed = (speeds != 0).astype(np.float64)
+
+        cnt = np.bincount(act, weights=has_speed, minlength=n)
+        total = np.bincount(act, weights=speeds * has_speed, minlength=n)
+        avg = np.divide(total, cnt, out=np.zeros(n), where=cnt > 0)
+        sq = np.bincount(act, weights=(speeds - avg[act]) ** 2 * has_speed, minlength=n)
+        var = np.divide(sq, cnt, out=np.zeros(n), where=cnt > 1)
+        return np.sqrt(var)
+
+
     
     # ------------------------
     # 인터벌
@@ -66,8 +178,35 @@ class DataAnalyzer:
         if not laps or len(laps) < 4:
             return None
 
-        n = len(laps)
-        lap_paces = [self._to_pace(lap.average_speed) for lap in laps]
+        group = self._find_interval_group([self._to_pace(self._lap_speed(lap)) for lap in laps])
+        if group is None:
+            return None
+        return self._format_intervals(laps, group)
+
+    def _classify_stream_intervals(self, laps: List[LapData],
+                                   stream: Optional[StreamArrays]) -> Optional[Dict[str, str]]:
+        """랩으로 구조가 안 보이면 (랩 부족, 자동 랩) 스트림 자동 구간으로 인터벌 판단"""
+        if stream is None or self._has_lap_structure(laps):
+            return None
+
+        synthetic = segment_laps(stream)
+        apply_lap_gap(synthetic, stream)
+        res = self._classify_intervals(synthetic)
+        if res is None:
+            return None
+        res["detail"] += " (자동 구간)"
+        return res
+
+    def _has_lap_structure(self, laps: List[LapData]) -> bool:
+        """직접 나눈 랩인지. 4개 미만이거나 거리가 거의 같은 자동 랩이면 False"""
+        if not laps or len(laps) < 4:
+            return False
+        distances = np.array([lap.distance for lap in laps[:-1]])  # 마지막 랩은 자투리
+        return distances.std() >= 0.1 * distances.mean()
+
+    def _find_interval_group(self, lap_paces: List[float]) -> Optional[List[int]]:
+        """반복(빠른랩+느린랩) 구간 찾기. return: 빠른랩 인덱스 (2회 미만이면 None)"""
+        n = len(lap_paces)
 
         # 빠른랩 + 느린랩 후보 페어
         candidate_pairs = []
@@ -96,10 +235,54 @@ class DataAnalyzer:
         best_group = max(groups, key=len)
         if len(best_group) < 2:
             return None
+        return best_group
+
+    def _find_interval_groups(self, lap_arrays:Dict[str, np.ndarray]) -> List[Optional[List[int]]]:
+        """_find_interval_group 의 배열 버전. 활동별 빠른랩 인덱스 (없으면 None)"""
+        counts, offsets = lap_arrays["counts"], lap_arrays["offsets"]
+        act, speeds = lap_arrays["act"], lap_arrays["speeds"]
+        res: List[Optional[List[int]]] = [None] * len(counts)
+        if len(speeds) < 2:
+            return res
+
+        paces = np.divide(1000, speeds, out=np.full_like(speeds, np.inf), where=speeds != 0)
+
+        # 빠른랩 + 느린랩 후보 페어 (같은 활동, 랩 4개 이상)
+        fast, slow = paces[:-1], paces[1:]
+        with np.errstate(invalid="ignore"):  # inf - inf
+            pair = (
+                (act[:-1] == act[1:])
+                & (counts[act[:-1]] >= 4)
+                & np.isfinite(fast) & np.isfinite(slow)
+                & (slow - fast >= self.pace_gap_threshold)
+            )
+        cand = np.flatnonzero(pair)
+        if len(cand) == 0:
+            return res
+
+        # 연속된 페어 그룹 (step=2, 같은 활동)
+        breaks = np.ones(len(cand), dtype=bool)
+        breaks[1:] = (np.diff(cand) != 2) | (act[cand[1:]] != act[cand[:-1]])
+        starts = np.flatnonzero(breaks)
+        lengths = np.diff(np.append(starts, len(cand)))
+        group_act = act[cand[starts]]
 
+        # 활동별 가장 긴 그룹 (길이 같으면 앞쪽)
+        order = np.lexsort((starts, -lengths, group_act))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = group_act[order[1:]] != group_act[order[:-1]]
+        for g in order[first]:
+            if lengths[g] < 2:
+                continue
+            a = group_act[g]
+            members = cand[starts[g]:starts[g] + lengths[g]] - offsets[a]
+            res[a] = members.tolist()
+        return res
+
+    def _format_intervals(self, laps: List[LapData], group: List[int]) -> Dict[str, str]:
         # 반복 구간만 선택
-        fast_laps = [laps[i] for i in best_group]
-        easy_laps = [laps[i + 1] for i in best_group]
+        fast_laps = [laps[i] for i in group]
+        easy_laps = [laps[i + 1] for i in group]
 
         # 대표 거리 / 평균 페이스
         rep_distance = round(mean([lap.distance for lap in fast_laps]), -1)
@@ -127,19 +310,22 @@ class DataAnalyzer:
         if not hr_pct or not activity.distance or not activity.elapsed_time:
             return None
         
-        speeds = [lap.average_speed for lap in laps if lap.average_speed]
+        speeds = [self._lap_speed(lap) for lap in laps if self._lap_speed(lap)]
         variability = pstdev(speeds) if len(speeds) > 1 else 0
 
         if 6 <= activity.distance/1000 <= 15 and 75 <= hr_pct <= 85 and variability < 0.3:
-            km = round(activity.distance / 1000, 1)
-            mins = round(activity.elapsed_time / 60)
-            return {
-                "title": f"{km}km 템포런",
-                "detail": f"총 {km}km, {mins}분, 평균 심박 {activity.average_heartrate}bpm "
-                          f"({int(hr_pct)}%), 평균 페이스 {self._format_pace(activity.average_speed)}"
-            }
+            return self._format_tempo(activity, hr_pct)
         return None
 
+    def _format_tempo(self, activity: ActivityData, hr_pct: float) -> Dict[str, str]:
+        km = round(activity.distance / 1000, 1)
+        mins = round(activity.elapsed_time / 60)
+        return {
+            "title": f"{km}km 템포런",
+            "detail": f"총 {km}km, {mins}분, 평균 심박 {activity.average_heartrate}bpm "
+                      f"({int(hr_pct)}%), 평균 페이스 {self._format_activity_pace(activity)}"
+        }
+
     # ------------------------
     # LSD (Zone 2, ≥15km)
     # ------------------------
@@ -149,15 +335,18 @@ class DataAnalyzer:
             return None
         
         if activity.distance/1000 >= 15 and 65 <= hr_pct <= 75:
-            km = round(activity.distance / 1000, 1)
-            mins = round(activity.elapsed_time / 60)
-            return {
-                "title": f"{km}km LSD",
-                "detail": f"총 {km}km, {mins}분, 평균 심박 {activity.average_heartrate}bpm "
-                          f"({int(hr_pct)}%), 평균 페이스 {self._format_pace(activity.average_speed)}"
-            }
+            return self._format_long_run(activity, hr_pct)
         return None
 
+    def _format_long_run(self, activity: ActivityData, hr_pct: float) -> Dict[str, str]:
+        km = round(activity.distance / 1000, 1)
+        mins = round(activity.elapsed_time / 60)
+        return {
+            "title": f"{km}km LSD",
+            "detail": f"총 {km}km, {mins}분, 평균 심박 {activity.average_heartrate}bpm "
+                      f"({int(hr_pct)}%), 평균 페이스 {self._format_activity_pace(activity)}"
+        }
+
     # ------------------------
     # 스피드런 (Zone 4-5, 3-10km)
     # ------------------------
@@ -167,15 +356,18 @@ class DataAnalyzer:
             return None
         
         if 3 <= activity.distance/1000 <= 10 and hr_pct >= 85:
-            km = round(activity.distance / 1000, 1)
-            mins = round(activity.elapsed_time / 60)
-            return {
-                "title": f"{km}km 스피드런",
-                "detail": f"총 {km}km, {mins}분, 평균 심박 {activity.average_heartrate}bpm "
-                          f"({int(hr_pct)}%), 평균 페이스 {self._format_pace(activity.average_speed)}"
-            }
+            return self._format_speed_run(activity, hr_pct)
         return None
 
+    def _format_speed_run(self, activity: ActivityData, hr_pct: float) -> Dict[str, str]:
+        km = round(activity.distance / 1000, 1)
+        mins = round(activity.elapsed_time / 60)
+        return {
+            "title": f"{km}km 스피드런",
+            "detail": f"총 {km}km, {mins}분, 평균 심박 {activity.average_heartrate}bpm "
+                      f"({int(hr_pct)}%), 평균 페이스 {self._format_activity_pace(activity)}"
+        }
+
     # ------------------------
     # 조깅 (Zone 1-2, ≤8km)
     # ------------------------
@@ -184,14 +376,17 @@ class DataAnalyzer:
         if not hr_pct or not activity.distance or not activity.elapsed_time:
             return None
         if 40 <= hr_pct <= 75:
-            km = round(activity.distance / 1000, 1)
-            mins = round(activity.elapsed_time / 60)
-            return {
-                "title": f"{km}km {mins}분 조깅",
-                "detail": f"평균 심박 {activity.average_heartrate}bpm ({int(hr_pct)}%), "
-                        f"평균 페이스 {self._format_pace(activity.average_speed)}"
-            }
+            return self._format_jogging(activity, hr_pct)
         return None
+
+    def _format_jogging(self, activity: ActivityData, hr_pct: float) -> Dict[str, str]:
+        km = round(activity.distance / 1000, 1)
+        mins = round(activity.elapsed_time / 60)
+        return {
+            "title": f"{km}km {mins}분 조깅",
+            "detail": f"평균 심박 {activity.average_heartrate}bpm ({int(hr_pct)}%), "
+                    f"평균 페이스 {self._format_activity_pace(activity)}"
+        }
     
     # ------------------------
     # 기본 분류 (거리 + 시간 러닝)
@@ -204,7 +399,7 @@ class DataAnalyzer:
         mins = round(activity.elapsed_time / 60)
         return {
             "title": f"{km}km {mins}분 러닝",
-            "detail": f"총 거리 {km}km, 총 시간 {mins}분. 평균페이스 {self._format_pace(activity.average_speed)}"
+            "detail": f"총 거리 {km}km, 총 시간 {mins}분. 평균페이스 {self._format_activity_pace(activity)}"
         }
     
     # ------------------------
@@ -215,14 +410,25 @@ class DataAnalyzer:
         if not hr_pct or not activity.distance or not activity.elapsed_time:
             return None
 
+        if 2 <= activity.distance / 1000 <= 8 and hr_pct <= 50 :
+            return self._format_recovery(activity, hr_pct)
+        return None
+
+    def _format_recovery(self, activity: ActivityData, hr_pct: float) -> Dict[str, str]:
         distance_km = activity.distance / 1000
-        avg_pace_sec = activity.elapsed_time / distance_km if distance_km > 0 else None  # 초/km
-
-        if 2 <= distance_km <= 8 and hr_pct <= 50 :
-            pace_min = int(avg_pace_sec // 60)
-            pace_sec = int(avg_pace_sec % 60)
-            return {
-                'title': f"{int(distance_km)}km 회복런",
-                'detail':f"평균 페이스 {pace_min}:{pace_sec:02d}/km"
-            }
-        return None
\ No newline at end of file
+        avg_pace_sec = activity.elapsed_time / distance_km  # 초/km
+        pace_min = int(avg_pace_sec // 60)
+        pace_sec = int(avg_pace_sec % 60)
+        return {
+            'title': f"{int(distance_km)}km 회복런",
+            'detail':f"평균 페이스 {pace_min}:{pace_sec:02d}/km"
+        }
+
+    # analyze_many 분류 코드 -> 문구 생성
+    _formatters = {
+        TEMPO: _format_tempo,
+        SPEED: _format_speed_run,
+        JOG: _format_jogging,
+        LONG: _format_long_run,
+        RECOVERY: _format_recovery,
+    }
@@ -0,0 +1,108 @@
+"""경사 / 경사 보정 페이스 (GAP)
+
+고도 스트림을 이동평균으로 다듬고 앞뒤 거리 차로 경사 계산.
+Minetti 에너지 비용 곡선으로 같은 힘을 평지에서 냈을 때의 거리(평지 환산 거리)를 구함
+"""
+import numpy as np
+from typing import List, Optional
+
+from domains.stream_features import rolling_mean
+from schemas.models import ActivityData, LapData, StreamArrays
+
+ALTITUDE_SMOOTH = 15  # 고도 이동평균 창 (샘플)
+GRADE_HALF_WINDOW = 5  # 경사 계산시 앞뒤 샘플 수
+MIN_GRADE_DISTANCE = 5.0  # m. 이보다 짧게 움직였으면 경사 0 (정지)
+MAX_GRADE = 0.45  # Minetti 곡선 적용 범위 (±45%)
+FLAT_COST = 3.6  # 평지 에너지 비용 (J/kg/m)
+_MINETTI = (155.4, -30.4, -43.3, 46.3, 19.5, FLAT_COST)
+
+
+def _channels(stream:Optional[StreamArrays]):
+    if stream is None or stream.distance is None or stream.altitude is None:
+        return None
+    n = min(len(stream.distance), len(stream.altitude))
+    if n < 2:
+        return None
+    return stream.distance[:n], stream.altitude[:n]
+
+
+def grade(distance:np.ndarray, altitude:np.ndarray) -> np.ndarray:
+    """샘플별 경사 (비율, 0.1 = 10%)"""
+    n = len(distance)
+    alt = rolling_mean(altitude, ALTITUDE_SMOOTH)
+    idx = np.arange(n)
+    lo = np.maximum(idx - GRADE_HALF_WINDOW, 0)
+    hi = np.minimum(idx + GRADE_HALF_WINDOW, n - 1)
+    dd = distance[hi] - distance[lo]
+    g = np.divide(alt[hi] - alt[lo], dd, out=np.zeros(n), where=dd >= MIN_GRADE_DISTANCE)
+    return np.clip(g, -MAX_GRADE, MAX_GRADE)
+
+
+def flat_distance(stream:Optional[StreamArrays]) -> Optional[np.ndarray]:
+    """누적 평지 환산 거리 (샘플별). 고도 스트림 없으면 None"""
+    channels = _channels(stream)
+    if channels is None:
+        return None
+    d, alt = channels
+    cost = np.polyval(_MINETTI, grade(d, alt)) / FLAT_COST
+    step = np.diff(d, prepend=d[0])
+    return np.cumsum(np.clip(step, 0, None) * cost)
+
+
+def gap_velocity(stream:Optional[StreamArrays]) -> Optional[np.ndarray]:
+    """샘플별 경사 보정 속도 (m/s)"""
+    channels = _channels(stream)
+    if channels is None or stream.velocity is None:
+        return None
+    d, alt = channels
+    n = min(len(d), len(stream.velocity))
+    cost = np.polyval(_MINETTI, grade(d[:n], alt[:n])) / FLAT_COST
+    return stream.velocity[:n] * cost
+
+
+def elevation_gain(stream:Optional[StreamArrays]) -> Optional[float]:
+    """다듬은 고도 기준 누적 상승 (m)"""
+    channels = _channels(stream)
+    if channels is None:
+        return None
+    alt = rolling_mean(channels[1], ALTITUDE_SMOOTH)
+    return round(float(np.clip(np.diff(alt), 0, None).sum()), 1)
+
+
+def apply_lap_gap(laps:List[LapData], stream:Optional[StreamArrays],
+                  flat:Optional[np.ndarray] = None) -> None:
+    """랩별 경사 보정 속도 (lap.gap_speed) 채우기
+        랩 누적 시간으로 스트림 구간을 찾고, 구간의 평지 환산 거리 / 실제 거리 비율만큼 속도 보정
+    """
+    if flat is None:
+        flat = flat_distance(stream)
+    if flat is None or not laps or stream.time is None:
+        return
+    n = min(len(flat), len(stream.time))
+    d, t = stream.distance[:n], stream.time[:n] - stream.time[0]
+
+    bounds = np.cumsum([0] + [lap.elapsed_time for lap in laps])
+    idx = np.minimum(np.searchsorted(t, bounds), n - 1)
+    raw = d[idx[1:]] - d[idx[:-1]]
+    ratio = np.divide(flat[idx[1:]] - flat[idx[:-1]], raw, out=np.ones(len(laps)), where=raw > 0)
+
+    for lap, r in zip(laps, ratio.tolist()):
+        if lap.average_speed:
+            lap.gap_speed = round(lap.average_speed * r, 3)
+
+
+def apply_grade_adjustment(activity:ActivityData, laps:List[LapData],
+                           stream:Optional[StreamArrays]) -> None:
+    """활동/랩 경사 보정 속도, 누적 상승 채우기 (수집시 분석 전에 한번)"""
+    flat = flat_distance(stream)
+    if flat is None:
+        return
+
+    if activity.elevation_gain is None:
+        activity.elevation_gain = elevation_gain(stream)
+
+    raw = stream.distance[len(flat) - 1] - stream.distance[0]
+    if activity.average_speed and raw > 0:
+        activity.gap_speed = round(activity.average_speed * flat[-1] / raw, 3)
+
+    apply_lap_gap(laps, stream, flat=flat)
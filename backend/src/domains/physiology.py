@@ -0,0 +1,65 @@
+"""사용자별 생리 지표 추정 (최대심박, 역치 페이스)
+
+저장된 랩/최고 기록으로 추정. 기록이 부족하면 나이 기반 공식, 그것도 없으면 기본값
+안정시 심박은 운동 중 심박으로 알 수 없어서 (워밍업도 95~130) 기본값 사용
+"""
+import numpy as np
+from typing import List, Optional
+
+from config.constants import REST_HR, THRESHOLD_PACE, RIEGEL_EXPONENT
+from schemas.models import BestEffortData, PhysiologyProfileData
+
+DEFAULT_MAX_HR = 190
+MIN_SESSIONS = 5  # 기록 기반 추정에 필요한 최소 세션 수
+HR_ARTIFACT = 220  # 이보다 높은 심박은 센서 오류로 보고 제외
+
+
+def age_max_hr(age:Optional[int]) -> Optional[float]:
+    """나이 기반 최대심박 (Tanaka: 208 - 0.7 x 나이)"""
+    if not age or age <= 0:
+        return None
+    return round(208 - 0.7 * age)
+
+
+def estimate_max_hr(session_max_hrs:List[float]) -> Optional[float]:
+    """세션별 최대심박 -> 최대심박
+        한번 튄 값 대신 상위 2번째 값 (세션이 적으면 None)
+    """
+    values = np.sort([hr for hr in session_max_hrs if hr and hr < HR_ARTIFACT])
+    if len(values) < MIN_SESSIONS:
+        return None
+    return round(float(values[-2]))
+
+
+def estimate_threshold_pace(records:List[BestEffortData]) -> Optional[float]:
+    """최고 기록 -> 역치 페이스 (1시간 유지 가능한 페이스, sec/km)
+        5k 이상 기록 중 1시간 거리 예측이 가장 긴 기록 기준 (Riegel)
+    """
+    distances = [
+        r.distance * (3600 / r.elapsed_time) ** (1 / RIEGEL_EXPONENT)
+        for r in records if r.distance >= 5000 and r.elapsed_time > 0
+    ]
+    if not distances:
+        return None
+    return round(3600 / max(distances) * 1000, 1)
+
+
+def build_profile(session_max_hrs:List[float],
+                  records:List[BestEffortData],
+                  age:Optional[int]) -> PhysiologyProfileData:
+    """추정값 합치기. 항목별로 기록 -> 나이 -> 기본값 순서"""
+    max_hr = estimate_max_hr(session_max_hrs)
+    source = "history"
+    if max_hr is None:
+        max_hr = age_max_hr(age)
+        source = "age" if max_hr is not None else "default"
+    if max_hr is None:
+        max_hr = DEFAULT_MAX_HR
+
+    return PhysiologyProfileData(
+        max_hr=max_hr,
+        rest_hr=REST_HR,  # 안정시 심박 입력값이 생기기 전까지 기본값
+        threshold_pace=estimate_threshold_pace(records) or THRESHOLD_PACE,
+        source=source,
+        sessions=len(session_max_hrs),
+    )
@@ -0,0 +1,91 @@
+"""스트림 기반 자동 구간 나누기
+
+랩이 없거나 자동 1km 랩뿐이면 인터벌 구조가 안보임.
+속도 스트림을 빠름/느림 두 상태로 나눠서 상태가 바뀌는 지점마다 가상 랩 생성
+"""
+import numpy as np
+from typing import List, Optional
+
+from domains.stream_features import rolling_mean
+from domains.elevation import gap_velocity
+from schemas.models import LapData, StreamArrays
+
+SMOOTH_SAMPLES = 9  # 속도 이동평균 창 (샘플, 보통 1초 간격)
+MIN_SEGMENT_SAMPLES = 31  # 이보다 짧은 상태 변화는 무시 (다수결 창)
+MIN_MOVING_SPEED = 0.5  # m/s. 이보다 느리면 정지
+MIN_SPEED_GAP = 0.5  # m/s. 빠름/느림 평균 차이가 이보다 작으면 구조 없음
+
+
+def _otsu_threshold(x:np.ndarray, bins:int = 64) -> float:
+    """두 집단 사이 분산이 최대가 되는 경계값"""
+    hist, edges = np.histogram(x, bins=bins)
+    centers = (edges[:-1] + edges[1:]) / 2
+    w0 = np.cumsum(hist)
+    w1 = w0[-1] - w0
+    s0 = np.cumsum(hist * centers)
+    m0 = np.divide(s0, w0, out=np.zeros(bins), where=w0 > 0)
+    m1 = np.divide(s0[-1] - s0, w1, out=np.zeros(bins), where=w1 > 0)
+    between = w0 * w1 * (m0 - m1) ** 2
+    return float(centers[int(np.argmax(between))])
+
+
+def segment_laps(stream:Optional[StreamArrays]) -> List[LapData]:
+    """속도 변화 지점으로 나눈 가상 랩 (빠름/느림 교대)
+        return: 두 상태가 뚜렷하지 않거나 구간이 4개 미만이면 []
+    """
+    if stream is None or stream.velocity is None or stream.distance is None:
+        return []
+    n = min(len(stream.velocity), len(stream.distance))
+    if n < MIN_SEGMENT_SAMPLES * 4:
+        return []
+
+    # 언덕 반복도 구분되게 경사 보정 속도 기준 (고도 없으면 원래 속도)
+    gap = gap_velocity(stream)
+    v = rolling_mean(gap[:n] if gap is not None and len(gap) >= n else stream.velocity[:n], SMOOTH_SAMPLES)
+    moving = v > MIN_MOVING_SPEED
+    if moving.sum() < MIN_SEGMENT_SAMPLES * 4:
+        return []
+
+    # 빠름/느림 경계. 두 집단 평균 차이가 작으면 구조 없음
+    thr = _otsu_threshold(v[moving])
+    fast_mean = v[moving & (v > thr)].mean() if np.any(moving & (v > thr)) else 0.0
+    slow_mean = v[moving & (v <= thr)].mean() if np.any(moving & (v <= thr)) else 0.0
+    if fast_mean - slow_mean < MIN_SPEED_GAP:
+        return []
+
+    # 다수결로 짧은 튐 제거 -> 상태 변화 지점
+    fast = rolling_mean((v > thr).astype(np.float64), MIN_SEGMENT_SAMPLES) > 0.5
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(fast)) + 1, [n]))
+    if len(bounds) - 1 < 4:
+        return []
+
+    starts, ends = bounds[:-1], bounds[1:] - 1
+    d = stream.distance[:n]
+    t = stream.time[:n] if stream.time is not None and len(stream.time) >= n else np.arange(n, dtype=np.float64)
+
+    # 구간 경계 샘플 포함 (다음 구간 시작 = 이번 구간 끝)
+    stop = np.minimum(ends + 1, n - 1)
+    distance = d[stop] - d[starts]
+    elapsed = t[stop] - t[starts]
+    avg_speed = np.divide(distance, elapsed, out=np.zeros(len(starts)), where=elapsed > 0)
+    max_speed = np.maximum.reduceat(stream.velocity[:n], starts)
+
+    avg_hr = [None] * len(starts)
+    if stream.heartrate is not None and len(stream.heartrate) >= n:
+        counts = ends - starts + 1
+        avg_hr = (np.add.reduceat(stream.heartrate[:n], starts) / counts).round(1).tolist()
+
+    return [
+        LapData.model_construct(
+            lap_index=k + 1,
+            distance=float(distance[k]),
+            elapsed_time=int(round(elapsed[k])),
+            average_speed=float(avg_speed[k]),
+            max_speed=float(max_speed[k]),
+            average_heartrate=avg_hr[k],
+            max_heartrate=None,
+            average_cadence=None,
+            elevation_gain=None,
+        )
+        for k in range(len(starts))
+    ]
@@ -0,0 +1,147 @@
+"""스트림 정리 (분석/저장 전)
+
+- 심박: 결측(NaN)이나 범위 밖 값 (센서 끊김), 이동 중앙값에서 튄 값 -> 주변 값으로 보간
+- 속도: 결측, gps 튐 -> 보간. 정지 구간은 0 (velocity_smooth 가 늦게 떨어지는 것 보정)
+- 시간이 같거나 거꾸로 간 샘플 제거
+- 선택: 1초 / 5m 간격으로 다시 샘플링 (STREAM_RESAMPLE)
+"""
+import numpy as np
+from dataclasses import dataclass, fields
+from typing import Optional, Tuple
+from numpy.lib.stride_tricks import sliding_window_view
+
+from config.constants import STREAM_MAX_GAP, STREAM_RESAMPLE
+from schemas.models import StreamArrays
+
+SPIKE_WINDOW = 7  # 이동 중앙값 창 (샘플)
+HR_RANGE = (30, 230)  # 이 범위 밖 심박은 센서 끊김
+HR_SPIKE = 25  # 이동 중앙값과 이만큼 (bpm) 차이나면 튐
+MAX_VELOCITY = 12.0  # m/s. 달리기로 불가능한 속도
+VELOCITY_SPIKE = 3.0  # 이동 중앙값과 이만큼 (m/s) 차이나면 튐
+PAUSE_VELOCITY = 0.3  # m/s. 이보다 느리면 정지
+RESAMPLE_STEP = {"time": 1.0, "distance": 5.0}  # 1초 / 5m
+
+
+@dataclass(slots=True)
+class CleaningReport:
+    """정리 결과 (샘플 수)"""
+    points_in: int = 0
+    points_out: int = 0
+    duplicates: int = 0  # 시간 중복/역행으로 제거
+    hr_dropouts: int = 0  # 범위 밖 심박 보간
+    hr_spikes: int = 0  # 튄 심박 보간
+    velocity_spikes: int = 0  # 튄 속도 보간
+    paused: int = 0  # 정지로 속도 0 처리
+
+    @property
+    def dropped(self) -> int:
+        """제거되거나 보간으로 바뀐 점 수"""
+        return (max(self.points_in - self.points_out, 0)
+                + self.hr_dropouts + self.hr_spikes + self.velocity_spikes)
+
+
+_CHANNELS = tuple(f.name for f in fields(StreamArrays))
+
+
+def _rolling_median(x:np.ndarray, window:int) -> np.ndarray:
+    pad = window // 2
+    padded = np.pad(x, pad, mode="edge")
+    return np.median(sliding_window_view(padded, window), axis=1)
+
+
+def _repair(x:np.ndarray, bad:np.ndarray) -> Optional[np.ndarray]:
+    """bad 위치를 앞뒤 정상값으로 선형 보간. 정상값이 없으면 None (채널 버림)"""
+    if not bad.any():
+        return x
+    good = np.flatnonzero(~bad)
+    if len(good) == 0:
+        return None
+    out = x.copy()
+    out[bad] = np.interp(np.flatnonzero(bad), good, x[good])
+    return out
+
+
+def _take(stream:StreamArrays, idx) -> StreamArrays:
+    return StreamArrays(**{c: (getattr(stream, c)[idx] if getattr(stream, c) is not None else None)
+                           for c in _CHANNELS})
+
+
+def resample_stream(stream:StreamArrays, by:str) -> StreamArrays:
+    """균일 간격으로 다시 샘플링. by: time (1초) / distance (5m)
+        time: STREAM_MAX_GAP 보다 긴 공백(자동 일시정지)은 채우지 않음
+        distance: 거리가 늘지 않는 샘플 (정지) 은 자연히 빠짐
+    """
+    axis = stream.time if by == "time" else stream.distance
+    if axis is None or len(axis) < 2:
+        return stream
+
+    x = np.maximum.accumulate(axis)
+    keep = np.flatnonzero(np.diff(x, prepend=-np.inf) > 0)  # interp 용 증가 구간만
+    x = x[keep]
+    grid = np.arange(x[0], x[-1] + 1e-9, RESAMPLE_STEP[by])
+
+    if by == "time":
+        nxt = np.minimum(np.searchsorted(x, grid), len(x) - 1)
+        gap = x[nxt] - x[np.maximum(nxt - 1, 0)]
+        grid = grid[(gap <= STREAM_MAX_GAP) | (x[nxt] == grid)]
+
+    return StreamArrays(**{
+        c: (np.interp(grid, x, getattr(stream, c)[keep]) if getattr(stream, c) is not None else None)
+        for c in _CHANNELS
+    })
+
+
+def clean_stream(stream:Optional[StreamArrays],
+                 resample:Optional[str] = STREAM_RESAMPLE) -> Tuple[Optional[StreamArrays], CleaningReport]:
+    """스트림 정리 + 정리 결과"""
+    report = CleaningReport()
+    if stream is None:
+        return stream, report
+
+    lengths = [len(getattr(stream, c)) for c in _CHANNELS if getattr(stream, c) is not None]
+    if not lengths:
+        return stream, report
+    n = min(lengths)
+    report.points_in = max(lengths)
+    stream = _take(stream, slice(0, n))
+
+    # 시간 중복/역행 샘플 제거
+    if stream.time is not None and n > 1:
+        keep = np.diff(stream.time, prepend=-np.inf) > 0
+        report.duplicates = int(n - keep.sum())
+        if report.duplicates:
+            stream = _take(stream, keep)
+
+    if stream.heartrate is not None:
+        hr = stream.heartrate
+        dropout = ~np.isfinite(hr) | (hr < HR_RANGE[0]) | (hr > HR_RANGE[1])
+        # 끊긴 값은 먼저 보간해야 중앙값이 안 끌려감
+        filled = _repair(hr, dropout)
+        if filled is not None:
+            spike = ~dropout & (np.abs(hr - _rolling_median(filled, SPIKE_WINDOW)) > HR_SPIKE)
+            report.hr_dropouts, report.hr_spikes = int(dropout.sum()), int(spike.sum())
+            filled = _repair(hr, dropout | spike)
+        stream.heartrate = filled
+
+    if stream.velocity is not None:
+        v = stream.velocity
+        invalid = ~np.isfinite(v) | (v < 0) | (v > MAX_VELOCITY)
+        filled = _repair(v, invalid)
+        if filled is not None:
+            spike = invalid | (np.abs(v - _rolling_median(filled, SPIKE_WINDOW)) > VELOCITY_SPIKE)
+            report.velocity_spikes = int(spike.sum())
+            filled = _repair(v, spike)
+        if filled is not None and stream.distance is not None:
+            # 거리가 안 늘었거나 아주 느리면 정지
+            paused = (np.diff(stream.distance, prepend=stream.distance[0]) <= 0) & (filled < 1.0) \
+                     | (filled < PAUSE_VELOCITY)
+            report.paused = int(paused.sum())
+            filled = np.where(paused, 0.0, filled)
+        stream.velocity = filled
+
+    if resample in RESAMPLE_STEP:
+        stream = resample_stream(stream, by=resample)
+
+    report.points_out = next((len(getattr(stream, c)) for c in _CHANNELS
+                              if getattr(stream, c) is not None), 0)
+    return stream, report
@@ -0,0 +1,63 @@
+"""스트림 특성 계산 (수집시 한번)
+
+스트림 배열에서 세션 요약값 계산. json 스트림을 다시 불러오지 않고 sql 로 집계하기 위함
+"""
+import numpy as np
+from typing import Optional
+
+from config.constants import HR_ZONE_BOUNDS, PACE_ZONE_BOUNDS, STREAM_MAX_GAP
+from schemas.models import StreamArrays, ZoneTimeData
+
+
+def sample_durations(stream:StreamArrays, n:int) -> np.ndarray:
+    """샘플별 시간 (초). 다음 샘플까지 간격, 정지(STREAM_MAX_GAP 초과)는 0
+        time 채널이 없으면 1초 간격으로 가정
+    """
+    if stream.time is None or len(stream.time) < n:
+        return np.ones(n)
+    dt = np.diff(stream.time[:n], append=stream.time[n - 1])
+    dt[(dt < 0) | (dt > STREAM_MAX_GAP)] = 0
+    return dt
+
+
+def rolling_mean(x:np.ndarray, window:int) -> np.ndarray:
+    """가운데 정렬 이동평균 (양끝은 가장자리 값으로 채움)"""
+    pad = window // 2
+    padded = np.pad(x, pad, mode="edge")
+    return np.convolve(padded, np.ones(window) / window, mode="valid")
+
+
+def _bin_seconds(values:np.ndarray, bounds:np.ndarray, dt:np.ndarray, valid:np.ndarray) -> list:
+    """값을 경계(오름차순)로 나눠서 구간별 시간 합산"""
+    idx = np.searchsorted(bounds, values, side="right")
+    secs = np.bincount(idx, weights=dt * valid, minlength=len(bounds) + 1)
+    return np.rint(secs).astype(int).tolist()
+
+
+def zone_times(stream:Optional[StreamArrays], max_hr:float) -> Optional[ZoneTimeData]:
+    """심박/페이스 존별 시간 (초)
+        심박: 최대심박 비율 HR_ZONE_BOUNDS 기준, 심박 0 (센서 끊김) 제외
+        페이스: PACE_ZONE_BOUNDS 기준, 정지 구간은 z1
+        return: 스트림이 없으면 None
+    """
+    if stream is None:
+        return None
+
+    hr_zones = pace_zones = None
+
+    if stream.heartrate is not None and len(stream.heartrate):
+        hr = stream.heartrate
+        dt = sample_durations(stream, len(hr))
+        bounds = np.asarray(HR_ZONE_BOUNDS) * max_hr
+        hr_zones = _bin_seconds(hr, bounds, dt, hr > 0)
+
+    if stream.velocity is not None and len(stream.velocity):
+        v = stream.velocity
+        dt = sample_durations(stream, len(v))
+        # 페이스 경계 -> 속도 경계 (m/s, 오름차순)
+        bounds = 1000 / np.asarray(PACE_ZONE_BOUNDS, dtype=np.float64)
+        pace_zones = _bin_seconds(v, bounds, dt, np.ones(len(v)))
+
+    if hr_zones is None and pace_zones is None:
+        return None
+    return ZoneTimeData(hr_zones=hr_zones, pace_zones=pace_zones)
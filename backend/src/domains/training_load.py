@@ -0,0 +1,79 @@
+"""훈련 부하
+
+- 세션 부하: Banister TRIMP (심박 예비율 기반). 심박 없으면 페이스로 추정
+- 일별 ATL (피로) / CTL (체력) 지수이동평균, TSB (컨디션) = 전날 CTL - 전날 ATL
+"""
+import math
+import numpy as np
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from config.constants import REST_HR, THRESHOLD_PACE, ATL_DAYS, CTL_DAYS
+from domains.stream_features import sample_durations
+from schemas.models import ActivityData, StreamArrays, TrainLoadData
+
+TRIMP_K = 1.92  # 남성 기준 계수 (여성 1.67)
+THRESHOLD_HRR = 0.85  # 역치 페이스에서의 심박 예비율 가정
+
+
+def _trimp_rate(hrr):
+    """분당 TRIMP"""
+    return hrr * 0.64 * np.exp(TRIMP_K * hrr)
+
+
+def session_load(activity:ActivityData, stream:Optional[StreamArrays],
+                 max_hr:float, rest_hr:float = REST_HR,
+                 threshold_pace:float = THRESHOLD_PACE) -> Optional[float]:
+    """세션 부하 (TRIMP)
+        1. 심박 스트림: 샘플별 심박 예비율로 적분
+        2. 평균 심박: 전체 시간 x 평균 심박 예비율
+        3. 심박 없음: 평균 속도 / 역치 속도로 심박 예비율 추정
+        return: 계산 불가면 None
+    """
+    hr_range = max_hr - rest_hr
+    if hr_range <= 0:
+        return None
+
+    if stream is not None and stream.heartrate is not None and len(stream.heartrate):
+        hr = stream.heartrate
+        minutes = sample_durations(stream, len(hr)) / 60
+        hrr = np.clip((hr - rest_hr) / hr_range, 0, 1)
+        # 결측(NaN) 샘플은 빼고 합산
+        return round(float(np.sum(np.where(hr > 0, minutes * _trimp_rate(hrr), 0.0))), 1)
+
+    if not activity.elapsed_time:
+        return None
+    minutes = activity.elapsed_time / 60
+
+    if activity.average_heartrate:
+        hrr = min(max((activity.average_heartrate - rest_hr) / hr_range, 0), 1)
+        return round(minutes * float(_trimp_rate(hrr)), 1)
+
+    if activity.average_speed:
+        intensity = activity.average_speed / (1000 / threshold_pace)
+        hrr = min(max(THRESHOLD_HRR * intensity, 0), 1)
+        return round(minutes * float(_trimp_rate(hrr)), 1)
+
+    return None
+
+
+def load_series(start:date, end:date, daily_loads:Dict[date, float],
+                atl:float = 0.0, ctl:float = 0.0) -> List[TrainLoadData]:
+    """[start, end] 일별 ATL/CTL/TSB
+        daily_loads: 날짜별 부하 합 (없는 날은 0)
+        atl, ctl: start 전날 값
+    """
+    a_atl = 1 - math.exp(-1 / ATL_DAYS)
+    a_ctl = 1 - math.exp(-1 / CTL_DAYS)
+
+    res = []
+    day = start
+    while day <= end:
+        load = daily_loads.get(day, 0.0)
+        tsb = ctl - atl
+        atl += (load - atl) * a_atl
+        ctl += (load - ctl) * a_ctl
+        res.append(TrainLoadData(day=day, load=load, atl=atl, ctl=ctl, tsb=tsb))
+        day += timedelta(days=1)
+    return res
+
@@ -1,7 +1,7 @@
 from uuid import UUID, uuid4
 from typing import Optional, List
-from datetime import datetime, timezone
-from sqlalchemy import Column, JSON, UniqueConstraint, DateTime
+from datetime import datetime, timezone, date
+from sqlalchemy import Column, JSON, LargeBinary, UniqueConstraint, DateTime, Index
 from sqlmodel import SQLModel, Field, Relationship
 
 # --- User ---
@@ -16,7 +16,11 @@ class User(SQLModel, table=True):
     user_info:List["UserInfo"] = Relationship(back_populates="user", cascade_delete=True)
     tokens: List["Token"] = Relationship(back_populates="user", cascade_delete=True)
     third_party_tokens: List["ThirdPartyToken"] = Relationship(back_populates="user", cascade_delete=True)
+    sync_states: List["SyncState"] = Relationship(back_populates="user", cascade_delete=True)
+    backfill_states: List["BackfillState"] = Relationship(back_populates="user", cascade_delete=True)
     train_sessions: List["TrainSession"] = Relationship(back_populates="user", cascade_delete=True)
+    train_loads: List["TrainLoad"] = Relationship(back_populates="user", cascade_delete=True)
+    physiology: Optional["PhysiologyProfile"] = Relationship(back_populates="user", cascade_delete=True)
     llms: List["LLM"] = Relationship(back_populates="user")
 
 class UserInfo(SQLModel, table=True):
@@ -51,8 +55,58 @@ class ThirdPartyToken(SQLModel, table=True):
 
     user: Optional["User"] = Relationship(back_populates="third_party_tokens")
     
+
+class SyncState(SQLModel, table=True):
+    # 사용자/플랫폼별 증분 동기화 커서
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    user_id: UUID = Field(foreign_key="user.id", index=True)
+    provider: str
+    last_activity_at: Optional[int] = None  # 마지막으로 받은 활동 시작시간 (UTC timestamp)
+    last_synced_at: Optional[datetime] = None  # 마지막 동기화 성공 시간
+    last_error: Optional[str] = None  # 마지막 동기화 실패 메시지
+
+    user: Optional["User"] = Relationship(back_populates="sync_states")
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "provider", name="uq_user_provider_sync"),
+    )
+
+
+class BackfillState(SQLModel, table=True):
+    # 전체 기록 가져오기 체크포인트. 페이지마다 갱신
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    user_id: UUID = Field(foreign_key="user.id", index=True)
+    provider: str
+    cursor: int = 0  # 처리 완료한 마지막 활동 시작시간 (UTC timestamp). 재시작시 여기부터
+    pages: int = 0
+    imported: int = 0  # 저장한 활동 수
+    status: str = "running"  # running / done / failed
+    started_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    updated_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+    user: Optional["User"] = Relationship(back_populates="backfill_states")
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "provider", name="uq_user_provider_backfill"),
+    )
     
 
+class PhysiologyProfile(SQLModel, table=True):
+    # 기록에서 추정한 분석 기준값 캐시. 새 세션 저장/사용자 정보 수정시 stale -> 다음 조회때 다시 계산
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    user_id: UUID = Field(foreign_key="user.id", unique=True)
+    max_hr: float
+    rest_hr: float
+    threshold_pace: float  # sec/km
+    source: str = "default"  # history / age / default
+    sessions: int = 0
+    stale: bool = False
+    updated_at: Optional[datetime] = None
+
+    user: Optional["User"] = Relationship(back_populates="physiology")
+
+
 class TrainSession(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     user_id: UUID = Field(foreign_key="user.id")
@@ -63,21 +117,33 @@ class TrainSession(SQLModel, table=True):
     distance:Optional[float] = None
     avg_speed: Optional[float] = None
     total_time: Optional[float] = None
+    average_heartrate: Optional[float] = None  # bpm. 재분석 입력
+    max_heartrate: Optional[float] = None
     activity_title: Optional[str] = None
     analysis_result: Optional[str] = None
+    training_load: Optional[float] = None  # 세션 부하 (TRIMP)
+    gap_speed: Optional[float] = None  # 경사 보정 평균 속도 (m/s)
+    elevation_gain: Optional[float] = None  # 누적 상승 (m)
+    analyzer_version: Optional[int] = None  # 분류한 분석기 버전. 이전 버전이면 재분석 대상
     
     user: Optional[User] = Relationship(back_populates="train_sessions")
     stream: Optional["TrainSessionStream"] = Relationship(back_populates="session", cascade_delete=True)
     laps: List["TrainSessionLap"] = Relationship(back_populates="session", cascade_delete=True)
+    zones: Optional["TrainSessionZone"] = Relationship(back_populates="session", cascade_delete=True)
+    best_efforts: List["BestEffort"] = Relationship(back_populates="session", cascade_delete=True)
     
     __table_args__ = (
         UniqueConstraint("provider", "activity_id", name="uq_provider_activity"),
+        # 사용자별 기간 목록 (날짜, id 순 keyset 페이지)
+        Index("ix_trainsession_user_date", "user_id", "train_date", "id"),
     )
     
 
 class TrainSessionStream(SQLModel, table=True):
-    # 스트림 데이터는 jsonstring 으로 저장
+    # 스트림 데이터는 바이너리 (infra.stream_codec) 로 저장
+    # json 컬럼은 이전 형식. migrate_streams 로 변환하면 비워짐
     session_id: UUID = Field(foreign_key="trainsession.id", primary_key=True)
+    data: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary))
     heartrate: Optional[List[float]] = Field(default=None, sa_column=Column(JSON))
     cadence: Optional[List[float]] = Field(default=None, sa_column=Column(JSON))
     distance: Optional[List[float]] = Field(default=None, sa_column=Column(JSON))
@@ -97,9 +163,62 @@ class TrainSessionLap(SQLModel, table=True):
     max_heartrate: Optional[float] = None
     average_cadence: Optional[float] = None
     elevation_gain:Optional[float] = None
+    gap_speed: Optional[float] = None  # 경사 보정 속도 (m/s)
     
     session: Optional[TrainSession] = Relationship(back_populates="laps")
     
+class TrainSessionZone(SQLModel, table=True):
+    # 존별 시간 (초). 수집시 스트림에서 계산, 기간 집계는 sql 로
+    session_id: UUID = Field(foreign_key="trainsession.id", primary_key=True)
+    user_id: UUID = Field(foreign_key="user.id", index=True)
+    hr_z1: Optional[int] = None
+    hr_z2: Optional[int] = None
+    hr_z3: Optional[int] = None
+    hr_z4: Optional[int] = None
+    hr_z5: Optional[int] = None
+    pace_z1: Optional[int] = None
+    pace_z2: Optional[int] = None
+    pace_z3: Optional[int] = None
+    pace_z4: Optional[int] = None
+    pace_z5: Optional[int] = None
+
+    session: Optional[TrainSession] = Relationship(back_populates="zones")
+
+class BestEffort(SQLModel, table=True):
+    # 세션별 거리별 최고 구간. 수집시 스트림에서 계산
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    user_id: UUID = Field(foreign_key="user.id")
+    session_id: UUID = Field(foreign_key="trainsession.id", index=True)
+    distance: int  # m
+    elapsed_time: float  # 초
+    start_offset: Optional[float] = None  # 활동 시작 후 구간 시작까지 (초)
+    train_date: datetime
+
+    session: Optional[TrainSession] = Relationship(back_populates="best_efforts")
+
+    __table_args__ = (
+        UniqueConstraint("session_id", "distance", name="uq_session_distance_effort"),
+        # 개인 기록 조회: 사용자/거리별 가장 빠른 기록
+        Index("ix_besteffort_user_distance_time", "user_id", "distance", "elapsed_time"),
+    )
+
+
+class TrainLoad(SQLModel, table=True):
+    # 일별 훈련 부하. 세션 저장시 해당 날짜 이후만 다시 계산
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    user_id: UUID = Field(foreign_key="user.id", index=True)
+    day: date  # 훈련 날짜 (train_date 기준)
+    load: float = 0.0
+    atl: float = 0.0
+    ctl: float = 0.0
+    tsb: float = 0.0
+
+    user: Optional[User] = Relationship(back_populates="train_loads")
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", name="uq_user_day_load"),
+    )
+
 class LLM(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     user_id: UUID = Field(foreign_key="user.id")
@@ -0,0 +1,35 @@
+"""실행된 sql 문 수 세기 (쿼리 수 회귀 확인용)
+
+    with count_queries() as counter:
+        await adapter.get_session_detail(...)
+    assert counter.count == 2
+"""
+from contextlib import contextmanager
+from typing import Iterator, List
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from infra.db.storage.session import engine as default_engine
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine:AsyncEngine = default_engine) -> Iterator[QueryCounter]:
+    """블록 안에서 engine 으로 실행된 sql 문 기록 (BEGIN/COMMIT 제외)"""
+    counter = QueryCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter._on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", counter._on_execute)
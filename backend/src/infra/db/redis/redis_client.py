@@ -0,0 +1,8 @@
+from redis.asyncio import Redis
+
+from config.settings import redis
+
+
+def create_redis() -> Redis:
+    """redis 클라이언트 생성. 종료는 호출한 쪽에서 aclose()"""
+    return Redis.from_url(redis.url, decode_responses=True)
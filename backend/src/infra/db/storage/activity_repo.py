@@ -1,69 +1,187 @@
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy import select, and_
-from uuid import UUID
-from typing import List
-from datetime import datetime
-
-from infra.db.orm.models import TrainSession, TrainSessionStream, TrainSessionLap
-from schemas.models import ActivityData, LapData, StreamData
+from sqlalchemy import select, and_, or_, update, insert, bindparam, func, null, tuple_, Row
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from uuid import UUID, uuid4
+from typing import Dict, List, Set, Optional, Tuple
+from datetime import datetime, timezone
+
+from infra.db.orm.models import TrainSession, TrainSessionStream, TrainSessionLap, TrainSessionZone, BestEffort, PhysiologyProfile
+from schemas.models import StreamArrays, ZoneTimeData, SessionBundle
+from infra.stream_codec import encode_stream, decode_stream
 from config.logger import get_logger
 
 logger = get_logger(__name__)
 
 # --- TrainSession ---
-async def add_train_session(db: AsyncSession,
-                            user_id:UUID, 
-                            activity:ActivityData,
-                            ) -> TrainSession:
-    try:
-        session = TrainSession(
-            user_id=user_id,
-            provider=activity.provider,
-            activity_id=activity.activity_id,
-            train_date=activity.start_date,
-            distance=activity.distance,
-            avg_speed=activity.average_speed,
-            total_time = activity.elapsed_time,
-            activity_title=activity.activity_title,
-            analysis_result=activity.analysis_result
+
+# 랩 insert 컬럼 (LapData 필드 = TrainSessionLap 컬럼)
+_LAP_FIELDS = {"lap_index", "distance", "elapsed_time", "average_speed", "max_speed",
+               "average_heartrate", "max_heartrate", "average_cadence", "elevation_gain", "gap_speed"}
+
+def _insert(db: AsyncSession, table):
+    """ON CONFLICT 지원 insert (postgres / sqlite)"""
+    if db.bind.dialect.name == "postgresql":
+        return pg_insert(table)
+    return sqlite_insert(table)
+
+async def add_train_sessions(db: AsyncSession,
+                             user_id:UUID,
+                             bundles:List[SessionBundle],
+                             commit:bool = True,
+                             ) -> List[Optional[UUID]]:
+    """세션 + 스트림/랩/존/최고 기록 한 트랜잭션으로 저장 (테이블마다 insert 1번)
+        이미 있는 활동 (provider, activity_id) 은 ON CONFLICT DO NOTHING 으로 건너뜀
+        commit: False 면 호출한 쪽에서 커밋 (같은 트랜잭션에서 이어서 작업)
+        return: bundles 순서대로 새 세션 id (건너뛴 활동은 None)
+    """
+    if not bundles:
+        return []
+    try:
+        # id 를 미리 만들어서 RETURNING 으로 실제 insert 된 것만 확인
+        ids = [uuid4() for _ in bundles]
+        table = TrainSession.__table__
+        res = await db.execute(
+            _insert(db, table)
+            .values([
+                {"id": session_id,
+                 "user_id": user_id,
+                 "provider": b.activity.provider,
+                 "activity_id": b.activity.activity_id,
+                 "created_at": datetime.now(timezone.utc).replace(tzinfo=None),
+                 "train_date": b.activity.start_date,
+                 "distance": b.activity.distance,
+                 "avg_speed": b.activity.average_speed,
+                 "total_time": b.activity.elapsed_time,
+                 "average_heartrate": b.activity.average_heartrate,
+                 "max_heartrate": b.activity.max_heartrate,
+                 "activity_title": b.activity.activity_title,
+                 "analysis_result": b.activity.analysis_result,
+                 "training_load": b.activity.training_load,
+                 "gap_speed": b.activity.gap_speed,
+                 "elevation_gain": b.activity.elevation_gain,
+                 "analyzer_version": b.activity.analyzer_version}
+                for session_id, b in zip(ids, bundles)
+            ])
+            .on_conflict_do_nothing(index_elements=["provider", "activity_id"])
+            .returning(table.c.id)
         )
-        
-        db.add(session)
-        await db.commit()
-        await db.refresh(session)
-        return session
-    except IntegrityError as e:
-        await db.rollback()
-        print(f"{session.activity_id} exist")
-        return None
-        # raise HTTPException(status_code=409,
-        #                     detail="session already exist")
-    
+        inserted = set(res.scalars().all())
+        saved = [(session_id, b) for session_id, b in zip(ids, bundles) if session_id in inserted]
+
+        if saved:
+            streams, laps, zones, efforts = [], [], [], []
+            for session_id, b in saved:
+                data = b.stream_data
+                if data is None and b.stream is not None:
+                    data = encode_stream(b.stream)
+                if data is not None:
+                    streams.append({"session_id": session_id, "data": data})
+                laps.extend({"id": uuid4(), "session_id": session_id, **lap.model_dump(include=_LAP_FIELDS)}
+                            for lap in b.laps)
+                if b.zones is not None:
+                    zones.append({"session_id": session_id, "user_id": user_id,
+                                  **_zone_values(b.zones)})
+                efforts.extend({"id": uuid4(), "user_id": user_id, "session_id": session_id,
+                                "distance": e.distance, "elapsed_time": e.elapsed_time,
+                                "start_offset": e.start_offset, "train_date": b.activity.start_date}
+                               for e in b.efforts or [])
+
+            for orm, rows in ((TrainSessionStream, streams), (TrainSessionLap, laps),
+                              (TrainSessionZone, zones), (BestEffort, efforts)):
+                if rows:
+                    await db.execute(insert(orm.__table__), rows)
+
+            # 기록이 늘었으니 분석 기준값 다시 계산
+            await db.execute(
+                update(PhysiologyProfile)
+                .where(PhysiologyProfile.user_id == user_id,
+                       PhysiologyProfile.stale.is_(False))
+                .values(stale=True)
+            )
+
+        if commit:
+            await db.commit()
+        return [session_id if session_id in inserted else None for session_id in ids]
     except Exception as e:
         logger.exception(str(e))
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
     
     
+# 목록 조회 컬럼 (TrainResponse 필드만)
+TRAIN_LIST_COLUMNS = (TrainSession.id, TrainSession.train_date, TrainSession.distance,
+                      TrainSession.avg_speed, TrainSession.total_time, TrainSession.activity_title,
+                      TrainSession.analysis_result, TrainSession.gap_speed, TrainSession.elevation_gain)
+
 async def get_train_session_by_date( db: AsyncSession, 
                                     user_id:UUID,
-                                    start_date:datetime = None
-                                    ) -> List[TrainSession] | None:
+                                    start_date:datetime = None,
+                                    end_date:Optional[datetime] = None,
+                                    after:Optional[Tuple[datetime, UUID]] = None,
+                                    limit:Optional[int] = None,
+                                    ) -> List[Row]:
+    """[start_date, end_date) 세션 목록 (날짜, id 순). ix_trainsession_user_date 인덱스
+        after: (train_date, id) 이 위치 다음부터 (keyset 페이지)
+        return: TRAIN_LIST_COLUMNS 행
+    """
     try:
+        query = select(*TRAIN_LIST_COLUMNS).where(TrainSession.user_id == user_id)
+        if start_date is not None:
+            query = query.where(TrainSession.train_date >= start_date)
+        if end_date is not None:
+            query = query.where(TrainSession.train_date < end_date)
+        if after is not None:
+            query = query.where(tuple_(TrainSession.train_date, TrainSession.id) > tuple_(*after))
+        query = query.order_by(TrainSession.train_date, TrainSession.id)
+        if limit is not None:
+            query = query.limit(limit)
+        
+        result = await db.execute(query)
+        return list(result.all())
+        
+        
+    except Exception as e:
+        logger.exception(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
 
+async def get_existing_activity_ids(db: AsyncSession,
+                                    provider:str,
+                                    activity_ids:List[int]
+                                    ) -> Set[int]:
+    """이미 저장된 activity_id 조회 (bulk)"""
+    if not activity_ids:
+        return set()
+    try:
         result = await db.execute(
-            select(TrainSession)
-            .where(TrainSession.user_id == user_id, 
-                   TrainSession.train_date >= start_date
+            select(TrainSession.activity_id)
+            .where(TrainSession.provider == provider,
+                   TrainSession.activity_id.in_(activity_ids)
                    )
-            .order_by(TrainSession.train_date)
             )
-        
-        return result.scalars().all()
-        
-        
+        return set(result.scalars().all())
+    
+    except Exception as e:
+        logger.exception(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def get_activity_owners(db: AsyncSession,
+                              provider:str,
+                              activity_ids:List[int]
+                              ) -> Dict[int, Tuple[UUID, UUID]]:
+    """activity_id -> (세션 id, 저장한 사용자 id) (저장 안된 활동은 빠짐)"""
+    if not activity_ids:
+        return {}
+    try:
+        result = await db.execute(
+            select(TrainSession.activity_id, TrainSession.id, TrainSession.user_id)
+            .where(TrainSession.provider == provider,
+                   TrainSession.activity_id.in_(activity_ids)
+                   )
+            )
+        return {activity_id: (session_id, user_id) for activity_id, session_id, user_id in result.all()}
+
     except Exception as e:
         logger.exception(str(e))
         raise HTTPException(status_code=400, detail=str(e))
@@ -84,6 +202,55 @@ async def get_train_sessions_by_user(user_id: UUID, db: AsyncSession) -> list[Tr
         logger.exception(str(e))
         raise HTTPException(status_code=400, detail=str(e))
 
+async def update_train_session_analysis(db: AsyncSession, results:List[dict]) -> int:
+    """분석 결과 일괄 업데이트 (세션 id 기준. 재분석용)
+        results: [{session_id, activity_title, analysis_result, analyzer_version}]
+        return: 업데이트된 행 수
+    """
+    if not results:
+        return 0
+    try:
+        # ORM bulk update 는 pk 조건만 지원 -> core 테이블로 executemany
+        table = TrainSession.__table__
+        res = await db.execute(
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(activity_title=bindparam("b_title"),
+                    analysis_result=bindparam("b_detail"),
+                    analyzer_version=bindparam("b_version")),
+            [
+                {"b_id": r["session_id"],
+                 "b_title": r["activity_title"],
+                 "b_detail": r["analysis_result"],
+                 "b_version": r["analyzer_version"]}
+                for r in results
+            ],
+        )
+        await db.commit()
+        return res.rowcount
+    except Exception as e:
+        logger.exception(str(e))
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def get_sessions_for_analysis(db: AsyncSession, version:Optional[int],
+                                    after_id:Optional[UUID], limit:int) -> List[TrainSession]:
+    """재분석 대상 세션 (id 순 keyset 페이지)
+        version: 이 버전보다 이전(또는 없음)인 세션만. None 이면 전부
+    """
+    try:
+        query = select(TrainSession)
+        if version is not None:
+            query = query.where(or_(TrainSession.analyzer_version.is_(None),
+                                    TrainSession.analyzer_version < version))
+        if after_id is not None:
+            query = query.where(TrainSession.id > after_id)
+        res = await db.execute(query.order_by(TrainSession.id).limit(limit))
+        return list(res.scalars().all())
+    except Exception as e:
+        logger.exception(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
 async def update_train_session(train_session: TrainSession, db: AsyncSession) -> TrainSession:
     try:
         db.add(train_session)
@@ -105,26 +272,12 @@ async def delete_train_session(train_session: TrainSession, db: AsyncSession) ->
         raise HTTPException(status_code=400, detail=str(e))
 
 # --- TrainSessionStream ---
-async def add_train_session_stream(db: AsyncSession, session_id:UUID, stream:StreamData) -> TrainSessionStream:
-    try:
-        # stream 데이터 json 형식으로 변환
-        data = TrainSessionStream(
-            session_id=session_id,
-            heartrate=stream.heartrate,
-            cadence=stream.cadence,
-            distance=stream.distance,
-            velocity=stream.velocity,
-            altitude=stream.altitude
-        )
-        
-        db.add(data)
-        await db.commit()
-        await db.refresh(data)
-        return data
-    except Exception as e:
-        logger.exception(str(e))
-        await db.rollback()
-        raise HTTPException(status_code=400, detail=str(e))
+def stream_row_to_arrays(row:TrainSessionStream, channels:Optional[List[str]] = None) -> StreamArrays:
+    """저장된 스트림 -> numpy 배열. 변환 전 행(json)도 읽음"""
+    if row.data is not None:
+        return decode_stream(row.data, channels=channels)
+    names = channels or ["heartrate", "cadence", "distance", "velocity", "altitude"]
+    return StreamArrays.from_lists(**{name: getattr(row, name) for name in names})
 
 async def get_train_session_stream(user_id:UUID, session_id: UUID, db: AsyncSession) -> TrainSessionStream :
     try:
@@ -145,6 +298,53 @@ async def get_train_session_stream(user_id:UUID, session_id: UUID, db: AsyncSess
         logger.exception(str(e))
         raise HTTPException(status_code=400, detail=str(e))
 
+async def get_streams_by_sessions(db: AsyncSession, session_ids:List[UUID]) -> List[TrainSessionStream]:
+    """여러 세션 스트림 한번에"""
+    if not session_ids:
+        return []
+    try:
+        res = await db.execute(
+            select(TrainSessionStream).where(TrainSessionStream.session_id.in_(session_ids))
+        )
+        return list(res.scalars().all())
+    except Exception as e:
+        logger.exception(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def get_json_streams(db: AsyncSession, after_id:Optional[UUID], limit:int) -> List[TrainSessionStream]:
+    """아직 json 형식인 스트림 (session_id 순 keyset 페이지). 바이너리 변환용"""
+    try:
+        query = select(TrainSessionStream).where(TrainSessionStream.data.is_(None))
+        if after_id is not None:
+            query = query.where(TrainSessionStream.session_id > after_id)
+        res = await db.execute(query.order_by(TrainSessionStream.session_id).limit(limit))
+        return list(res.scalars().all())
+    except Exception as e:
+        logger.exception(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def update_stream_blobs(db: AsyncSession, blobs:List[dict]) -> int:
+    """바이너리 스트림 일괄 저장, json 컬럼 비우기
+        blobs: [{session_id, data}]
+    """
+    if not blobs:
+        return 0
+    try:
+        table = TrainSessionStream.__table__
+        res = await db.execute(
+            update(table)
+            .where(table.c.session_id == bindparam("b_session_id"))
+            .values(data=bindparam("b_data"),
+                    heartrate=null(), cadence=null(), distance=null(), velocity=null(), altitude=null()),
+            [{"b_session_id": b["session_id"], "b_data": b["data"]} for b in blobs],
+        )
+        await db.commit()
+        return res.rowcount
+    except Exception as e:
+        logger.exception(str(e))
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
 async def update_train_session_stream(stream: TrainSessionStream, db: AsyncSession) -> TrainSessionStream:
     try:
         db.add(stream)
@@ -166,33 +366,33 @@ async def delete_train_session_stream(stream: TrainSessionStream, db: AsyncSessi
         raise HTTPException(status_code=400, detail=str(e))
 
 # --- TrainSessionLap ---
-async def add_train_session_lap(db: AsyncSession, session_id:UUID, laps: List[LapData]) -> List[TrainSessionLap]:
-    try:
-        rows = [
-            TrainSessionLap(
-                session_id=session_id,
-                lap_index=lap.lap_index,
-                distance=lap.distance,
-                elapsed_time=lap.elapsed_time,
-                average_speed=lap.average_speed,
-                max_speed=lap.max_speed,
-                average_heartrate=lap.average_heartrate,
-                max_heartrate=lap.max_heartrate,
-                average_cadence=lap.average_cadence,
-                elevation_gain=lap.elevation_gain
-            )
-            for lap in laps
-        ]
-        
-        
-        
-        db.add_all(rows)
-        await db.commit()
-
+async def get_train_session_detail(db: AsyncSession, user_id:UUID, session_id:UUID
+                                   ) -> Tuple[Optional[TrainSessionStream], Optional[TrainSessionZone], List[TrainSessionLap]]:
+    """세션 세부 (스트림, 존, 랩) 쿼리 2번
+        1. 세션 + 스트림 + 존 조인 (소유자 확인 겸)
+        2. 랩 (lap_index 순)
+    """
+    try:
+        res = await db.execute(
+            select(TrainSession.id, TrainSessionStream, TrainSessionZone)
+            .outerjoin(TrainSessionStream, TrainSessionStream.session_id == TrainSession.id)
+            .outerjoin(TrainSessionZone, TrainSessionZone.session_id == TrainSession.id)
+            .where(TrainSession.user_id == user_id, TrainSession.id == session_id)
+        )
+        row = res.one_or_none()
+        if row is None: # user id sessionid mismatch
+            raise HTTPException(status_code=400, detail="invalid session id")
 
+        laps = await db.execute(
+            select(TrainSessionLap)
+            .where(TrainSessionLap.session_id == session_id)
+            .order_by(TrainSessionLap.lap_index)
+        )
+        return row[1], row[2], list(laps.scalars().all())
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(str(e))
-        await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
 async def get_train_session_laps(user_id:UUID, session_id: UUID, db: AsyncSession) -> list[TrainSessionLap]:
@@ -209,6 +409,7 @@ async def get_train_session_laps(user_id:UUID, session_id: UUID, db: AsyncSessio
         res = await db.execute(
             select(TrainSessionLap)
             .where(TrainSessionLap.session_id == session_id)
+            .order_by(TrainSessionLap.lap_index)
             )
         return res.scalars().all()
     except HTTPException:
@@ -217,6 +418,21 @@ async def get_train_session_laps(user_id:UUID, session_id: UUID, db: AsyncSessio
         logger.exception(str(e))
         raise HTTPException(status_code=400, detail=str(e))
 
+async def get_laps_by_sessions(db: AsyncSession, session_ids:List[UUID]) -> List[TrainSessionLap]:
+    """여러 세션 랩 한번에 (세션, 랩 순서대로)"""
+    if not session_ids:
+        return []
+    try:
+        res = await db.execute(
+            select(TrainSessionLap)
+            .where(TrainSessionLap.session_id.in_(session_ids))
+            .order_by(TrainSessionLap.session_id, TrainSessionLap.lap_index)
+        )
+        return list(res.scalars().all())
+    except Exception as e:
+        logger.exception(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
 async def get_train_session_lap_by_id(lap_id: UUID, db: AsyncSession) -> TrainSessionLap | None:
     try:
         res = await db.execute(select(TrainSessionLap).where(TrainSessionLap.id == lap_id))
@@ -243,4 +459,44 @@ async def delete_train_session_lap(lap: TrainSessionLap, db: AsyncSession) -> No
     except Exception as e:
         logger.exception(str(e))
         await db.rollback()
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+# --- TrainSessionZone ---
+HR_ZONE_COLUMNS = ("hr_z1", "hr_z2", "hr_z3", "hr_z4", "hr_z5")
+PACE_ZONE_COLUMNS = ("pace_z1", "pace_z2", "pace_z3", "pace_z4", "pace_z5")
+
+def _zone_values(zones:ZoneTimeData) -> dict:
+    """존 컬럼 10개 전부 (없는 존은 None). bulk insert 는 행마다 키가 같아야 함"""
+    values = dict.fromkeys(HR_ZONE_COLUMNS + PACE_ZONE_COLUMNS)
+    if zones.hr_zones is not None:
+        values.update(zip(HR_ZONE_COLUMNS, zones.hr_zones))
+    if zones.pace_zones is not None:
+        values.update(zip(PACE_ZONE_COLUMNS, zones.pace_zones))
+    return values
+
+def zone_row_to_data(row:TrainSessionZone) -> ZoneTimeData:
+    hr = [getattr(row, c) for c in HR_ZONE_COLUMNS]
+    pace = [getattr(row, c) for c in PACE_ZONE_COLUMNS]
+    return ZoneTimeData(hr_zones=hr if hr[0] is not None else None,
+                        pace_zones=pace if pace[0] is not None else None)
+
+async def get_zone_totals(db: AsyncSession, user_id:UUID,
+                          start_date:datetime, end_date:datetime) -> dict:
+    """기간 내 존별 시간 합계 [start_date, end_date)
+        return: {sessions, hr_z1.., pace_z1..}
+    """
+    try:
+        cols = [func.coalesce(func.sum(getattr(TrainSessionZone, c)), 0).label(c)
+                for c in HR_ZONE_COLUMNS + PACE_ZONE_COLUMNS]
+        res = await db.execute(
+            select(func.count().label("sessions"), *cols)
+            .select_from(TrainSessionZone)
+            .join(TrainSession, TrainSession.id == TrainSessionZone.session_id)
+            .where(TrainSessionZone.user_id == user_id,
+                   TrainSession.train_date >= start_date,
+                   TrainSession.train_date < end_date)
+            )
+        return dict(res.one()._mapping)
+    except Exception as e:
+        logger.exception(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
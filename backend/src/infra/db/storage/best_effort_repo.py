@@ -0,0 +1,42 @@
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from uuid import UUID
+from typing import List, Optional
+from datetime import datetime
+
+from infra.db.orm.models import BestEffort
+from config.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+async def get_personal_records(db: AsyncSession,
+                               user_id: UUID,
+                               since: Optional[datetime] = None) -> List[BestEffort]:
+    """거리별 가장 빠른 기록 (쿼리 1번, user/distance/elapsed_time 인덱스)
+        since: 이 날짜 이후 기록만 (최근 기록 기준 예측용)
+    """
+    try:
+        conditions = [BestEffort.user_id == user_id]
+        if since is not None:
+            conditions.append(BestEffort.train_date >= since)
+
+        ranked = (
+            select(BestEffort.id,
+                   func.row_number().over(partition_by=BestEffort.distance,
+                                          order_by=(BestEffort.elapsed_time, BestEffort.train_date))
+                   .label("rank"))
+            .where(*conditions)
+            .subquery()
+        )
+        res = await db.execute(
+            select(BestEffort)
+            .join(ranked, ranked.c.id == BestEffort.id)
+            .where(ranked.c.rank == 1)
+            .order_by(BestEffort.distance)
+        )
+        return res.scalars().all()
+    except Exception as e:
+        logger.exception(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
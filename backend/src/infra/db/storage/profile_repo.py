@@ -0,0 +1,93 @@
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func
+from uuid import UUID
+from typing import Dict, List, Optional
+from datetime import datetime, timezone
+
+from infra.db.orm.models import PhysiologyProfile, TrainSession, TrainSessionLap
+from config.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+async def get_profile(db: AsyncSession, user_id: UUID) -> Optional[PhysiologyProfile]:
+    try:
+        res = await db.execute(
+            select(PhysiologyProfile).where(PhysiologyProfile.user_id == user_id)
+        )
+        return res.scalar_one_or_none()
+    except Exception as e:
+        logger.exception(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def get_max_hrs(db: AsyncSession, user_ids: List[UUID]) -> Dict[UUID, float]:
+    """사용자별 저장된 최대심박 (프로필 없는 사용자는 빠짐)"""
+    if not user_ids:
+        return {}
+    try:
+        res = await db.execute(
+            select(PhysiologyProfile.user_id, PhysiologyProfile.max_hr)
+            .where(PhysiologyProfile.user_id.in_(user_ids))
+        )
+        return {user_id: max_hr for user_id, max_hr in res.all()}
+    except Exception as e:
+        logger.exception(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def save_profile(db: AsyncSession, user_id: UUID, **values) -> PhysiologyProfile:
+    """추정값 저장. 없으면 생성, 있으면 덮어쓰기 (stale 해제)"""
+    try:
+        profile = await get_profile(db=db, user_id=user_id)
+        if profile is None:
+            profile = PhysiologyProfile(user_id=user_id, **values)
+        else:
+            for key, value in values.items():
+                setattr(profile, key, value)
+        profile.stale = False
+        profile.updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+        db.add(profile)
+        await db.commit()
+        return profile
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception(str(e))
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def mark_profile_stale(db: AsyncSession, user_id: UUID) -> None:
+    """캐시 무효화 (다음 조회때 다시 계산)"""
+    try:
+        await db.execute(
+            update(PhysiologyProfile)
+            .where(PhysiologyProfile.user_id == user_id,
+                   PhysiologyProfile.stale.is_(False))
+            .values(stale=True)
+        )
+        await db.commit()
+    except Exception as e:
+        logger.exception(str(e))
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def get_session_max_hrs(db: AsyncSession, user_id: UUID, since: datetime) -> List[float]:
+    """since 이후 세션별 최대심박 (랩 최대값)"""
+    try:
+        res = await db.execute(
+            select(func.max(TrainSessionLap.max_heartrate))
+            .join(TrainSession, TrainSession.id == TrainSessionLap.session_id)
+            .where(TrainSession.user_id == user_id,
+                   TrainSession.train_date >= since,
+                   TrainSessionLap.max_heartrate.is_not(None))
+            .group_by(TrainSessionLap.session_id)
+        )
+        return list(res.scalars().all())
+    except Exception as e:
+        logger.exception(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
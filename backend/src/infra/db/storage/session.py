@@ -1,8 +1,12 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy import inspect, text
 from config.settings import db
+from config.logger import get_logger
 from sqlmodel import SQLModel
 
+logger = get_logger(__name__)
+
 engine = create_async_engine(
     url=db.url,
     echo=db.echo,
@@ -18,6 +22,40 @@ AsyncSessionLocal = sessionmaker(
 async def create_db_and_tables() -> None:
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_add_missing_indexes)
+
+def _add_missing_columns(conn) -> None:
+    """create_all 은 기존 테이블에 컬럼을 추가하지 않음
+        모델에 새로 생긴 nullable 컬럼만 ALTER TABLE 로 추가 (not null 컬럼은 수동 마이그레이션)
+    """
+    insp = inspect(conn)
+    quote = conn.dialect.identifier_preparer.quote
+    for table in SQLModel.metadata.sorted_tables:
+        if not insp.has_table(table.name):
+            continue
+        existing = {c["name"] for c in insp.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                logger.warning(f"{table.name}.{column.name} is missing and not nullable. migrate manually")
+                continue
+            col_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {col_type}"))
+            logger.info(f"added column {table.name}.{column.name}")
+
+def _add_missing_indexes(conn) -> None:
+    """create_all 은 기존 테이블에 인덱스를 추가하지 않음 -> 모델에 새로 생긴 인덱스 생성"""
+    insp = inspect(conn)
+    for table in SQLModel.metadata.sorted_tables:
+        if not insp.has_table(table.name):
+            continue
+        existing = {i["name"] for i in insp.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(conn)
+                logger.info(f"added index {index.name}")
 
 async def close_db() -> None:
     await engine.dispose()
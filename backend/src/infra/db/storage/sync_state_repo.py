@@ -0,0 +1,95 @@
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from uuid import UUID
+from typing import Optional
+from datetime import datetime, timezone
+
+from infra.db.orm.models import SyncState, BackfillState
+from config.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+async def get_sync_state(db: AsyncSession,
+                         user_id: UUID,
+                         provider: str) -> Optional[SyncState]:
+    """사용자/플랫폼 동기화 상태 조회"""
+    try:
+        res = await db.execute(
+            select(SyncState).where(
+                SyncState.user_id == user_id,
+                SyncState.provider == provider
+            )
+        )
+        return res.scalar_one_or_none()
+    except Exception as e:
+        logger.exception(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def save_sync_state(db: AsyncSession,
+                          user_id: UUID,
+                          provider: str,
+                          **values) -> SyncState:
+    """동기화 상태 저장. 없으면 생성, 있으면 주어진 값만 업데이트"""
+    try:
+        state = await get_sync_state(db=db, user_id=user_id, provider=provider)
+        if state is None:
+            state = SyncState(user_id=user_id, provider=provider)
+
+        for key, value in values.items():
+            setattr(state, key, value)
+
+        db.add(state)
+        await db.commit()
+        return state
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception(str(e))
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# --- BackfillState ---
+async def get_backfill_state(db: AsyncSession,
+                             user_id: UUID,
+                             provider: str) -> Optional[BackfillState]:
+    """전체 기록 가져오기 체크포인트 조회"""
+    try:
+        res = await db.execute(
+            select(BackfillState).where(
+                BackfillState.user_id == user_id,
+                BackfillState.provider == provider
+            )
+        )
+        return res.scalar_one_or_none()
+    except Exception as e:
+        logger.exception(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def save_backfill_state(db: AsyncSession,
+                              user_id: UUID,
+                              provider: str,
+                              **values) -> BackfillState:
+    """체크포인트 저장. 없으면 생성, 있으면 주어진 값만 업데이트"""
+    try:
+        state = await get_backfill_state(db=db, user_id=user_id, provider=provider)
+        if state is None:
+            state = BackfillState(user_id=user_id, provider=provider)
+
+        for key, value in values.items():
+            setattr(state, key, value)
+        state.updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+        db.add(state)
+        await db.commit()
+        return state
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception(str(e))
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,93 @@
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+from uuid import UUID
+from typing import Dict, List, Optional
+from datetime import datetime, date, time
+
+from infra.db.orm.models import TrainLoad, TrainSession
+from schemas.models import TrainLoadData
+from config.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+async def get_load_before(db: AsyncSession,
+                          user_id: UUID,
+                          day: date) -> Optional[TrainLoad]:
+    """day 이전 마지막 일별 부하"""
+    try:
+        res = await db.execute(
+            select(TrainLoad)
+            .where(TrainLoad.user_id == user_id,
+                   TrainLoad.day < day)
+            .order_by(TrainLoad.day.desc())
+            .limit(1)
+        )
+        return res.scalar_one_or_none()
+    except Exception as e:
+        logger.exception(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def get_load_series(db: AsyncSession,
+                          user_id: UUID,
+                          start_day: date,
+                          end_day: date) -> List[TrainLoad]:
+    """저장된 일별 부하 [start_day, end_day)"""
+    try:
+        res = await db.execute(
+            select(TrainLoad)
+            .where(TrainLoad.user_id == user_id,
+                   TrainLoad.day >= start_day,
+                   TrainLoad.day < end_day)
+            .order_by(TrainLoad.day)
+        )
+        return res.scalars().all()
+    except Exception as e:
+        logger.exception(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def get_daily_session_loads(db: AsyncSession,
+                                  user_id: UUID,
+                                  since: date) -> Dict[date, float]:
+    """since 이후 세션 부하 날짜별 합"""
+    try:
+        res = await db.execute(
+            select(TrainSession.train_date, TrainSession.training_load)
+            .where(TrainSession.user_id == user_id,
+                   TrainSession.train_date >= datetime.combine(since, time.min),
+                   TrainSession.training_load.is_not(None))
+        )
+        loads: Dict[date, float] = {}
+        for train_date, load in res.all():
+            day = train_date.date()
+            loads[day] = loads.get(day, 0.0) + load
+        return loads
+    except Exception as e:
+        logger.exception(str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def replace_load_series(db: AsyncSession,
+                              user_id: UUID,
+                              since: date,
+                              series: List[TrainLoadData],
+                              commit: bool = True) -> None:
+    """since 이후 일별 부하 교체 (한 트랜잭션)
+        commit: False 면 호출한 쪽에서 커밋
+    """
+    try:
+        await db.execute(
+            delete(TrainLoad)
+            .where(TrainLoad.user_id == user_id,
+                   TrainLoad.day >= since)
+        )
+        db.add_all([TrainLoad(user_id=user_id, **row.model_dump()) for row in series])
+        if commit:
+            await db.commit()
+    except Exception as e:
+        logger.exception(str(e))
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
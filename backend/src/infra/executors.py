@@ -0,0 +1,85 @@
+"""cpu 작업용 공용 실행기
+
+앱 lifespan 에서 생성/종료. 이벤트 루프를 막지 않도록
+- 스레드 풀: GIL 을 놓는 작업 (복호화/암호화, 응답 디코딩, numpy 변환)
+- 프로세스 풀: 순수 파이썬 분석 (분류, 부하/존/기록 계산)
+
+시작 전(스크립트 등)에는 스레드 작업은 기본 스레드 풀, 프로세스 작업은 바로 실행.
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, TypeVar
+
+from config.settings import executor as config
+from config.logger import get_logger
+
+logger = get_logger(__file__)
+
+T = TypeVar("T")
+
+
+class ExecutorRegistry:
+    """스레드/프로세스 풀 보관"""
+
+    def __init__(self):
+        self._thread: Optional[ThreadPoolExecutor] = None
+        self._process: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        """풀 생성. process_workers 가 0 이면 프로세스 작업도 스레드 풀에서"""
+        self._thread = ThreadPoolExecutor(max_workers=max(1, config.thread_workers),
+                                          thread_name_prefix="cpu")
+        if config.process_workers > 0:
+            self._process = self._new_process_pool()
+
+    def _new_process_pool(self) -> ProcessPoolExecutor:
+        # fork 는 스레드 풀/aiosqlite/http 클라이언트 스레드가 잡고 있던 락까지 복사 -> 교착 가능
+        # 워커는 낮은 우선순위 -> 코어가 모자라도 api 프로세스(이벤트 루프)가 먼저 실행
+        return ProcessPoolExecutor(max_workers=config.process_workers,
+                                   mp_context=multiprocessing.get_context("forkserver"),
+                                   initializer=os.nice,
+                                   initargs=(config.process_nice,))
+
+    async def run_thread(self, fn:Callable[..., T], *args, **kwargs) -> T:
+        """GIL 을 놓는 작업"""
+        call = functools.partial(fn, *args, **kwargs)
+        if self._thread is None:
+            return await asyncio.to_thread(call)
+        return await asyncio.get_running_loop().run_in_executor(self._thread, call)
+
+    async def run_process(self, fn:Callable[..., T], *args, **kwargs) -> T:
+        """순수 파이썬 cpu 작업. fn/인자는 pickle 가능해야 함 (모듈 최상위 함수)"""
+        call = functools.partial(fn, *args, **kwargs)
+        if self._process is not None:
+            pool = self._process
+            try:
+                return await asyncio.get_running_loop().run_in_executor(pool, call)
+            except BrokenProcessPool:
+                # 워커 하나가 죽으면 풀 전체가 못 쓰게 됨 -> 새 풀로 바꾸고 한번만 다시 시도
+                self._replace_process_pool(pool)
+                return await asyncio.get_running_loop().run_in_executor(self._process, call)
+        if self._thread is not None:
+            return await asyncio.get_running_loop().run_in_executor(self._thread, call)
+        return call()
+
+    def _replace_process_pool(self, broken:ProcessPoolExecutor) -> None:
+        """깨진 풀 교체. 같은 풀로 실패한 다른 작업이 이미 바꿨으면 그대로"""
+        if self._process is not broken:
+            return
+        logger.warning("process pool broken, restarting workers")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._process = self._new_process_pool()
+
+    def close(self) -> None:
+        """풀 종료. 대기중인 작업은 취소"""
+        for pool in (self._process, self._thread):
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+        self._thread = self._process = None
+
+
+executors = ExecutorRegistry()
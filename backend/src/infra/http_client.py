@@ -0,0 +1,70 @@
+"""외부 api 호출용 공용 http 클라이언트
+
+앱 lifespan 에서 생성/종료. 호스트별로 커넥션풀을 공유해서
+매 요청마다 TCP/TLS 핸드셰이크 하지 않도록 함.
+"""
+import importlib.util
+from typing import Dict
+import httpx
+from fastapi import Request
+
+from config.settings import http_client as config
+from config.logger import get_logger
+
+logger = get_logger(__file__)
+
+# h2 패키지가 설치된 경우에만 http2 사용
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class HttpClientRegistry:
+    """호스트별 httpx.AsyncClient 보관"""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _build_client(self, read_timeout:float) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        )
+        timeout = httpx.Timeout(read_timeout, connect=config.connect_timeout)
+        return httpx.AsyncClient(
+            http2=config.http2 and HTTP2_AVAILABLE,
+            limits=limits,
+            timeout=timeout,
+        )
+
+    def start(self) -> None:
+        """클라이언트 생성"""
+        if config.http2 and not HTTP2_AVAILABLE:
+            logger.warning("h2 not installed. fallback to http/1.1")
+
+        self._clients["strava"] = self._build_client(config.strava_timeout)
+        self._clients["google"] = self._build_client(config.google_timeout)
+
+    def get(self, name:str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None:
+            raise RuntimeError(f"http client '{name}' not initialized")
+        return client
+
+    @property
+    def strava(self) -> httpx.AsyncClient:
+        return self.get("strava")
+
+    @property
+    def google(self) -> httpx.AsyncClient:
+        return self.get("google")
+
+    async def close(self) -> None:
+        """커넥션풀 종료"""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+# Dependency for FastAPI
+def get_http_clients(request:Request) -> HttpClientRegistry:
+    return request.app.state.http_clients
@@ -0,0 +1,236 @@
+"""수집(ingest) 작업 큐
+
+기본은 프로세스 내 asyncio 큐.
+INGEST_QUEUE_BACKEND=redis 면 redis 리스트/키로 여러 워커 프로세스가 공유.
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Dict, Optional, AsyncIterator
+from uuid import UUID, uuid4
+
+from fastapi import Request
+
+from config.settings import ingest
+from config.logger import get_logger
+from schemas.models import IngestJobData
+
+logger = get_logger(__file__)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class JobQueue(ABC):
+    """작업 큐 인터페이스"""
+
+    async def submit(self, user_id:UUID, start_date:Optional[int] = None,
+                     full_resync:bool = False, kind:str = "sync") -> IngestJobData:
+        """작업 생성 후 큐에 넣기
+            kind: sync (증분 동기화) / backfill (전체 기록)
+        """
+        job = IngestJobData(job_id=uuid4().hex,
+                            user_id=user_id,
+                            kind=kind,
+                            start_date=start_date,
+                            full_resync=full_resync,
+                            created_at=_now())
+        await self._save(job)
+        await self._push(job.job_id)
+        return job
+
+    async def update(self, job_id:str, **values) -> Optional[IngestJobData]:
+        """작업 상태 업데이트"""
+        job = await self.get(job_id)
+        if job is None:
+            return None
+        job = job.model_copy(update={**values, "updated_at": _now()})
+        await self._save(job)
+        return job
+
+    @abstractmethod
+    async def get(self, job_id:str) -> Optional[IngestJobData]:
+        """작업 상태 조회"""
+        ...
+
+    @abstractmethod
+    async def next_job(self, worker_id:str) -> IngestJobData:
+        """다음 작업 꺼내기 (없으면 대기). 끝나면 ack"""
+        ...
+
+    async def ack(self, worker_id:str, job_id:str) -> None:
+        """작업 끝 (성공/실패 상관없이). 처리중 목록에서 제거"""
+        ...
+
+    async def recover(self, worker_id:str) -> int:
+        """이 워커가 이전 실행에서 끝내지 못한 작업 다시 큐에. return: 다시 넣은 작업 수"""
+        return 0
+
+    @abstractmethod
+    def user_lock(self, user_id:UUID) -> AsyncIterator[None]:
+        """사용자별 직렬화 락 (async context manager)"""
+        ...
+
+    async def close(self) -> None:
+        ...
+
+    @abstractmethod
+    async def _save(self, job:IngestJobData) -> None:
+        ...
+
+    @abstractmethod
+    async def _push(self, job_id:str) -> None:
+        ...
+
+
+class InMemoryJobQueue(JobQueue):
+    """프로세스 내 asyncio 큐. 단일 워커 프로세스용"""
+
+    def __init__(self):
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._jobs: Dict[str, IngestJobData] = {}
+        self._locks: Dict[UUID, asyncio.Lock] = {}
+        self._lock_users: Dict[UUID, int] = {}  # 락을 잡고 있거나 기다리는 수
+
+    async def get(self, job_id:str) -> Optional[IngestJobData]:
+        return self._jobs.get(job_id)
+
+    async def next_job(self, worker_id:str) -> IngestJobData:
+        # 프로세스가 죽으면 큐도 같이 사라짐 -> ack/recover 없음
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return job
+
+    @asynccontextmanager
+    async def user_lock(self, user_id:UUID) -> AsyncIterator[None]:
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        self._lock_users[user_id] = self._lock_users.get(user_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            # 아무도 안 쓰면 정리 (사용자마다 락이 계속 쌓이지 않게)
+            self._lock_users[user_id] -= 1
+            if self._lock_users[user_id] == 0:
+                del self._lock_users[user_id]
+                del self._locks[user_id]
+
+    async def _save(self, job:IngestJobData) -> None:
+        self._jobs[job.job_id] = job
+        self._expire_old()
+
+    async def _push(self, job_id:str) -> None:
+        await self._queue.put(job_id)
+
+    def _expire_old(self) -> None:
+        """끝난지 job_ttl 지난 작업 정리"""
+        now = _now()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status in ("done", "failed")
+            and (now - (job.updated_at or job.created_at)).total_seconds() > ingest.job_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+class RedisJobQueue(JobQueue):
+    """redis 백엔드. 작업 상태는 키(TTL), 대기열은 리스트
+        꺼낸 작업은 워커별 처리중 리스트로 옮겨 둠 (BLMOVE) -> 끝나면 LREM.
+        워커가 작업 중에 죽으면 다시 시작할때 처리중 리스트를 큐로 되돌림
+    """
+
+    QUEUE_KEY = "ingest:queue"
+    PROCESSING_KEY = "ingest:processing:{}"
+    JOB_KEY = "ingest:job:{}"
+    LOCK_KEY = "ingest:lock:{}"
+    LOCK_TTL = 60  # 초. 연장은 1/3 마다
+
+    def __init__(self, client):
+        self.redis = client
+
+    async def get(self, job_id:str) -> Optional[IngestJobData]:
+        raw = await self.redis.get(self.JOB_KEY.format(job_id))
+        return IngestJobData.model_validate_json(raw) if raw else None
+
+    async def next_job(self, worker_id:str) -> IngestJobData:
+        processing = self.PROCESSING_KEY.format(worker_id)
+        while True:
+            # lpush 로 넣고 오른쪽에서 꺼냄 (먼저 넣은 순서)
+            job_id = await self.redis.blmove(self.QUEUE_KEY, processing, timeout=0,
+                                             src="RIGHT", dest="LEFT")
+            job = await self.get(job_id)
+            if job is not None:
+                return job
+            await self.redis.lrem(processing, 1, job_id)  # 상태가 만료된 작업
+
+    async def ack(self, worker_id:str, job_id:str) -> None:
+        await self.redis.lrem(self.PROCESSING_KEY.format(worker_id), 1, job_id)
+
+    async def recover(self, worker_id:str) -> int:
+        processing = self.PROCESSING_KEY.format(worker_id)
+        count = 0
+        # 다음에 바로 꺼내지도록 큐의 오른쪽 끝으로
+        while (job_id := await self.redis.lmove(processing, self.QUEUE_KEY, src="RIGHT", dest="RIGHT")) is not None:
+            await self.update(job_id, status="queued")
+            count += 1
+        return count
+
+    @asynccontextmanager
+    async def user_lock(self, user_id:UUID) -> AsyncIterator[None]:
+        # 워커 프로세스 간 공유되는 락. 워커가 죽으면 LOCK_TTL 후 풀림
+        # backfill 은 호출 한도 때문에 몇 시간 걸릴 수 있음 -> 작업하는 동안 주기적으로 연장
+        from redis.exceptions import LockError
+
+        lock = self.redis.lock(self.LOCK_KEY.format(user_id), timeout=self.LOCK_TTL)
+        await lock.acquire()
+        heartbeat = asyncio.create_task(self._keep_lock(lock))
+        try:
+            yield
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+            try:
+                await lock.release()
+            except LockError as e:
+                # 연장 실패로 만료 -> 다른 워커가 가져갔을 수 있음
+                logger.warning(f"user lock {user_id} already released: {e}")
+
+    async def _keep_lock(self, lock) -> None:
+        from redis.exceptions import LockError
+
+        while True:
+            await asyncio.sleep(self.LOCK_TTL / 3)
+            try:
+                await lock.reacquire()  # ttl 을 LOCK_TTL 로 다시 설정
+            except LockError as e:
+                logger.warning(f"lost user lock {lock.name}: {e}")
+                return
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+    async def _save(self, job:IngestJobData) -> None:
+        await self.redis.set(self.JOB_KEY.format(job.job_id),
+                             job.model_dump_json(),
+                             ex=ingest.job_ttl)
+
+    async def _push(self, job_id:str) -> None:
+        await self.redis.lpush(self.QUEUE_KEY, job_id)
+
+
+def create_job_queue() -> JobQueue:
+    """설정에 따라 큐 백엔드 생성"""
+    if ingest.queue_backend == "redis":
+        from infra.db.redis.redis_client import create_redis
+        return RedisJobQueue(create_redis())
+    return InMemoryJobQueue()
+
+
+# Dependency for FastAPI
+def get_job_queue(request:Request) -> JobQueue:
+    return request.app.state.job_queue
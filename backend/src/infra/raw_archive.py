@@ -0,0 +1,100 @@
+"""스트라바 원본 응답 보관소
+
+수집시 받은 원본 응답(activity, laps, streams)을 압축해서 로컬에 저장.
+분석 로직이 바뀌어도 다시 다운로드하지 않고 재처리 가능.
+
+- objects/ab/abcdef....zz : 원본 sha256 으로 저장 (같은 내용은 한번만)
+- index/{provider}/{activity_id}.json : {kind: sha256}
+"""
+import hashlib
+import json
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from config.settings import archive as config
+from config.logger import get_logger
+
+logger = get_logger(__file__)
+
+KINDS = ("activity", "laps", "streams")
+_INDEX_LOCKS = 64  # 인덱스 갱신 락 수 (활동 id 로 나눠 씀)
+
+
+class RawArchive:
+    def __init__(self, root:Path, level:int = 6):
+        self.root = Path(root)
+        self.level = level
+        # 같은 활동의 laps/streams 가 동시에 저장됨 -> 인덱스 읽고-고쳐-쓰기를 직렬화
+        # 폴더는 처음 저장할때 만듬
+        self._index_locks = [threading.Lock() for _ in range(_INDEX_LOCKS)]
+
+    # ------------------------
+    # 저장
+    # ------------------------
+    def put(self, provider:str, activity_id:int, kind:str, raw:bytes) -> str:
+        """원본 저장 후 해시 반환"""
+        digest = hashlib.sha256(raw).hexdigest()
+        obj = self._object_path(digest)
+        if not obj.exists():
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            self._write_atomic(obj, zlib.compress(raw, self.level))
+
+        with self._index_lock(provider, activity_id):
+            index = self.get_index(provider, activity_id)
+            if index.get(kind) != digest:
+                index[kind] = digest
+                path = self._index_path(provider, activity_id)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                self._write_atomic(path, json.dumps(index).encode())
+        return digest
+
+    # ------------------------
+    # 조회
+    # ------------------------
+    def get(self, provider:str, activity_id:int, kind:str) -> Optional[bytes]:
+        digest = self.get_index(provider, activity_id).get(kind)
+        if digest is None:
+            return None
+        try:
+            return zlib.decompress(self._object_path(digest).read_bytes())
+        except FileNotFoundError:
+            logger.warning(f"missing archive object {digest} ({provider}/{activity_id}/{kind})")
+            return None
+
+    def get_index(self, provider:str, activity_id:int) -> Dict[str, str]:
+        try:
+            return json.loads(self._index_path(provider, activity_id).read_bytes())
+        except FileNotFoundError:
+            return {}
+
+    def iter_activity_ids(self, provider:str) -> Iterator[int]:
+        """보관된 활동 id (정렬 안됨)"""
+        folder = self.root / "index" / provider
+        if not folder.exists():
+            return
+        for entry in os.scandir(folder):
+            if entry.name.endswith(".json"):
+                yield int(entry.name[:-5])
+
+    # ------------------------
+    def _object_path(self, digest:str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.zz"
+
+    def _index_path(self, provider:str, activity_id:int) -> Path:
+        return self.root / "index" / provider / f"{activity_id}.json"
+
+    def _index_lock(self, provider:str, activity_id:int) -> threading.Lock:
+        return self._index_locks[hash((provider, activity_id)) % len(self._index_locks)]
+
+    def _write_atomic(self, path:Path, data:bytes) -> None:
+        # 같은 객체를 여러 스레드가 동시에 쓸 수 있음 -> 임시 파일은 스레드마다
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+
+# 프로세스 공용 보관소. 설정에서 끄면 None (생성시 파일 io 없음)
+raw_archive: Optional[RawArchive] = RawArchive(config.path) if config.enabled else None
@@ -8,6 +8,7 @@ from fastapi.concurrency import run_in_threadpool
 from config.settings import security
 from config.exceptions import TokenInvalidError
 from config.logger import get_logger
+from infra.executors import executors
 
 logger = get_logger(__file__)
 
@@ -48,3 +49,10 @@ def decrypt_token(token_encrypted: str, key: bytes, token_type:str = None) -> st
         raise TokenInvalidError(status_code=401, detail="Invalid token")
     except Exception:
         raise TokenInvalidError(status_code=500, detail="Token decryption failed", token_type=token_type)
+
+# 동기화처럼 여러번 호출되는 경로는 cpu 풀에서 (loop 블로킹 피하기)
+async def encrypt_token_async(data: str, key: bytes, token_type:str = None) -> str:
+    return await executors.run_thread(encrypt_token, data, key, token_type)
+
+async def decrypt_token_async(token_encrypted: str, key: bytes, token_type:str = None) -> str:
+    return await executors.run_thread(decrypt_token, token_encrypted, key, token_type)
@@ -0,0 +1,149 @@
+"""스트라바 응답 디코딩
+
+응답 bytes 를 msgspec 으로 바로 구조체로 디코딩 (dict 중간 단계 없음).
+스트림 채널은 numpy 배열로 변환. pydantic 검증은 api 응답 단계에서만.
+"""
+from datetime import datetime
+from typing import List, Optional, Tuple
+import msgspec
+import numpy as np
+
+from schemas.models import ActivityData, LapData, StreamArrays
+
+
+# ------------------------
+# 스트라바 응답 구조체 (필요한 필드만. 나머지는 무시)
+# ------------------------
+class StravaActivity(msgspec.Struct):
+    id: int
+    elapsed_time: int
+    sport_type: str
+    start_date_local: datetime
+    start_date: Optional[datetime] = None
+    distance: Optional[float] = None
+    average_speed: Optional[float] = None
+    max_speed: Optional[float] = None
+    average_heartrate: Optional[float] = None
+    max_heartrate: Optional[float] = None
+    average_cadence: Optional[float] = None
+    total_elevation_gain: Optional[float] = None
+
+
+class StravaLap(msgspec.Struct):
+    lap_index: int
+    distance: float
+    elapsed_time: int
+    average_speed: float
+    max_speed: float
+    average_heartrate: Optional[float] = None
+    max_heartrate: Optional[float] = None
+    average_cadence: Optional[float] = None
+    total_elevation_gain: Optional[float] = None
+
+
+class StravaStreamChannel(msgspec.Struct):
+    data: List[float]
+
+
+class StravaStreams(msgspec.Struct):
+    """key_by_type=true 응답"""
+    heartrate: Optional[StravaStreamChannel] = None
+    cadence: Optional[StravaStreamChannel] = None
+    distance: Optional[StravaStreamChannel] = None
+    velocity_smooth: Optional[StravaStreamChannel] = None
+    altitude: Optional[StravaStreamChannel] = None
+    time: Optional[StravaStreamChannel] = None
+
+
+class _ActivityId(msgspec.Struct):
+    id: int
+
+
+# 디코더는 재사용 (타입 정보 미리 컴파일)
+_activities_decoder = msgspec.json.Decoder(List[StravaActivity])
+_activity_decoder = msgspec.json.Decoder(StravaActivity)
+_raw_list_decoder = msgspec.json.Decoder(List[msgspec.Raw])
+_activity_id_decoder = msgspec.json.Decoder(_ActivityId)
+_laps_decoder = msgspec.json.Decoder(List[StravaLap])
+_streams_decoder = msgspec.json.Decoder(StravaStreams)
+
+
+def _double(value:Optional[float]) -> Optional[float]:
+    """스트라바 케이던스는 한쪽 발 기준 -> spm"""
+    return value * 2 if value is not None else None
+
+
+def _channel(channel:Optional[StravaStreamChannel], scale:float = 1.0) -> Optional[np.ndarray]:
+    if channel is None:
+        return None
+    arr = np.asarray(channel.data, dtype=np.float64)
+    if scale != 1.0:
+        arr *= scale
+    return arr
+
+
+def _to_activity_data(a:StravaActivity, provider:str) -> ActivityData:
+    return ActivityData.model_construct(
+        activity_id=a.id,
+        provider=provider,
+        distance=a.distance,
+        elapsed_time=a.elapsed_time,
+        sport_type=a.sport_type,
+        start_date=a.start_date_local,
+        start_date_utc=a.start_date,
+        average_speed=a.average_speed,
+        max_speed=a.max_speed,
+        average_heartrate=a.average_heartrate,
+        max_heartrate=a.max_heartrate,
+        average_cadence=_double(a.average_cadence),
+        elevation_gain=a.total_elevation_gain,
+    )
+
+
+def decode_activities(raw:bytes, provider:str = "strava") -> List[ActivityData]:
+    """athlete/activities 응답 -> ActivityData 리스트"""
+    return [_to_activity_data(a, provider) for a in _activities_decoder.decode(raw)]
+
+
+def decode_activity(raw:bytes, provider:str = "strava") -> ActivityData:
+    """활동 하나 (보관된 원본) -> ActivityData"""
+    return _to_activity_data(_activity_decoder.decode(raw), provider)
+
+
+def split_activities(raw:bytes) -> List[Tuple[int, bytes]]:
+    """athlete/activities 응답을 활동별 원본 bytes 로 분리. 원본 보관용"""
+    return [
+        (_activity_id_decoder.decode(item).id, bytes(item))
+        for item in _raw_list_decoder.decode(raw)
+    ]
+
+
+def decode_laps(raw:bytes) -> List[LapData]:
+    """activities/{id}/laps 응답 -> LapData 리스트"""
+    return [
+        LapData.model_construct(
+            lap_index=lap.lap_index,
+            distance=lap.distance,
+            elapsed_time=lap.elapsed_time,
+            average_speed=lap.average_speed,
+            max_speed=lap.max_speed,
+            average_heartrate=lap.average_heartrate,
+            max_heartrate=lap.max_heartrate,
+            average_cadence=_double(lap.average_cadence),
+            elevation_gain=lap.total_elevation_gain,
+        )
+        for lap in _laps_decoder.decode(raw)
+    ]
+
+
+def decode_stream(raw:bytes) -> StreamArrays:
+    """activities/{id}/streams 응답 -> 채널별 numpy 배열"""
+    res = _streams_decoder.decode(raw)
+    return StreamArrays(
+        heartrate=_channel(res.heartrate),
+        cadence=_channel(res.cadence, scale=2.0),
+        distance=_channel(res.distance),
+        velocity=_channel(res.velocity_smooth),
+        altitude=_channel(res.altitude),
+        time=_channel(res.time),
+    )
@@ -0,0 +1,172 @@
+"""스트라바 api 호출 스케줄러
+
+스트라바는 앱 단위로 15분 / 하루 호출 한도가 있음.
+응답 헤더 X-RateLimit-Limit / X-RateLimit-Usage ("15분,하루") 로 현재 사용량을 알려줌.
+
+- 토큰 버킷으로 호출 속도 제한. 헤더의 남은 호출 수로 버킷 보정
+- 한도 도달시 다음 15분 구간 / 다음날(UTC)까지 대기
+- 429 응답시 지수 백오프 + jitter 후 재시도
+- 대기열은 우선순위(interactive > background) 별, 사용자별 라운드로빈
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+import httpx
+
+from config.settings import strava
+from config.logger import get_logger
+
+logger = get_logger(__file__)
+
+INTERACTIVE = 0  # 사용자 요청
+BACKGROUND = 1   # 백그라운드 동기화/백필
+
+SHORT_WINDOW = 15 * 60
+DAY = 24 * 60 * 60
+
+
+class StravaRateLimiter:
+    def __init__(self, short_limit:int, daily_limit:int,
+                 max_retries:int = 3, backoff_base:float = 2.0, backoff_max:float = 60.0):
+        self.short_limit = short_limit
+        self.daily_limit = daily_limit
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # 토큰 버킷 (15분 한도를 구간 내에 고르게 채움)
+        self.tokens = float(short_limit)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0  # monotonic. 한도 초과/429 시 대기
+
+        # 우선순위별 {user_key: 대기 future}, 라운드로빈 순서
+        self._waiters: Dict[int, Dict[str, Deque[asyncio.Future]]] = {INTERACTIVE: {}, BACKGROUND: {}}
+        self._order: Dict[int, Deque[str]] = {INTERACTIVE: deque(), BACKGROUND: deque()}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    # ------------------------
+    # 호출
+    # ------------------------
+    async def request(self, client:httpx.AsyncClient, method:str, url:str, *,
+                      user_key:str, priority:int = INTERACTIVE, **kwargs) -> httpx.Response:
+        """스케줄러를 거쳐 요청. 429 면 백오프 후 재시도, 재시도 초과시 마지막 응답 반환"""
+        attempt = 0
+        while True:
+            await self._acquire(user_key=user_key, priority=priority)
+            response = await client.request(method, url, **kwargs)
+            self._update_from_headers(response.headers)
+
+            if response.status_code != 429 or attempt >= self.max_retries:
+                return response
+
+            delay = min(self.backoff_max, self.backoff_base * (2 ** attempt)) * random.uniform(0.5, 1.5)
+            logger.warning(f"strava 429. retry {attempt + 1} after {delay:.1f}s")
+            self._block_for(delay)
+            attempt += 1
+
+    # ------------------------
+    # 대기열
+    # ------------------------
+    async def _acquire(self, user_key:str, priority:int) -> None:
+        fut = asyncio.get_running_loop().create_future()
+        waiters = self._waiters[priority]
+        if user_key not in waiters:
+            waiters[user_key] = deque()
+            self._order[priority].append(user_key)
+        waiters[user_key].append(fut)
+
+        self._dispatch()
+        await fut  # 취소된 future 는 _next_waiter 에서 건너뜀
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        for priority in (INTERACTIVE, BACKGROUND):
+            order = self._order[priority]
+            waiters = self._waiters[priority]
+            while order:
+                key = order.popleft()
+                queue = waiters[key]
+                while queue and queue[0].done():
+                    queue.popleft()
+                if not queue:
+                    del waiters[key]
+                    continue
+
+                fut = queue.popleft()
+                if queue:
+                    order.append(key)  # 라운드로빈: 다음 차례는 다른 사용자
+                else:
+                    del waiters[key]
+                return fut
+        return None
+
+    def _has_waiters(self) -> bool:
+        return any(self._order[p] for p in (INTERACTIVE, BACKGROUND))
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = time.monotonic()
+        self._refill(now)
+
+        while now >= self._blocked_until and self.tokens >= 1:
+            fut = self._next_waiter()
+            if fut is None:
+                return
+            self.tokens -= 1
+            fut.set_result(None)
+
+        if self._has_waiters():
+            # 다음 토큰이 생기거나 대기가 풀리는 시점에 다시 배분
+            refill_wait = (1 - self.tokens) * SHORT_WINDOW / self.short_limit if self.tokens < 1 else 0
+            wait = max(self._blocked_until - now, refill_wait, 0.01)
+            self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+
+    # ------------------------
+    # 한도 관리
+    # ------------------------
+    def _refill(self, now:float) -> None:
+        rate = self.short_limit / SHORT_WINDOW
+        self.tokens = min(float(self.short_limit), self.tokens + (now - self._last_refill) * rate)
+        self._last_refill = now
+
+    def _block_for(self, seconds:float) -> None:
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def _update_from_headers(self, headers:httpx.Headers) -> None:
+        """X-RateLimit-Limit: "200,2000", X-RateLimit-Usage: "10,150" """
+        limit = _parse_pair(headers.get("X-RateLimit-Limit"))
+        usage = _parse_pair(headers.get("X-RateLimit-Usage"))
+        if limit is None or usage is None:
+            return
+
+        self.short_limit, self.daily_limit = limit
+        short_usage, daily_usage = usage
+
+        # 다른 프로세스 사용량까지 반영해서 버킷 보정
+        self.tokens = min(self.tokens, float(max(0, self.short_limit - short_usage)))
+
+        now = time.time()
+        if daily_usage >= self.daily_limit:
+            self._block_for(DAY - now % DAY)  # 다음날 0시 (UTC)
+        elif short_usage >= self.short_limit:
+            self._block_for(SHORT_WINDOW - now % SHORT_WINDOW)  # 다음 15분 구간
+
+
+def _parse_pair(value:Optional[str]) -> Optional[tuple]:
+    if not value:
+        return None
+    try:
+        short, daily = (int(v) for v in value.split(","))
+        return short, daily
+    except ValueError:
+        return None
+
+
+# 프로세스 공용 스케줄러
+strava_rate_limiter = StravaRateLimiter(short_limit=strava.rate_limit_short,
+                                        daily_limit=strava.rate_limit_daily,
+                                        max_retries=strava.rate_limit_retries)
@@ -0,0 +1,136 @@
+"""스트림 저장 포맷 (바이너리, 채널별 컬럼)
+
+json 리스트 대신 채널마다 고정 배율로 정수화 -> 차분 -> 가장 작은 정수형으로 묶어서 zlib 압축.
+읽을때는 바로 numpy 배열로 복원 (파이썬 float 객체 생성 없음)
+
+    header  : magic "STRM", version(B), flags(B), 채널 수(H), 샘플 수(I)
+    채널마다: 채널 id(B), dtype 코드(B), 바이트 수(I)
+    body    : 채널 데이터 순서대로 (flags & COMPRESSED 면 body 전체 zlib)
+
+결측(NaN)이 있는 채널은 dtype 코드에 HAS_MASK 비트 (version 2).
+이 채널 데이터 = 샘플 수(I) + 유효 비트마스크 (packbits) + 차분. 결측 자리는 직전 값으로 채워서 저장
+"""
+import struct
+import zlib
+import numpy as np
+from typing import Iterable, Optional
+
+from schemas.models import StreamArrays
+
+MAGIC = b"STRM"
+CODEC_VERSION = 2
+COMPRESSED = 0x01
+HAS_MASK = 0x80  # dtype 코드 비트. 채널에 결측 있음
+
+_HEADER = struct.Struct("<4sBBHI")
+_ENTRY = struct.Struct("<BBI")
+_COUNT = struct.Struct("<I")
+
+# 채널 id: (이름, 배율). 배율만큼 곱해서 정수로 저장 (스트라바 원본 정밀도 이상)
+CHANNELS = {
+    1: ("heartrate", 10),   # 0.1 bpm
+    2: ("cadence", 10),     # 0.1 spm
+    3: ("distance", 10),    # 0.1 m
+    4: ("velocity", 1000),  # mm/s
+    5: ("altitude", 10),    # 0.1 m
+    6: ("time", 10),        # 0.1 초
+}
+_CHANNEL_IDS = {name: (cid, scale) for cid, (name, scale) in CHANNELS.items()}
+_DTYPES = {1: np.dtype("<i1"), 2: np.dtype("<i2"), 4: np.dtype("<i4"), 8: np.dtype("<i8")}
+
+
+def _pack_channel(values:np.ndarray, scale:int) -> tuple:
+    """배율 정수화 -> 차분 -> 값 범위에 맞는 가장 작은 정수형
+        결측이 있으면 유효 마스크를 앞에 붙이고 코드에 HAS_MASK
+    """
+    valid = np.isfinite(values)
+    mask = b""
+    if not valid.all():
+        # 결측은 직전 유효값으로 (차분이 커지지 않게). 앞쪽 결측은 0
+        last = np.maximum.accumulate(np.where(valid, np.arange(len(values)), 0))
+        values = np.where(valid[last], values[last], 0.0)
+        mask = _COUNT.pack(len(valid)) + np.packbits(valid).tobytes()
+
+    q = np.rint(values * scale).astype(np.int64)
+    delta = np.diff(q, prepend=0)
+    for code, dtype in _DTYPES.items():
+        info = np.iinfo(dtype)
+        if len(delta) == 0 or (delta.min() >= info.min and delta.max() <= info.max):
+            if mask:
+                return code | HAS_MASK, mask + delta.astype(dtype).tobytes()
+            return code, delta.astype(dtype).tobytes()
+    raise ValueError("stream value out of range")
+
+
+def _unpack_channel(body, pos:int, code:int, size:int, scale:int) -> np.ndarray:
+    valid = None
+    if code & HAS_MASK:
+        code &= ~HAS_MASK
+        (n,) = _COUNT.unpack_from(body, pos)
+        mask_size = (n + 7) // 8
+        valid = np.unpackbits(np.frombuffer(body, dtype=np.uint8, count=mask_size,
+                                            offset=pos + _COUNT.size), count=n).astype(bool)
+        pos += _COUNT.size + mask_size
+        size -= _COUNT.size + mask_size
+
+    delta = np.frombuffer(body, dtype=_DTYPES[code], count=size // code, offset=pos)
+    values = np.cumsum(delta, dtype=np.int64) / scale
+    if valid is not None:
+        values[~valid] = np.nan
+    return values
+
+
+def encode_stream(stream:StreamArrays, compress:bool = True) -> bytes:
+    """StreamArrays -> 저장용 bytes"""
+    entries, payloads = [], []
+    n = 0
+    masked = False
+    for name, (cid, scale) in _CHANNEL_IDS.items():
+        values = getattr(stream, name)
+        if values is None:
+            continue
+        n = max(n, len(values))
+        code, payload = _pack_channel(np.asarray(values, dtype=np.float64), scale)
+        masked |= bool(code & HAS_MASK)
+        entries.append(_ENTRY.pack(cid, code, len(payload)))
+        payloads.append(payload)
+
+    body = b"".join(payloads)
+    flags = 0
+    if compress:
+        body = zlib.compress(body, 6)
+        flags |= COMPRESSED
+    # 결측 없으면 version 1 로 (이전 버전 코드로도 읽을 수 있게)
+    version = CODEC_VERSION if masked else 1
+    return _HEADER.pack(MAGIC, version, flags, len(entries), n) + b"".join(entries) + body
+
+
+def decode_stream(raw:bytes, channels:Optional[Iterable[str]] = None) -> StreamArrays:
+    """저장된 bytes -> StreamArrays (float64)
+        channels: 이 채널만 복원 (None 이면 전부)
+    """
+    magic, version, flags, count, _ = _HEADER.unpack_from(raw, 0)
+    if magic != MAGIC:
+        raise ValueError("not a stream blob")
+    if version > CODEC_VERSION:
+        raise ValueError(f"unsupported stream codec version {version}")
+
+    offset = _HEADER.size
+    entries = []
+    for _ in range(count):
+        entries.append(_ENTRY.unpack_from(raw, offset))
+        offset += _ENTRY.size
+
+    body = memoryview(raw)[offset:]
+    if flags & COMPRESSED:
+        body = zlib.decompress(body)
+
+    wanted = set(channels) if channels is not None else None
+    out = StreamArrays()
+    pos = 0
+    for cid, code, size in entries:
+        name, scale = CHANNELS[cid]
+        if wanted is None or name in wanted:
+            setattr(out, name, _unpack_channel(body, pos, code, size, scale))
+        pos += size
+    return out
@@ -2,7 +2,8 @@ from .auth.auth import router as authR
 from .profile import router as profileR
 from .ai import router as aiR
 from .train_session import router as trainsessionR
+from .admin import router as adminR
 
 
 
-routers = [authR, profileR, aiR, trainsessionR]
\ No newline at end of file
+routers = [authR, profileR, aiR, trainsessionR, adminR]
\ No newline at end of file
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from uuid import UUID
+import hmac
+
+from adapters import TrainingAdapter
+from config.settings import admin
+from infra.db.storage.session import get_session
+from infra.job_queue import JobQueue, get_job_queue
+from schemas.models import IngestJobData, BackfillStateData
+from use_cases.train_session.handle_train_session import SYNC_PROVIDER
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+async def verify_admin(x_admin_key:str = Header(default="")) -> None:
+    """X-Admin-Key 헤더 검증"""
+    if not admin.api_key or not hmac.compare_digest(x_admin_key, admin.api_key):
+        raise HTTPException(status_code=403, detail="forbidden")
+
+
+# 사용자 전체 기록 가져오기 (백그라운드)
+@router.post("/backfill/{user_id}", dependencies=[Depends(verify_admin)])
+async def submit_backfill(
+    user_id:UUID,
+    queue:JobQueue=Depends(get_job_queue)) -> IngestJobData:
+    
+    return await queue.submit(user_id=user_id, kind="backfill")
+
+# 전체 기록 가져오기 체크포인트
+@router.get("/backfill/{user_id}", dependencies=[Depends(verify_admin)])
+async def get_backfill(
+    user_id:UUID,
+    db:AsyncSession=Depends(get_session)) -> Optional[BackfillStateData]:
+    
+    return await TrainingAdapter(db=db).get_backfill_state(user_id=user_id, provider=SYNC_PROVIDER)
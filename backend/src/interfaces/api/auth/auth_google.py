@@ -16,6 +16,7 @@ import urllib.parse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from infra.db.storage.session import get_session
+from infra.http_client import HttpClientRegistry, get_http_clients
 from schemas.models import LoginResponse
 from adapters.account_adapter import AccountAdapter
 from adapters.token_adapter import TokenAdapter
@@ -24,11 +25,13 @@ from config.settings import google
 
 google_router = APIRouter(prefix="/google", tags=['auth-google'])
 
-def get_handler(db:AsyncSession=Depends(get_session))->GoogleHandler:
+def get_handler(db:AsyncSession=Depends(get_session),
+                http_clients:HttpClientRegistry=Depends(get_http_clients))->GoogleHandler:
     return GoogleHandler(
         account_adapter=AccountAdapter(db),
         token_adapter=TokenAdapter(),
-        db=db
+        db=db,
+        client=http_clients.google
     )
 
 @google_router.get("/login")
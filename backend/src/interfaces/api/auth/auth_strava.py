@@ -5,6 +5,7 @@ import urllib.parse
 
 from use_cases.auth.dependencies import get_current_user, validate_current_user
 from infra.db.storage.session import get_session
+from infra.http_client import HttpClientRegistry, get_http_clients
 from config.logger import get_logger
 from config.exceptions import TokenError
 from use_cases.auth.auth_strava import StravaHandler
@@ -17,10 +18,11 @@ token_adapter = TokenAdapter()
 logger = get_logger(__file__)
 
 
-def get_handler(db:AsyncSession=Depends(get_session))->StravaHandler:
+def get_handler(db:AsyncSession=Depends(get_session),
+                http_clients:HttpClientRegistry=Depends(get_http_clients))->StravaHandler:
     return StravaHandler(
         db=db,
-        adapter=StravaAdapter(db),
+        adapter=StravaAdapter(db, client=http_clients.strava),
     )
 
 @strava_router.get("/connect")
@@ -1,21 +1,25 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import Optional, List
 from uuid import UUID
 
 from adapters import StravaAdapter, TrainingAdapter
 from infra.db.storage.session import get_session
+from infra.http_client import HttpClientRegistry, get_http_clients
+from infra.job_queue import JobQueue, get_job_queue
 from use_cases.train_session.handle_train_session import TrainSessionHandler
-from schemas.models import TokenPayload
+from schemas.models import TokenPayload, TrainResponse, IngestJobData, ZoneSummaryResponse, TrainLoadData, PersonalRecordsResponse, PhysiologyProfileData
 from use_cases.auth.dependencies import get_current_user
 from use_cases.auth.auth_strava import StravaHandler
+from config.constants import SCHEDULE_PAGE_SIZE
 
 
 router = APIRouter(prefix="/trainsession", tags=['train-session'])
 
 
-def get_handler(db:AsyncSession=Depends(get_session))->TrainSessionHandler:
-    data_adapter = StravaAdapter(db=db)
+def get_handler(db:AsyncSession=Depends(get_session),
+                http_clients:HttpClientRegistry=Depends(get_http_clients))->TrainSessionHandler:
+    data_adapter = StravaAdapter(db=db, client=http_clients.strava)
     training_adapter = TrainingAdapter(db=db)
     auth_handler = StravaHandler(db=db, adapter=data_adapter)
     return TrainSessionHandler(
@@ -25,22 +29,96 @@ def get_handler(db:AsyncSession=Depends(get_session))->TrainSessionHandler:
     )
 
 # 스케줄 새로 로드
+# date 없으면 마지막 동기화 이후부터. full_resync=true 면 커서 무시
 @router.get("/fetch-new-schedules")
 async def fetch_schedule(
     date:Optional[int] = None,
+    full_resync:bool = False,
     payload: TokenPayload = Depends(get_current_user),
     handler:TrainSessionHandler=Depends(get_handler)):
     
-    return await handler.fetch_new_schedules(payload=payload, start_date=date)
+    return await handler.fetch_new_schedules(payload=payload, start_date=date, full_resync=full_resync)
 
-# 스케줄 불러오기
+# 스케줄 새로 로드 (백그라운드). 작업 id 바로 반환
+@router.post("/jobs")
+async def submit_fetch_job(
+    date:Optional[int] = None,
+    full_resync:bool = False,
+    payload: TokenPayload = Depends(get_current_user),
+    queue:JobQueue=Depends(get_job_queue)) -> IngestJobData:
+    
+    return await queue.submit(user_id=payload.user_id, start_date=date, full_resync=full_resync)
+
+# 백그라운드 작업 상태
+@router.get("/jobs/{job_id}")
+async def get_fetch_job(
+    job_id:str,
+    payload: TokenPayload = Depends(get_current_user),
+    queue:JobQueue=Depends(get_job_queue)) -> IngestJobData:
+    
+    job = await queue.get(job_id)
+    if job is None or job.user_id != payload.user_id:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job
+
+# 스케줄 불러오기. [date, end_date), 기본 최근 14일
+# 날짜순 limit 개씩. 다음 페이지가 있으면 X-Next-Cursor 헤더 -> cursor 로 다시 요청
 @router.get("/fetch-schedules")
 async def fetch_schedule(
+    response:Response,
     date:Optional[int] = None,
+    end_date:Optional[int] = None,
+    cursor:Optional[str] = None,
+    limit:int = SCHEDULE_PAGE_SIZE,
     payload: TokenPayload = Depends(get_current_user),
-    handler:TrainSessionHandler=Depends(get_handler)):
+    handler:TrainSessionHandler=Depends(get_handler)) -> List[TrainResponse]:
     
-    return await handler.get_schedules(payload=payload, start_date=date)
+    page = await handler.get_schedules(payload=payload, start_date=date, end_date=end_date,
+                                       cursor=cursor, limit=limit)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page.sessions
+
+# 기간 내 심박/페이스 존별 시간 (초). [date, end_date), 기본 최근 14일
+@router.get("/zones")
+async def fetch_zone_summary(
+    date:Optional[int] = None,
+    end_date:Optional[int] = None,
+    payload: TokenPayload = Depends(get_current_user),
+    handler:TrainSessionHandler=Depends(get_handler)) -> ZoneSummaryResponse:
+    
+    return await handler.get_zone_summary(payload=payload, start_date=date, end_date=end_date)
+
+
+# 일별 훈련 부하 (ATL 피로 / CTL 체력 / TSB 컨디션). [date, end_date), 기본 최근 42일
+@router.get("/load")
+async def fetch_load_series(
+    date:Optional[int] = None,
+    end_date:Optional[int] = None,
+    payload: TokenPayload = Depends(get_current_user),
+    handler:TrainSessionHandler=Depends(get_handler)) -> List[TrainLoadData]:
+    
+    return await handler.get_load_series(payload=payload, start_date=date, end_date=end_date)
+
+
+# 거리별 개인 기록 (400m ~ 하프) + 기록 예측. date 있으면 그 이후 기록만
+@router.get("/records")
+async def fetch_personal_records(
+    date:Optional[int] = None,
+    payload: TokenPayload = Depends(get_current_user),
+    handler:TrainSessionHandler=Depends(get_handler)) -> PersonalRecordsResponse:
+    
+    return await handler.get_personal_records(payload=payload, since=date)
+
+
+# 분석 기준값 (최대심박, 안정시 심박, 역치 페이스). 기록에서 추정, 부족하면 나이 기반
+@router.get("/profile")
+async def fetch_physiology_profile(
+    payload: TokenPayload = Depends(get_current_user),
+    handler:TrainSessionHandler=Depends(get_handler)) -> PhysiologyProfileData:
+    
+    return await handler.get_physiology_profile(payload=payload)
+
 
 
 # 스케줄 세부 정보
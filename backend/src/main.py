@@ -4,12 +4,34 @@ from contextlib import asynccontextmanager
 from interfaces.api import routers
 from config import settings
 from infra.db.storage.session import create_db_and_tables, close_db
+from infra.http_client import HttpClientRegistry
+from infra.executors import executors
+from infra.job_queue import create_job_queue
+from use_cases.train_session.ingest_worker import IngestWorkerPool
 
 @asynccontextmanager
 async def lifespan(app:FastAPI):
     ## db 시작
     await create_db_and_tables()
+    ## 공용 http 클라이언트
+    app.state.http_clients = HttpClientRegistry()
+    app.state.http_clients.start()
+    ## cpu 작업 스레드/프로세스 풀
+    executors.start()
+    ## 백그라운드 동기화 큐/워커
+    app.state.job_queue = create_job_queue()
+    workers = IngestWorkerPool(queue=app.state.job_queue,
+                               http_clients=app.state.http_clients,
+                               workers=settings.ingest.workers)
+    workers.start()
     yield
+    ## 워커 종료
+    await workers.stop()
+    await app.state.job_queue.close()
+    ## cpu 작업 풀 종료
+    executors.close()
+    ## http 클라이언트 종료
+    await app.state.http_clients.close()
     ## db 종료
     await close_db()
 
@@ -24,6 +46,7 @@ app.add_middleware(
     allow_credentials=settings.cors.credentials,
     allow_methods=settings.cors.methods,
     allow_headers=settings.cors.headers,
+    expose_headers=["X-Next-Cursor"],  # 세션 목록 다음 페이지
 )
     
     
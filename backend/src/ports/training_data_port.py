@@ -1,8 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Optional, List, AsyncIterator
 from uuid import UUID
 
-from schemas.models import LapData, StreamData, ActivityData
+from schemas.models import LapData, StreamArrays, ActivityData
 from infra.db.orm.models import ThirdPartyToken
 
 class TrainingDataPort(ABC):
@@ -27,9 +27,14 @@ class TrainingDataPort(ABC):
     async def fetch_activities(self, access_token:str, after_date: int = None) -> List[ActivityData]:
         """서드파티 기간내 모든 훈련 활동 데이터 리스트 가져오기"""
         ...
+    
+    @abstractmethod
+    def iter_activities(self, access_token:str, after_date: int = None) -> AsyncIterator[List[ActivityData]]:
+        """서드파티 기간내 훈련 활동 데이터를 페이지 단위로 가져오기 (async generator)"""
+        ...
         
     @abstractmethod
-    async def fetch_activity_stream(self, access_token: str, activity_id:int) -> StreamData:
+    async def fetch_activity_stream(self, access_token: str, activity_id:int) -> StreamArrays:
         """서드파티 훈련 활동의 스트림 데이터 가져오기"""
         ...
 
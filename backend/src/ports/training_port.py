@@ -1,29 +1,88 @@
 """훈련 데이터 db 핸들링 포트"""
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from typing import Dict, List, Tuple, Set, Optional
 from uuid import UUID
 
 from schemas.models import (ActivityData, 
                             LapData, 
                             StreamData, 
+                            StreamArrays,
                             TrainResponse, 
-                            TrainDetailResponse)
+                            TrainDetailResponse,
+                            SyncStateData,
+                            BackfillStateData,
+                            ZoneTimeData,
+                            ZoneSummaryResponse,
+                            TrainLoadData,
+                            BestEffortData,
+                            PersonalRecordsResponse,
+                            PhysiologyProfileData,
+                            SessionBundle,
+                            TrainSessionPage)
 
 class TrainingPort(ABC):
     @abstractmethod
     async def save_session(self, user_id:UUID, 
                      activity:ActivityData,
                      laps:List[LapData],
-                     stream:StreamData
+                     stream:StreamArrays,
+                     zones:Optional[ZoneTimeData] = None,
+                     efforts:Optional[List[BestEffortData]] = None
                      )->bool:
-        """훈련 세션  (TrainSession , Stream, Lap) 저장 """
+        """훈련 세션  (TrainSession , Stream, Lap, Zone, BestEffort) 저장 """
+        ...
+        
+    @abstractmethod
+    async def save_sessions(self, user_id:UUID, bundles:List[SessionBundle]) -> List[bool]:
+        """여러 훈련 세션 한번에 저장 (한 트랜잭션). bundles 순서대로 저장 여부"""
+        ...
+        
+    @abstractmethod
+    async def get_existing_activity_ids(self, provider:str, activity_ids:List[int]) -> Set[int]:
+        """이미 저장된 활동 id 조회"""
+        ...
+        
+    @abstractmethod
+    async def get_sync_state(self, user_id:UUID, provider:str) -> Optional[SyncStateData]:
+        """플랫폼 동기화 상태 (커서) 조회"""
+        ...
+        
+    @abstractmethod
+    async def save_sync_state(self, user_id:UUID, provider:str, **values) -> None:
+        """플랫폼 동기화 상태 저장"""
+        ...
+        
+    @abstractmethod
+    async def get_backfill_state(self, user_id:UUID, provider:str) -> Optional[BackfillStateData]:
+        """전체 기록 가져오기 체크포인트 조회"""
+        ...
+        
+    @abstractmethod
+    async def save_backfill_state(self, user_id:UUID, provider:str, **values) -> None:
+        """전체 기록 가져오기 체크포인트 저장"""
+        ...
+        
+    @abstractmethod
+    async def get_activity_sessions(self, provider:str, activity_ids:List[int]) -> Dict[int, Tuple[UUID, float]]:
+        """activity_id -> (세션 id, 저장한 사용자의 최대심박) (저장 안된 활동은 빠짐). 원본 재분석용"""
+        ...
+        
+    @abstractmethod
+    async def get_sessions_for_analysis(self, version:Optional[int], after_id:Optional[UUID],
+                                        limit:int) -> List[Tuple[UUID, float, ActivityData, List[LapData], StreamArrays]]:
+        """재분석 입력 (세션 id, 최대심박, 활동, 랩, 스트림). id 순 keyset 페이지"""
+        ...
+        
+    @abstractmethod
+    async def update_session_analyses(self, results:List[dict]) -> int:
+        """분석 결과(activity_title, analysis_result) 일괄 업데이트 (세션 id 기준). 재분석용"""
         ...
         
     @abstractmethod
     def update_session(self, user_id:UUID, 
                      activity:ActivityData = None,
                      laps:List[LapData] = None,
-                     stream:StreamData = None)->bool:
+                     stream:StreamArrays = None)->bool:
         """훈련 세션  (TrainSession , Stream, Lap) 업데이트. 수정된 부분만. """
 
         ...
@@ -39,8 +98,37 @@ class TrainingPort(ABC):
         ...
         
     @abstractmethod
-    async def get_sessions_by_date(self, user_id:UUID, start_date:int)-> List[TrainResponse]:
-        """기간 내의 훈련 세션 받기"""
+    async def get_zone_summary(self, user_id:UUID, start_date:int = None,
+                               end_date:int = None) -> ZoneSummaryResponse:
+        """기간 내 심박/페이스 존별 시간 합계"""
+        ...
+        
+    @abstractmethod
+    async def get_load_series(self, user_id:UUID, start_date:int = None,
+                              end_date:int = None) -> List[TrainLoadData]:
+        """기간 내 일별 훈련 부하 (ATL/CTL/TSB)"""
+        ...
+        
+    @abstractmethod
+    async def get_personal_records(self, user_id:UUID, since:int = None) -> PersonalRecordsResponse:
+        """거리별 개인 기록 + 기록 예측"""
+        ...
+        
+    @abstractmethod
+    async def get_physiology_profile(self, user_id:UUID) -> PhysiologyProfileData:
+        """사용자별 분석 기준값 (최대심박, 안정시 심박, 역치 페이스). 캐시"""
+        ...
+        
+    @abstractmethod
+    async def get_sessions_by_date(self, user_id:UUID, start_date:int = None,
+                                   end_date:int = None)-> List[TrainResponse]:
+        """기간 내의 훈련 세션 받기 [start_date, end_date)"""
+        ...
+        
+    @abstractmethod
+    async def get_session_page(self, user_id:UUID, start_date:int = None, end_date:int = None,
+                               cursor:Optional[str] = None, limit:int = 100) -> TrainSessionPage:
+        """기간 내 훈련 세션 한 페이지 (keyset). next_cursor 로 다음 페이지"""
         ...
         
     @abstractmethod
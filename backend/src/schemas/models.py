@@ -1,7 +1,9 @@
 from pydantic import BaseModel, EmailStr
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import datetime, date
 from typing import Optional, List
 from uuid import UUID
+import numpy as np
 
 
 
@@ -31,21 +33,55 @@ class LapData(BaseModel):
     max_heartrate: Optional[float] = None
     average_cadence: Optional[float] = None
     elevation_gain:Optional[float] = None
+    gap_speed: Optional[float] = None  # 경사 보정 속도 (m/s)
 
     class Config:
         from_attributes = True  # ORM 객체 지원
 
 class StreamData(BaseModel):
-    heartrate: Optional[List[float]] = None
-    cadence: Optional[List[float]] = None
-    distance: Optional[List[float]] = None
-    velocity: Optional[List[float]] = None
-    altitude: Optional[List[float]] = None
-    time: Optional[List[float]] = None
+    heartrate: Optional[List[Optional[float]]] = None  # 결측은 null
+    cadence: Optional[List[Optional[float]]] = None
+    distance: Optional[List[Optional[float]]] = None
+    velocity: Optional[List[Optional[float]]] = None
+    altitude: Optional[List[Optional[float]]] = None
+    time: Optional[List[Optional[float]]] = None
 
     class Config:
         from_attributes = True  # ORM 객체 지원
 
+@dataclass(slots=True)
+class StreamArrays:
+    """수집/분석용 스트림. 채널별 numpy 배열 (float64). api 응답시 StreamData 로 변환"""
+    heartrate: Optional[np.ndarray] = None
+    cadence: Optional[np.ndarray] = None
+    distance: Optional[np.ndarray] = None
+    velocity: Optional[np.ndarray] = None
+    altitude: Optional[np.ndarray] = None
+    time: Optional[np.ndarray] = None
+
+    def to_model(self) -> StreamData:
+        return StreamData.model_construct(
+            heartrate=_to_list(self.heartrate),
+            cadence=_to_list(self.cadence),
+            distance=_to_list(self.distance),
+            velocity=_to_list(self.velocity),
+            altitude=_to_list(self.altitude),
+            time=_to_list(self.time),
+        )
+
+    @classmethod
+    def from_lists(cls, **channels) -> "StreamArrays":
+        """db 에 저장된 채널 리스트 -> numpy 배열 (빈 채널은 None)"""
+        return cls(**{name: (np.asarray(values, dtype=np.float64) if values else None)
+                      for name, values in channels.items()})
+
+def _to_list(arr:Optional[np.ndarray]) -> Optional[List[Optional[float]]]:
+    if arr is None:
+        return None
+    if np.isnan(arr).any():  # 결측 -> null (json 에 NaN 없음)
+        return np.where(np.isnan(arr), None, arr).tolist()
+    return arr.tolist()
+
 class ActivityData(BaseModel):
     activity_id: int
     provider: Optional[str] = None
@@ -53,6 +89,7 @@ class ActivityData(BaseModel):
     elapsed_time: int
     sport_type: str
     start_date: datetime
+    start_date_utc: Optional[datetime] = None  # 동기화 커서용 (UTC)
     average_speed:Optional[float] = None
     max_speed:Optional[float] = None
     average_heartrate:Optional[float] = None
@@ -60,6 +97,10 @@ class ActivityData(BaseModel):
     average_cadence:Optional[float] = None
     activity_title:Optional[str] = None
     analysis_result : Optional[str] = None
+    training_load: Optional[float] = None  # TRIMP
+    gap_speed: Optional[float] = None  # 경사 보정 평균 속도 (m/s)
+    elevation_gain: Optional[float] = None  # 누적 상승 (m)
+    analyzer_version: Optional[int] = None  # 분류한 분석기 버전
 
 class UserInfoData(BaseModel):
     height: Optional[float] = None
@@ -71,6 +112,94 @@ class UserInfoData(BaseModel):
     class Config:
         from_attributes = True  # ORM 객체 지원
     
+class SyncStateData(BaseModel):
+    last_activity_at: Optional[int] = None
+    last_synced_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+    class Config:
+        from_attributes = True  # ORM 객체 지원
+    
+class BackfillStateData(BaseModel):
+    cursor: int = 0
+    pages: int = 0
+    imported: int = 0
+    status: str = "running"
+    started_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+    class Config:
+        from_attributes = True  # ORM 객체 지원
+
+class ZoneTimeData(BaseModel):  ## 존별 시간 (초). z1 ~ z5 순서
+    hr_zones: Optional[List[int]] = None
+    pace_zones: Optional[List[int]] = None
+
+class TrainLoadData(BaseModel):  ## 일별 훈련 부하
+    day: date
+    load: float = 0.0  # 그날 세션 부하 합 (TRIMP)
+    atl: float = 0.0  # 피로
+    ctl: float = 0.0  # 체력
+    tsb: float = 0.0  # 컨디션 (전날 ctl - atl)
+
+    class Config:
+        from_attributes = True  # ORM 객체 지원
+
+class BestEffortData(BaseModel):  ## 거리별 최고 기록 구간
+    distance: int  # m
+    name: str  # 400m, 1k, ...
+    elapsed_time: float  # 초
+    start_offset: Optional[float] = None  # 활동 시작 후 구간 시작까지 (초)
+    session_id: Optional[UUID] = None
+    train_date: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True  # ORM 객체 지원
+
+@dataclass(slots=True)
+class SessionBundle:
+    """세션 하나 저장 단위 (세션, 스트림, 랩, 존, 최고 기록)"""
+    activity: ActivityData
+    laps: List[LapData]
+    stream: Optional[StreamArrays]
+    zones: Optional[ZoneTimeData] = None
+    efforts: Optional[List[BestEffortData]] = None
+    stream_data: Optional[bytes] = None  # 미리 인코딩한 스트림 (있으면 stream 대신 저장)
+
+class RacePredictionData(BaseModel):  ## 기록 예측 (Riegel)
+    distance: int
+    name: str
+    predicted_time: float  # 초
+    based_on: str  # 기준 기록 이름
+
+class PhysiologyProfileData(BaseModel):  ## 사용자별 분석 기준값
+    max_hr: float
+    rest_hr: float
+    threshold_pace: float  # sec/km
+    source: str = "default"  # 최대심박 근거: history / age / default
+    sessions: int = 0  # 추정에 사용한 세션 수
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True  # ORM 객체 지원
+
+class IngestJobData(BaseModel):  ## 백그라운드 동기화 작업 상태
+    job_id: str
+    user_id: UUID
+    kind: str = "sync"  # sync / backfill
+    status: str = "queued"  # queued / running / done / failed
+    start_date: Optional[int] = None
+    full_resync: bool = False
+    pages: int = 0  # 처리한 페이지 수
+    saved: int = 0  # 저장한 활동 수
+    activities_per_sec: Optional[float] = None  # backfill 처리량
+    dropped_points: int = 0  # 스트림 정리로 제거/보간된 점 수
+    write_rows_per_sec: Optional[float] = None  # 마지막 db 저장 처리량
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    
 class LLMSessionResult(BaseModel):
     day: str
     workout_type: str
@@ -130,10 +259,28 @@ class TrainResponse(BaseModel):
     total_time: Optional[float] = None
     activity_title:Optional[str] = None
     analysis_result: Optional[str] = None
+    gap_speed: Optional[float] = None
+    elevation_gain: Optional[float] = None
+
+class TrainSessionPage(BaseModel):  ## 세션 목록 한 페이지
+    sessions: List[TrainResponse]
+    next_cursor: Optional[str] = None  # 다음 페이지 요청용. 없으면 마지막 페이지
 
 class TrainDetailResponse(BaseModel):
     laps:Optional[List[LapData]] = None
     stream : Optional[StreamData] = None
+    zones: Optional[ZoneTimeData] = None
+
+class PersonalRecordsResponse(BaseModel):
+    records: List[BestEffortData] = []
+    predictions: List[RacePredictionData] = []
+
+class ZoneSummaryResponse(BaseModel):
+    start_date: datetime
+    end_date: datetime
+    sessions: int = 0  # 존 데이터 있는 세션 수
+    hr_zones: List[int] = []
+    pace_zones: List[int] = []
 
 class LLMResponse(BaseModel):
     sessions:Optional[List[LLMSessionResult]] = None
@@ -5,7 +5,7 @@ from config.logger import get_logger
 from config.settings import security
 from adapters import StravaAdapter
 from schemas.models import TokenPayload
-from infra.security import encrypt_token, decrypt_token, TokenInvalidError
+from infra.security import encrypt_token, decrypt_token, encrypt_token_async, decrypt_token_async, TokenInvalidError
 from infra.db.storage.third_party_token_repo import (
     get_third_party_token_by_user_id,
     create_third_party_token,
@@ -127,14 +127,14 @@ class StravaHandler:
                 
                 # 토큰 검증
                 if not await self.strava_adapter.is_token_expired(expires_at=existing_token.expires_at):
-                    return decrypt_token(token_encrypted=existing_token.access_token,
+                    return await decrypt_token_async(token_encrypted=existing_token.access_token,
                                   key=security.encryption_key_strava,
                                     token_type="strava_access"
                                   )
 
                 # 토큰 만료시
                 # 리프레시토큰으로 새 토큰 발급 받기
-                decrypted_refresh = decrypt_token(token_encrypted=existing_token.refresh_token,
+                decrypted_refresh = await decrypt_token_async(token_encrypted=existing_token.refresh_token,
                                                   key=security.encryption_key_strava,
                                                     token_type="strava_access"
                                                   )
@@ -142,11 +142,11 @@ class StravaHandler:
 
                 # 토큰 암호화
                 # refresh_token, access_token, 
-                encrypted_access = encrypt_token(data=strava_token.get("access_token"),
+                encrypted_access = await encrypt_token_async(data=strava_token.get("access_token"),
                                                     key=security.encryption_key_strava,
                                                     token_type="strava_access"
                                                     )
-                encrypted_refresh = encrypt_token(data=strava_token.get("refresh_token"),
+                encrypted_refresh = await encrypt_token_async(data=strava_token.get("refresh_token"),
                                                     key=security.encryption_key_strava,
                                                     token_type="strava_refresh"
                                                     )
@@ -28,27 +28,28 @@ class GoogleHandler:
     """
     def __init__(self, account_adapter:AccountAdapter,
                  token_adapter:TokenAdapter,
-                 db:AsyncSession
+                 db:AsyncSession,
+                 client:httpx.AsyncClient
                  ):
         self.db = db
+        self.client = client # 앱 공용 클라이언트
         self.token_url = google.token_url
         self.account_adapter = account_adapter
         self.token_adapter = token_adapter
     
     
     async def _get_access_token(self, code:str)->dict:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.token_url,
-                data={
-                    "code": code,
-                    "client_id": google.client_id,
-                    "client_secret": google.client_secret,
-                    "redirect_uri": google.redirect_uri,
-                    "grant_type": "authorization_code"
-                },
-                headers={"Content-Type": "application/x-www-form-urlencoded"}
-            )
+        response = await self.client.post(
+            self.token_url,
+            data={
+                "code": code,
+                "client_id": google.client_id,
+                "client_secret": google.client_secret,
+                "redirect_uri": google.redirect_uri,
+                "grant_type": "authorization_code"
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
         
         if response.status_code != 200:
             raise HTTPException(status_code=400, detail="Failed to exchange code for token")
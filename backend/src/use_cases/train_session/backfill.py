@@ -0,0 +1,146 @@
+"""
+전체 기록 가져오기 (backfill)
+사용자의 스트라바 전체 활동을 페이지 단위로 수집. 페이지마다 체크포인트 저장해서
+중단(에러, 호출 한도)되면 다음 실행시 이어서 진행.
+
+실행: python -m use_cases.train_session.backfill <user_id>   (src 경로에서)
+"""
+import argparse
+import asyncio
+import time
+from contextlib import aclosing
+from typing import Optional, Callable, Awaitable
+from uuid import UUID
+import httpx
+from fastapi import HTTPException
+
+from config.settings import strava
+from config.logger import get_logger
+from schemas.models import TokenPayload, BackfillStateData
+from use_cases.train_session.handle_train_session import TrainSessionHandler, SYNC_PROVIDER
+
+logger = get_logger(__file__)
+
+
+class BackfillHandler(TrainSessionHandler):
+
+    async def backfill(self, payload:TokenPayload,
+                       progress:Optional[Callable[..., Awaitable[None]]] = None) -> BackfillStateData:
+        """전체 기록 가져오기. 체크포인트(cursor) 이후 활동부터 오래된 순으로 진행
+            progress: 페이지마다 호출 (pages=, saved=, activities_per_sec=, dropped_points=, write_rows_per_sec=)
+        """
+        user_id = payload.user_id
+        state = await self.db_adapter.get_backfill_state(user_id=user_id, provider=SYNC_PROVIDER)
+        cursor = state.cursor if state else 0
+        pages_done = state.pages if state else 0
+        imported = state.imported if state else 0
+
+        await self.db_adapter.save_backfill_state(user_id=user_id, provider=SYNC_PROVIDER,
+                                                  cursor=cursor, status="running", last_error=None)
+
+        started = time.monotonic()
+        run_saved = 0
+        auth_retried = False
+        sem = asyncio.Semaphore(max(1, strava.fetch_concurrency))
+        try:
+            while True:
+                # 오래 걸리는 작업이라 중간에 토큰 만료될 수 있음 -> 401 이면 갱신 후 커서부터 다시
+                access_token = await self._get_access_token(payload)
+                if not access_token:
+                    raise HTTPException(status_code=400, detail="token returned None.")
+
+                try:
+                    # after 지정시 스트라바는 오래된 순으로 반환
+                    pages = self.data_adapter.iter_activities(access_token=access_token,
+                                                              after_date=cursor)
+                    async with aclosing(pages):
+                        async for activity_list in pages:
+                            page_cursor = self._latest_start(activity_list)
+
+                            saved = await self._ingest_page(user_id=user_id,
+                                                            access_token=access_token,
+                                                            activity_list=activity_list,
+                                                            sem=sem)
+
+                            # 페이지 체크포인트
+                            if page_cursor is not None:
+                                cursor = max(cursor, page_cursor)
+                            pages_done += 1
+                            imported += saved
+                            run_saved += saved
+                            auth_retried = False
+                            await self.db_adapter.save_backfill_state(user_id=user_id,
+                                                                      provider=SYNC_PROVIDER,
+                                                                      cursor=cursor,
+                                                                      pages=pages_done,
+                                                                      imported=imported)
+
+                            rate = run_saved / max(time.monotonic() - started, 1e-6)
+                            if progress is not None:
+                                await progress(pages=pages_done, saved=imported,
+                                               activities_per_sec=round(rate, 2),
+                                               dropped_points=self.dropped_points,
+                                               write_rows_per_sec=self.write_rows_per_sec)
+                    break
+
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code == 401 and not auth_retried:
+                        auth_retried = True
+                        continue
+                    raise
+
+            await self.db_adapter.save_backfill_state(user_id=user_id, provider=SYNC_PROVIDER,
+                                                      status="done")
+
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            logger.exception(str(e))
+            try:
+                await self.db_adapter.save_backfill_state(user_id=user_id, provider=SYNC_PROVIDER,
+                                                          status="failed", last_error=str(detail)[:500])
+            except Exception as save_error:
+                logger.exception(str(save_error))
+            if isinstance(e, HTTPException):
+                raise
+            raise HTTPException(status_code=500, detail="internal server error")
+
+        return await self.db_adapter.get_backfill_state(user_id=user_id, provider=SYNC_PROVIDER)
+
+
+async def _main(user_id:UUID) -> None:
+    from adapters import StravaAdapter, TrainingAdapter
+    from infra.db.storage.session import AsyncSessionLocal, create_db_and_tables, close_db
+    from infra.http_client import HttpClientRegistry
+    from infra.strava_rate_limiter import BACKGROUND
+    from use_cases.auth.auth_strava import StravaHandler
+
+    http_clients = HttpClientRegistry()
+    http_clients.start()
+    await create_db_and_tables()
+    try:
+        async with AsyncSessionLocal() as db:
+            data_adapter = StravaAdapter(db=db, client=http_clients.strava, priority=BACKGROUND)
+            handler = BackfillHandler(
+                db_adapter=TrainingAdapter(db=db),
+                data_adapter=data_adapter,
+                auth_handler=StravaHandler(db=db, adapter=data_adapter),
+            )
+
+            async def progress(pages:int, saved:int, activities_per_sec:float, dropped_points:int,
+                               write_rows_per_sec:Optional[float]):
+                print(f"page {pages}: {saved} activities imported ({activities_per_sec} activities/sec, "
+                      f"{write_rows_per_sec} rows/sec written, {dropped_points} stream points cleaned)")
+
+            state = await handler.backfill(payload=TokenPayload(user_id=user_id, exp=0, iat=0),
+                                           progress=progress)
+            print(f"backfill {state.status}: {state.imported} activities, {state.pages} pages")
+    finally:
+        await http_clients.close()
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="스트라바 전체 기록 가져오기")
+    parser.add_argument("user_id", type=UUID)
+    args = parser.parse_args()
+    asyncio.run(_main(args.user_id))
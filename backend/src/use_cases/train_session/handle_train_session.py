@@ -2,19 +2,27 @@
 training data 관련 유스케이스
 """
 from fastapi import HTTPException
-from typing import List
+from typing import List, Tuple, Optional, Callable, Awaitable
 from uuid import UUID
-import time
+from datetime import datetime, timezone
+import asyncio
+from contextlib import aclosing
 
 from adapters.training_data_adapter import TrainingDataPort
 from adapters.training_adapter import TrainingPort
 from config.logger import get_logger
-from schemas.models import TokenPayload, TrainResponse, LapData, StreamData, TrainDetailResponse
+from config.settings import strava
+from config.constants import SUPPORTED_SPORT_TYPES, SCHEDULE_PAGE_SIZE
+from schemas.models import TokenPayload, TrainResponse, LapData, StreamArrays, TrainDetailResponse, ActivityData, ZoneSummaryResponse, TrainLoadData, PersonalRecordsResponse, PhysiologyProfileData, SessionBundle, TrainSessionPage
 from use_cases.auth.auth_strava import StravaHandler
-from domains.data_analyzer import DataAnalyzer
+from use_cases.train_session.session_analysis import analyze_activity, AnalyzedActivity
+from use_cases.train_session.session_writer import SessionWriter
+from infra.executors import executors
 
 logger = get_logger(__file__)
 
+SYNC_PROVIDER = "strava"
+
 
 class TrainSessionHandler:
     def __init__(self, data_adapter: TrainingDataPort,
@@ -24,7 +32,8 @@ class TrainSessionHandler:
         self.data_adapter = data_adapter
         self.db_adapter = db_adapter
         self.auth_handler = auth_handler
-        self.analyzer = DataAnalyzer()
+        self.dropped_points = 0  # 스트림 정리로 제거/보간된 점 수 (진행률용)
+        self.write_rows_per_sec = None  # 마지막 db 저장 처리량 (진행률용)
         
     
     ## 스트라바 액세스 토큰 불러오기
@@ -32,12 +41,62 @@ class TrainSessionHandler:
         return await self.auth_handler.get_access_and_refresh_if_expired(payload=payload)
         
         
-    async def fetch_new_schedules(self, payload:TokenPayload, start_date:int = None) -> bool:
+    async def _filter_new_activities(self, activity_list:List[ActivityData]) -> List[ActivityData]:
+        """랩/스트림 요청 전 필터링
+            - 러닝이 아닌 활동 제외
+            - 이미 db에 저장된 활동 제외 (페이지당 쿼리 1번)
+        """
+        runs = [a for a in activity_list if a.sport_type in SUPPORTED_SPORT_TYPES]
+        if not runs:
+            return []
+        
+        # 한 페이지는 같은 플랫폼 활동
+        existing = await self.db_adapter.get_existing_activity_ids(
+            provider=runs[0].provider,
+            activity_ids=[a.activity_id for a in runs])
+        
+        return [a for a in runs if a.activity_id not in existing]
+    
+    
+    async def _fetch_activity_detail(self, access_token:str,
+                                     activity:ActivityData,
+                                     sem:asyncio.Semaphore
+                                     ) -> Tuple[ActivityData, List[LapData], StreamArrays]:
+        """액티비티 하나의 랩, 스트림 동시 요청. 세마포어로 동시 요청 수 제한"""
+        async with sem:
+            lap_data, stream_data = await asyncio.gather(
+                self.data_adapter.fetch_activity_lap(access_token=access_token,
+                                                     activity_id=activity.activity_id),
+                self.data_adapter.fetch_activity_stream(access_token=access_token,
+                                                        activity_id=activity.activity_id),
+            )
+        return activity, lap_data, stream_data
+    
+    async def _fetch_and_analyze(self, access_token:str,
+                                 activity:ActivityData,
+                                 profile:PhysiologyProfileData,
+                                 sem:asyncio.Semaphore) -> AnalyzedActivity:
+        """랩/스트림 요청 후 분석. 분석은 프로세스 풀에서 (이벤트 루프 막지 않음)"""
+        activity, lap_data, stream_data = await self._fetch_activity_detail(access_token=access_token,
+                                                                            activity=activity,
+                                                                            sem=sem)
+        return await executors.run_process(analyze_activity, activity, lap_data, stream_data, profile)
+        
+        
+    async def fetch_new_schedules(self, payload:TokenPayload, start_date:int = None,
+                                  full_resync:bool = False,
+                                  progress:Optional[Callable[..., Awaitable[None]]] = None) -> bool:
         """주어진 기간 이후의 활동들을 받아서 db에 저장.
-                    1. 주어진 날 이후의 데이터 받기
-                    2. db에 데이터 저장. db에 겹치는 활동은 저장안함
-                    3. 리턴
+                    1. 시작날짜 결정. 날짜가 없으면 마지막 동기화 커서부터
+                       (full_resync 면 커서 무시하고 기본 기간)
+                    2. 이미 저장된 활동, 러닝 외 활동 제외
+                    3. 페이지별로 랩/스트림 동시 요청 (최대 fetch_concurrency 개)
+                    4. 받는 순서대로 분석, 모아서 db에 저장
+                    5. 페이지마다 커서 전진, 끝나면 동기화 상태 저장
+            progress: 페이지마다 호출 (pages=, saved=, dropped_points=, write_rows_per_sec=). 백그라운드 작업 진행률용
         """
+        cursor = None
+        pages_done = saved = 0
         try:
             
             ## 액세스 토큰
@@ -46,62 +105,143 @@ class TrainSessionHandler:
             if not access_token:
                 raise HTTPException(status_code=400, detail="token returned None.")
             
+            ## 증분 동기화 커서
+            state = await self.db_adapter.get_sync_state(user_id=payload.user_id,
+                                                         provider=SYNC_PROVIDER)
+            cursor = state.last_activity_at if state else None
+            if start_date is None and not full_resync:
+                start_date = cursor
             
-            # 액티비티 리스트 
-            # start = time.time()
-            activity_list = await self.data_adapter.fetch_activities(access_token=access_token,
-                                                          after_date=start_date)
-            # logger.info(f"fetch activity: {time.time() - start:.3f} sec")
-
-            # 각 액티비티
-            # schedules = []
-            for activity in activity_list:
-                
-                # start = time.time()
-                lap_data = await self.data_adapter.fetch_activity_lap(access_token=access_token,
-                                                         activity_id=activity.activity_id)
-                # logger.warning(f"fetch activity lap: {time.time() - start:.3f} sec")
-                # start = time.time()
-                stream_data = await self.data_adapter.fetch_activity_stream(access_token=access_token,
-                                                         activity_id=activity.activity_id)
-                # logger.warning(f"fetch activity stream: {time.time() - start:.3f} sec")
-                
-                
-                # start = time.time()
-                train_res = self.analyzer.analyze(activity=activity,
-                                                            laps=lap_data,
-                                                            stream=stream_data)
-                # logger.warning(f"analyze: {time.time() - start:.3f} sec")
-                activity.activity_title = train_res.get("title", "러닝")
-                activity.analysis_result = train_res.get("detail", "세부내용 없음")  
-                # schedules.append(train_res)
-                
-                ## db 저장
-                # start = time.time()
-                await self.db_adapter.save_session(user_id=payload.user_id,
-                                             activity=activity,
-                                             laps=lap_data,
-                                             stream=stream_data
-                                             )
-                # logger.warning(f"save session: {time.time() - start:.3f} sec")
+            sem = asyncio.Semaphore(max(1, strava.fetch_concurrency))
+            
+            # 액티비티 리스트 페이지 단위로 처리
+            # 현재 페이지 처리하는 동안 다음 페이지는 미리 요청됨
+            pages = self.data_adapter.iter_activities(access_token=access_token,
+                                                      after_date=start_date)
+            async with aclosing(pages):
+                async for activity_list in pages:
+                    page_cursor = self._latest_start(activity_list)
+                    
+                    saved += await self._ingest_page(user_id=payload.user_id,
+                                                     access_token=access_token,
+                                                     activity_list=activity_list,
+                                                     sem=sem)
+                    
+                    # 페이지 처리 완료 -> 커서 전진
+                    if page_cursor is not None:
+                        cursor = max(cursor or 0, page_cursor)
+                    
+                    pages_done += 1
+                    if progress is not None:
+                        await progress(pages=pages_done, saved=saved,
+                                       dropped_points=self.dropped_points,
+                                       write_rows_per_sec=self.write_rows_per_sec)
+            
+            ## 동기화 상태 저장
+            await self.db_adapter.save_sync_state(user_id=payload.user_id,
+                                                  provider=SYNC_PROVIDER,
+                                                  last_activity_at=cursor,
+                                                  last_synced_at=datetime.now(timezone.utc).replace(tzinfo=None),
+                                                  last_error=None)
             ## 사용자에게 리턴
-            # return schedules
             return True
                 
         
-        except HTTPException:
+        except HTTPException as e:
+            await self._save_sync_error(payload=payload, cursor=cursor, error=str(e.detail))
             raise
         except Exception as e:
             logger.exception(str(e))
+            await self._save_sync_error(payload=payload, cursor=cursor, error=str(e))
             raise HTTPException(status_code=500, detail="internal server error")
+    
+    
+    async def _ingest_page(self, user_id:UUID, access_token:str,
+                           activity_list:List[ActivityData],
+                           sem:asyncio.Semaphore) -> int:
+        """액티비티 한 페이지 수집. 필터 -> 랩/스트림 동시 요청 -> 분석 (cpu 풀) -> 저장
+            return: 저장된 활동 수
+        """
+        # 저장된 활동, 러닝 외 활동은 요청 안함
+        activity_list = await self._filter_new_activities(activity_list)
+        if not activity_list:
+            return 0
+        
+        # 사용자별 기준값 (캐시. 이전 페이지 저장으로 무효화됐으면 다시 계산)
+        profile = await self.db_adapter.get_physiology_profile(user_id=user_id)
+
+        # 각 액티비티 랩/스트림 동시 요청 -> 받는 대로 cpu 풀에서 분석
+        tasks = [
+            asyncio.create_task(self._fetch_and_analyze(access_token=access_token,
+                                                        activity=activity,
+                                                        profile=profile,
+                                                        sem=sem))
+            for activity in activity_list
+        ]
+        
+        saved = 0
+        writer = SessionWriter(db_adapter=self.db_adapter, user_id=user_id)
+        try:
+            # 먼저 끝난 액티비티부터 버퍼에 모아서 저장
+            # db 세션은 동시 사용 불가 -> 저장은 순차적으로
+            for done in asyncio.as_completed(tasks):
+                result = await done
+                if result.report.dropped:
+                    self.dropped_points += result.report.dropped
+                    logger.info(f"activity {result.activity.activity_id} stream cleaned: {result.report}")
+            
+                ## db 저장 (모아서 한번에)
+                saved += await writer.add(SessionBundle(activity=result.activity,
+                                                        laps=result.laps,
+                                                        stream=None,
+                                                        stream_data=result.stream_data,
+                                                        zones=result.zones,
+                                                        efforts=result.efforts))
+            
+            # 페이지 끝나면 남은 것 저장 (커서 전진 전)
+            saved += await writer.flush()
+            self.write_rows_per_sec = writer.rows_per_sec
+        finally:
+            # 실패시 남은 요청 취소
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        
+        return saved
+    
+    
+    def _latest_start(self, activity_list:List[ActivityData]) -> Optional[int]:
+        """페이지 내 가장 최근 활동 시작 시간 (UTC timestamp)"""
+        starts = [int(a.start_date_utc.timestamp()) for a in activity_list if a.start_date_utc]
+        return max(starts) if starts else None
+    
+    
+    async def _save_sync_error(self, payload:TokenPayload, cursor:Optional[int], error:str) -> None:
+        """동기화 실패 기록. 완료된 페이지까지의 커서는 유지
+            커서 읽기 전 실패 (cursor None) 면 저장된 커서 그대로 둠
+        """
+        values = {"last_error": error[:500]}
+        if cursor is not None:
+            values["last_activity_at"] = cursor
+        try:
+            await self.db_adapter.save_sync_state(user_id=payload.user_id,
+                                                  provider=SYNC_PROVIDER,
+                                                  **values)
+        except Exception as e:
+            logger.exception(str(e))
 
     
-    async def get_schedules(self, payload:TokenPayload, start_date:int = None) -> List[TrainResponse]:
-        """db 에서 스케줄 받기"""
+    async def get_schedules(self, payload:TokenPayload, start_date:int = None,
+                            end_date:int = None, cursor:Optional[str] = None,
+                            limit:int = SCHEDULE_PAGE_SIZE) -> TrainSessionPage:
+        """db 에서 스케줄 받기 (한 페이지)"""
         try:
             
-            return await self.db_adapter.get_sessions_by_date(user_id=payload.user_id,
-                                                start_date=start_date)
+            return await self.db_adapter.get_session_page(user_id=payload.user_id,
+                                                start_date=start_date,
+                                                end_date=end_date,
+                                                cursor=cursor,
+                                                limit=limit)
 
         except HTTPException:
             raise
@@ -124,6 +264,64 @@ class TrainSessionHandler:
 
         
     
+    async def get_zone_summary(self, payload:TokenPayload, start_date:int = None,
+                               end_date:int = None) -> ZoneSummaryResponse:
+        """기간 내 심박/페이스 존별 시간"""
+        try:
+            
+            return await self.db_adapter.get_zone_summary(user_id=payload.user_id,
+                                                          start_date=start_date,
+                                                          end_date=end_date)
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.exception(str(e))
+            raise HTTPException(status_code=500, detail="internal server error")
+
+    
+    async def get_load_series(self, payload:TokenPayload, start_date:int = None,
+                              end_date:int = None) -> List[TrainLoadData]:
+        """일별 훈련 부하 (피로/체력/컨디션)"""
+        try:
+            
+            return await self.db_adapter.get_load_series(user_id=payload.user_id,
+                                                         start_date=start_date,
+                                                         end_date=end_date)
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.exception(str(e))
+            raise HTTPException(status_code=500, detail="internal server error")
+
+    
+    async def get_personal_records(self, payload:TokenPayload, since:int = None) -> PersonalRecordsResponse:
+        """거리별 개인 기록, 기록 예측"""
+        try:
+            
+            return await self.db_adapter.get_personal_records(user_id=payload.user_id, since=since)
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.exception(str(e))
+            raise HTTPException(status_code=500, detail="internal server error")
+
+    
+    async def get_physiology_profile(self, payload:TokenPayload) -> PhysiologyProfileData:
+        """분석에 쓰는 사용자별 기준값"""
+        try:
+            
+            return await self.db_adapter.get_physiology_profile(user_id=payload.user_id)
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.exception(str(e))
+            raise HTTPException(status_code=500, detail="internal server error")
+
+    
     def upload_new_schedule(self, payload:TokenPayload, session:TrainResponse)->bool:
         """db에 사용자가 직접 입력한 훈련 저장 train_session 만"""
         ...
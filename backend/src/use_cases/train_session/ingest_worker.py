@@ -0,0 +1,96 @@
+"""
+백그라운드 동기화 워커
+큐에서 작업을 꺼내 fetch_new_schedules / backfill 실행. 같은 사용자 작업은 순서대로 처리.
+"""
+import asyncio
+from typing import List
+from fastapi import HTTPException
+
+from adapters import StravaAdapter, TrainingAdapter
+from config.logger import get_logger
+from config.settings import ingest
+from infra.db.storage.session import AsyncSessionLocal
+from infra.http_client import HttpClientRegistry
+from infra.job_queue import JobQueue
+from infra.strava_rate_limiter import BACKGROUND
+from schemas.models import TokenPayload, IngestJobData
+from use_cases.auth.auth_strava import StravaHandler
+from use_cases.train_session.handle_train_session import TrainSessionHandler
+from use_cases.train_session.backfill import BackfillHandler
+
+logger = get_logger(__file__)
+
+
+class IngestWorkerPool:
+    def __init__(self, queue:JobQueue, http_clients:HttpClientRegistry, workers:int = 2,
+                 name:str = ingest.worker_name):
+        self.queue = queue
+        self.http_clients = http_clients
+        self.workers = max(1, workers)
+        self.name = name  # 워커 id = {name}-{번호}. 재시작해도 같은 id -> 남은 작업 복구
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        for i in range(self.workers):
+            worker_id = f"{self.name}-{i}"
+            self._tasks.append(asyncio.create_task(self._run(worker_id), name=f"ingest-worker-{i}"))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _run(self, worker_id:str) -> None:
+        recovered = await self.queue.recover(worker_id)
+        if recovered:
+            logger.warning(f"{worker_id}: requeued {recovered} unfinished jobs")
+
+        while True:
+            job = await self.queue.next_job(worker_id)
+            try:
+                # 같은 사용자 작업은 직렬 처리 (커서/중복 저장 충돌 방지)
+                async with self.queue.user_lock(job.user_id):
+                    await self._process(job)
+            except asyncio.CancelledError:
+                # 종료 중 -> ack 안함 (다시 시작할때 recover)
+                raise
+            except Exception as e:
+                logger.exception(str(e))
+            await self.queue.ack(worker_id, job.job_id)
+
+    async def _process(self, job:IngestJobData) -> None:
+        await self.queue.update(job.job_id, status="running")
+
+        async def progress(**counts):
+            await self.queue.update(job.job_id, **counts)
+
+        # 작업마다 db 세션 새로 열기
+        async with AsyncSessionLocal() as db:
+            # 백그라운드 작업은 사용자 요청보다 낮은 우선순위
+            data_adapter = StravaAdapter(db=db, client=self.http_clients.strava, priority=BACKGROUND)
+            handler_cls = BackfillHandler if job.kind == "backfill" else TrainSessionHandler
+            handler = handler_cls(
+                db_adapter=TrainingAdapter(db=db),
+                data_adapter=data_adapter,
+                auth_handler=StravaHandler(db=db, adapter=data_adapter),
+            )
+            payload = TokenPayload(user_id=job.user_id, exp=0, iat=0)
+
+            try:
+                if job.kind == "backfill":
+                    await handler.backfill(payload=payload, progress=progress)
+                else:
+                    await handler.fetch_new_schedules(payload=payload,
+                                                      start_date=job.start_date,
+                                                      full_resync=job.full_resync,
+                                                      progress=progress)
+            except HTTPException as e:
+                await self.queue.update(job.job_id, status="failed", error=str(e.detail))
+                return
+            except Exception as e:
+                logger.exception(str(e))
+                await self.queue.update(job.job_id, status="failed", error="internal server error")
+                return
+
+        await self.queue.update(job.job_id, status="done")
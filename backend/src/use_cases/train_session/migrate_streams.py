@@ -0,0 +1,63 @@
+"""
+json 스트림 -> 바이너리 (infra.stream_codec) 변환
+변환 전 행도 읽을 수 있어서 서비스 중에 실행해도 됨. 중단 후 다시 실행하면 남은 행부터.
+
+실행: python -m use_cases.train_session.migrate_streams [--batch-size 500]   (src 경로에서)
+"""
+import argparse
+import asyncio
+import time
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from infra.db.storage import activity_repo as repo
+from infra.stream_codec import encode_stream
+
+
+async def migrate_streams(db:AsyncSession, batch_size:int = 500) -> int:
+    """return: 변환된 행 수"""
+    started = time.monotonic()
+    converted = 0
+    json_bytes = blob_bytes = 0
+    after_id = None
+
+    while True:
+        rows = await repo.get_json_streams(db=db, after_id=after_id, limit=batch_size)
+        if not rows:
+            break
+        after_id = rows[-1].session_id
+
+        blobs = []
+        for row in rows:
+            data = encode_stream(repo.stream_row_to_arrays(row))
+            json_bytes += sum(len(str(getattr(row, c))) for c in ("heartrate", "cadence", "distance",
+                                                                   "velocity", "altitude")
+                              if getattr(row, c) is not None)
+            blob_bytes += len(data)
+            blobs.append({"session_id": row.session_id, "data": data})
+
+        converted += await repo.update_stream_blobs(db=db, blobs=blobs)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        print(f"{converted} streams converted ({converted / elapsed:.1f} rows/sec, "
+              f"{json_bytes / max(blob_bytes, 1):.1f}x smaller)")
+
+    return converted
+
+
+async def _main(batch_size:int) -> None:
+    from infra.db.storage.session import AsyncSessionLocal, create_db_and_tables, close_db
+
+    # data 컬럼 추가 (기존 테이블)
+    await create_db_and_tables()
+    try:
+        async with AsyncSessionLocal() as db:
+            converted = await migrate_streams(db=db, batch_size=batch_size)
+        print(f"converted {converted} streams")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="json 스트림을 바이너리로 변환")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(_main(args.batch_size))
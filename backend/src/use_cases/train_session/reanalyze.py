@@ -0,0 +1,110 @@
+"""
+저장된 세션 재분석 (db 만 사용)
+분석 로직/기준값을 바꾸고 ANALYZER_VERSION 을 올린 뒤 실행.
+이전 버전으로 분류된 세션만 청크 단위로 읽어서 프로세스 풀로 분류, 배치 UPDATE.
+
+실행: python -m use_cases.train_session.reanalyze [--chunk-size 500] [--workers 4] [--all]   (src 경로에서)
+"""
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from domains.data_analyzer import DataAnalyzer, ANALYZER_VERSION
+from ports.training_port import TrainingPort
+from schemas.models import ActivityData, LapData, StreamArrays
+
+AnalysisItem = Tuple[UUID, float, ActivityData, List[LapData], Optional[StreamArrays]]
+
+
+def analyze_chunk(items:List[AnalysisItem]) -> List[dict]:
+    """프로세스 풀에서 실행. 최대심박별로 묶어서 analyze_many
+        return: [{session_id, activity_title, analysis_result, analyzer_version}]
+    """
+    groups = {}
+    for item in items:
+        groups.setdefault(item[1], []).append(item)
+
+    results = []
+    for max_hr, group in groups.items():
+        analyzer = DataAnalyzer(max_hr=max_hr)
+        res_list = analyzer.analyze_many([item[2] for item in group],
+                                         [item[3] for item in group],
+                                         [item[4] for item in group])
+        for item, res in zip(group, res_list):
+            results.append({
+                "session_id": item[0],
+                "activity_title": res.get("title", "러닝"),
+                "analysis_result": res.get("detail", "세부내용 없음"),
+                "analyzer_version": ANALYZER_VERSION,
+            })
+    return results
+
+
+async def _analyze(executor:Executor, items:List[AnalysisItem], workers:int) -> List[dict]:
+    """청크를 워커 수만큼 나눠서 동시에 분류"""
+    loop = asyncio.get_running_loop()
+    size = -(-len(items) // workers)
+    parts = await asyncio.gather(*[
+        loop.run_in_executor(executor, analyze_chunk, items[i:i + size])
+        for i in range(0, len(items), size)
+    ])
+    return [res for part in parts for res in part]
+
+
+async def reanalyze_sessions(db_adapter:TrainingPort, executor:Executor,
+                             workers:int, chunk_size:int = 500,
+                             force:bool = False) -> int:
+    """이전 버전 세션 재분석. 분류하는 동안 다음 청크를 미리 읽음
+        force: 버전 상관없이 전부
+        return: 업데이트된 행 수
+    """
+    version = None if force else ANALYZER_VERSION
+    started = time.monotonic()
+    updated = 0
+
+    items = await db_adapter.get_sessions_for_analysis(version=version, after_id=None, limit=chunk_size)
+    while items:
+        analyzing = asyncio.ensure_future(_analyze(executor, items, workers))
+        # id 순 keyset -> 업데이트와 상관없이 다음 청크 위치 고정
+        next_items = await db_adapter.get_sessions_for_analysis(version=version,
+                                                                after_id=items[-1][0],
+                                                                limit=chunk_size)
+        results = await analyzing
+
+        updated += await db_adapter.update_session_analyses(results=results)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        print(f"{updated} rows updated ({updated / elapsed:.1f} rows/sec)")
+        items = next_items
+
+    return updated
+
+
+async def _main(chunk_size:int, workers:int, force:bool) -> None:
+    from adapters import TrainingAdapter
+    from infra.db.storage.session import AsyncSessionLocal, create_db_and_tables, close_db
+
+    await create_db_and_tables()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            async with AsyncSessionLocal() as db:
+                updated = await reanalyze_sessions(db_adapter=TrainingAdapter(db=db),
+                                                   executor=executor,
+                                                   workers=workers,
+                                                   chunk_size=chunk_size,
+                                                   force=force)
+        print(f"reanalyzed {updated} sessions (analyzer version {ANALYZER_VERSION})")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="저장된 세션 재분석")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--all", action="store_true", help="버전 상관없이 전부 재분석")
+    args = parser.parse_args()
+    asyncio.run(_main(args.chunk_size, max(1, args.workers), args.all))
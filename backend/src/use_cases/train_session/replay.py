@@ -0,0 +1,112 @@
+"""
+보관된 스트라바 원본으로 재분석 (네트워크 사용 안함)
+분석 로직/기준값을 바꾼 뒤 저장된 activity_title, analysis_result 를 다시 계산.
+
+실행: python -m use_cases.train_session.replay [--batch-size 500]   (src 경로에서)
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from config.constants import SUPPORTED_SPORT_TYPES
+from domains.elevation import apply_grade_adjustment
+from domains.stream_cleaning import clean_stream
+from infra.raw_archive import RawArchive
+from infra.strava_codec import decode_activity, decode_laps, decode_stream
+from ports.training_port import TrainingPort
+from schemas.models import ActivityData, LapData, StreamArrays
+from use_cases.train_session.reanalyze import analyze_chunk
+
+
+def load_archived(archive:RawArchive, provider:str,
+                  activity_id:int) -> Optional[Tuple[ActivityData, List[LapData], StreamArrays]]:
+    """보관된 원본 -> 파싱된 활동/랩/스트림. 원본이 하나라도 없으면 None"""
+    raw_activity = archive.get(provider, activity_id, "activity")
+    raw_laps = archive.get(provider, activity_id, "laps")
+    raw_streams = archive.get(provider, activity_id, "streams")
+    if raw_activity is None or raw_laps is None or raw_streams is None:
+        return None
+
+    return (decode_activity(raw_activity, provider=provider),
+            decode_laps(raw_laps),
+            decode_stream(raw_streams))
+
+
+ArchivedActivity = Tuple[ActivityData, List[LapData], StreamArrays]
+
+
+def iter_archived(archive:RawArchive, provider:str = "strava",
+                  chunk_size:int = 500) -> Iterator[List[ArchivedActivity]]:
+    """보관된 러닝 활동 (스트림 정리, 경사 보정 후) chunk_size 개씩"""
+    chunk = []
+    for activity_id in archive.iter_activity_ids(provider):
+        loaded = load_archived(archive, provider, activity_id)
+        if loaded is None:
+            continue
+        activity, laps, stream = loaded
+        if activity.sport_type not in SUPPORTED_SPORT_TYPES:
+            continue
+
+        stream, _ = clean_stream(stream)
+        apply_grade_adjustment(activity, laps, stream)
+        chunk.append((activity, laps, stream))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def classify_chunk(chunk:List[ArchivedActivity], targets:Dict[int, Tuple[UUID, float]]) -> List[dict]:
+    """db 재분석과 같은 analyze_chunk (사용자 최대심박별로 묶어서 analyze_many)
+        targets: activity_id -> (세션 id, 최대심박). 없는 활동 (db 에 저장 안됨) 은 건너뜀
+        return: [{session_id, activity_title, analysis_result, analyzer_version}]
+    """
+    return analyze_chunk([(*targets[activity.activity_id], activity, laps, stream)
+                          for activity, laps, stream in chunk
+                          if activity.activity_id in targets])
+
+
+async def replay_to_db(archive:RawArchive, db_adapter:TrainingPort,
+                       provider:str = "strava", batch_size:int = 500) -> int:
+    """재분석 결과를 배치 단위로 db 반영. return: 업데이트된 행 수
+        활동 -> 세션 id 는 get_activity_sessions 로 한번에. 최대심박은 활동 주인의 저장된 프로필 값 (reanalyze 와 같음)
+    """
+    started = time.monotonic()
+    updated = 0
+
+    for chunk in iter_archived(archive, provider=provider, chunk_size=batch_size):
+        targets = await db_adapter.get_activity_sessions(provider=provider,
+                                                         activity_ids=[a.activity_id for a, _, _ in chunk])
+        results = classify_chunk(chunk, targets)
+        updated += await db_adapter.update_session_analyses(results=results)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        print(f"{updated} rows updated ({updated / elapsed:.1f} rows/sec)")
+
+    return updated
+
+
+async def _main(batch_size:int) -> None:
+    from adapters import TrainingAdapter
+    from infra.db.storage.session import AsyncSessionLocal, close_db
+    from infra.raw_archive import raw_archive
+
+    if raw_archive is None:
+        raise SystemExit("raw archive disabled (RAW_ARCHIVE_ENABLED=False)")
+
+    try:
+        async with AsyncSessionLocal() as db:
+            await replay_to_db(archive=raw_archive,
+                               db_adapter=TrainingAdapter(db=db),
+                               batch_size=batch_size)
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="보관된 스트라바 원본으로 재분석")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(_main(args.batch_size))
@@ -0,0 +1,49 @@
+"""
+수집한 활동 하나 분석 (스트림 정리 -> 경사 보정 -> 분류 -> 부하/존/기록 -> 저장용 인코딩)
+cpu 작업이라 프로세스 풀에서 실행 -> 모듈 최상위 함수, 도메인 모듈 (+ 스트림 코덱) 만 import
+"""
+from typing import List, NamedTuple, Optional
+
+from domains.data_analyzer import DataAnalyzer, ANALYZER_VERSION
+from domains.stream_features import zone_times
+from domains.training_load import session_load
+from domains.best_efforts import best_efforts
+from domains.elevation import apply_grade_adjustment
+from domains.stream_cleaning import clean_stream, CleaningReport
+from infra.stream_codec import encode_stream
+from schemas.models import ActivityData, LapData, StreamArrays, ZoneTimeData, BestEffortData, PhysiologyProfileData
+
+
+class AnalyzedActivity(NamedTuple):
+    activity: ActivityData
+    laps: List[LapData]
+    stream_data: Optional[bytes]  # 정리된 스트림 (저장 포맷). 배열보다 작아서 프로세스 간 전달도 빠름
+    zones: Optional[ZoneTimeData]
+    efforts: List[BestEffortData]
+    report: CleaningReport
+
+
+def analyze_activity(activity:ActivityData, laps:List[LapData],
+                     stream:Optional[StreamArrays],
+                     profile:PhysiologyProfileData) -> AnalyzedActivity:
+    """활동 분석. 다른 프로세스에서 실행되므로 수정한 객체를 돌려줌"""
+    # 센서 끊김/튐 정리 (정리된 스트림으로 분석, 저장)
+    stream, report = clean_stream(stream)
+
+    # 경사 보정 속도 (활동/랩) -> 분류에 사용
+    apply_grade_adjustment(activity, laps, stream)
+    res = DataAnalyzer(max_hr=profile.max_hr).analyze(activity=activity, laps=laps, stream=stream)
+    activity.activity_title = res.get("title", "러닝")
+    activity.analysis_result = res.get("detail", "세부내용 없음")
+    activity.analyzer_version = ANALYZER_VERSION
+    activity.training_load = session_load(activity, stream,
+                                          max_hr=profile.max_hr,
+                                          rest_hr=profile.rest_hr,
+                                          threshold_pace=profile.threshold_pace)
+
+    return AnalyzedActivity(activity=activity,
+                            laps=laps,
+                            stream_data=encode_stream(stream) if stream is not None else None,
+                            zones=zone_times(stream, max_hr=profile.max_hr),
+                            efforts=best_efforts(stream),
+                            report=report)
@@ -0,0 +1,64 @@
+"""
+수집 저장 단계. 분석된 활동을 모아서 한번에 저장 (테이블마다 multi-row insert, 커밋 1번)
+개수(write_batch_size) 또는 대기 시간(write_flush_seconds) 기준으로 저장.
+중복 활동은 저장시 uq_provider_activity 로 건너뜀
+"""
+import time
+from typing import List, Optional
+from uuid import UUID
+
+from config.settings import ingest
+from config.logger import get_logger
+from ports.training_port import TrainingPort
+from schemas.models import SessionBundle
+
+logger = get_logger(__file__)
+
+
+class SessionWriter:
+    def __init__(self, db_adapter:TrainingPort, user_id:UUID,
+                 batch_size:int = ingest.write_batch_size,
+                 flush_seconds:float = ingest.write_flush_seconds):
+        self.db_adapter = db_adapter
+        self.user_id = user_id
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self._buffer: List[SessionBundle] = []
+        self._oldest: Optional[float] = None  # 버퍼 첫 활동 추가 시각
+        self.rows_per_sec: Optional[float] = None  # 마지막 저장 처리량
+        self.last_rows = 0  # 마지막 저장 행 수
+
+    async def add(self, bundle:SessionBundle) -> int:
+        """버퍼에 추가. 기준 넘으면 저장
+            return: 이번에 저장된 활동 수 (저장 안했으면 0)
+        """
+        if not self._buffer:
+            self._oldest = time.monotonic()
+        self._buffer.append(bundle)
+
+        if len(self._buffer) >= self.batch_size \
+                or time.monotonic() - self._oldest >= self.flush_seconds:
+            return await self.flush()
+        return 0
+
+    async def flush(self) -> int:
+        """버퍼 저장. 커서/체크포인트 전진 전에 반드시 호출
+            return: 저장된 활동 수 (중복 제외)
+        """
+        if not self._buffer:
+            return 0
+        bundles, self._buffer = self._buffer, []
+
+        started = time.monotonic()
+        results = await self.db_adapter.save_sessions(user_id=self.user_id, bundles=bundles)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        saved = sum(results)
+
+        # 실제로 저장된 세션 + 스트림 + 랩 + 존 + 기록 행 수 (건너뛴 중복 제외)
+        rows = sum(2 + len(b.laps) + (b.zones is not None) + len(b.efforts or [])
+                   for b, ok in zip(bundles, results) if ok)
+        self.last_rows = rows
+        self.rows_per_sec = round(rows / elapsed, 1)
+        logger.info(f"saved {saved}/{len(bundles)} activities, {rows} rows "
+                    f"in {elapsed:.3f}s ({self.rows_per_sec} rows/sec)")
+        return saved
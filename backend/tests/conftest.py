@@ -0,0 +1,89 @@
+"""테스트 공용 설정
+
+앱 설정은 import 시점에 읽음 -> 다른 모듈 import 전에 환경변수 지정
+db 는 임시 sqlite 파일 (테스트마다 테이블 새로 생성)
+"""
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+_TMP = tempfile.mkdtemp(prefix="runlog-test-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_TMP}/test.sqlite3"
+os.environ["DATABASE_ECHO"] = "false"
+os.environ["RAW_ARCHIVE_ENABLED"] = "false"
+os.environ.setdefault("ENCRYPTION_KEY_REFRESH", "n0Gd8NkiZBWI1QuKrlBwOl6pCYoCf3rwuw0Od8xuLqk=")
+os.environ.setdefault("ENCRYPTION_KEY_STRAVA", "n0Gd8NkiZBWI1QuKrlBwOl6pCYoCf3rwuw0Od8xuLqk=")
+
+from sqlmodel import SQLModel  # noqa: E402
+
+from infra.db.storage.session import engine, AsyncSessionLocal, create_db_and_tables  # noqa: E402
+from infra.db.orm.models import User  # noqa: E402
+from schemas.models import ActivityData, LapData, StreamArrays, ZoneTimeData, SessionBundle  # noqa: E402
+
+
+@pytest.fixture
+def run():
+    """코루틴 실행기. 테스트마다 빈 db, 이벤트 루프 하나"""
+    loop = asyncio.new_event_loop()
+
+    async def reset():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.drop_all)
+        await create_db_and_tables()
+
+    loop.run_until_complete(reset())
+    yield loop.run_until_complete
+    loop.run_until_complete(engine.dispose())
+    loop.close()
+
+
+@pytest.fixture
+def db(run):
+    session = AsyncSessionLocal()
+    yield session
+    run(session.close())
+
+
+@pytest.fixture
+def make_user(run, db):
+    def make(email:str = "runner@example.com"):
+        user = User(email=email)
+        db.add(user)
+        run(db.commit())
+        return user.id
+    return make
+
+
+@pytest.fixture
+def make_bundle():
+    """세션 하나 저장 단위. hr=False 면 심박 없는 활동 (심박 존 없음)"""
+    def make(activity_id:int, hr:bool = True, laps:int = 3,
+             start:datetime = datetime(2024, 5, 1, 7)) -> SessionBundle:
+        n = 600
+        t = np.arange(n, dtype=np.float64)
+        stream = StreamArrays(time=t,
+                              velocity=np.full(n, 3.0),
+                              distance=t * 3.0,
+                              heartrate=np.full(n, 150.0) if hr else None)
+        return SessionBundle(
+            activity=ActivityData(activity_id=activity_id,
+                                  provider="strava",
+                                  distance=1800.0,
+                                  elapsed_time=n,
+                                  sport_type="Run",
+                                  start_date=start + timedelta(hours=activity_id),
+                                  average_speed=3.0,
+                                  average_heartrate=150.0 if hr else None),
+            laps=[LapData(lap_index=i + 1, distance=600.0, elapsed_time=200,
+                          average_speed=3.0, max_speed=3.5,
+                          average_heartrate=150.0 if hr else None)
+                  for i in reversed(range(laps))],
+            stream=stream,
+            zones=ZoneTimeData(hr_zones=[0, 100, 300, 200, 0] if hr else None,
+                               pace_zones=[0, 0, 600, 0, 0]),
+        )
+    return make
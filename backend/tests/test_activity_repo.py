@@ -0,0 +1,66 @@
+"""세션 저장 (add_train_sessions) / 재분석 입력"""
+from sqlalchemy import select, update
+
+from adapters import TrainingAdapter
+from infra.db.orm.models import TrainSessionZone, TrainSession
+from infra.db.storage import activity_repo as repo
+
+
+def _zones_by_activity(run, db):
+    res = run(db.execute(
+        select(TrainSession.activity_id, TrainSessionZone)
+        .join(TrainSessionZone, TrainSessionZone.session_id == TrainSession.id)
+    ))
+    return {activity_id: repo.zone_row_to_data(zone) for activity_id, zone in res.all()}
+
+
+def test_add_train_sessions_mixed_hr_batch(run, db, make_user, make_bundle):
+    """심박 있는/없는 활동이 한 배치에 섞여도 존이 제대로 저장 (순서 무관)"""
+    user_id = make_user()
+    bundles = [make_bundle(1, hr=True), make_bundle(2, hr=False),
+               make_bundle(3, hr=True), make_bundle(4, hr=False)]
+
+    ids = run(repo.add_train_sessions(db=db, user_id=user_id, bundles=bundles))
+    assert all(ids)
+
+    zones = _zones_by_activity(run, db)
+    assert zones[1].hr_zones == [0, 100, 300, 200, 0]
+    assert zones[3].hr_zones == [0, 100, 300, 200, 0]
+    assert zones[2].hr_zones is None
+    assert zones[4].hr_zones is None
+    assert all(z.pace_zones == [0, 0, 600, 0, 0] for z in zones.values())
+
+
+def test_add_train_sessions_skips_existing(run, db, make_user, make_bundle):
+    user_id = make_user()
+    run(repo.add_train_sessions(db=db, user_id=user_id, bundles=[make_bundle(1)]))
+
+    ids = run(repo.add_train_sessions(db=db, user_id=user_id,
+                                      bundles=[make_bundle(1), make_bundle(2, hr=False)]))
+    assert ids[0] is None and ids[1] is not None
+    assert len(_zones_by_activity(run, db)) == 2
+
+
+def test_session_hr_saved_for_reanalysis(run, db, make_user, make_bundle):
+    """평균/최대 심박은 세션에 저장 -> 재분석 입력에 그대로 (랩에서 다시 계산 안함)"""
+    user_id = make_user()
+    bundle = make_bundle(1)
+    bundle.activity.average_heartrate, bundle.activity.max_heartrate = 152.0, 181.0
+    run(repo.add_train_sessions(db=db, user_id=user_id, bundles=[bundle, make_bundle(2, hr=False)]))
+
+    items = run(TrainingAdapter(db=db).get_sessions_for_analysis(version=None, after_id=None, limit=10))
+    activities = {activity.activity_id: activity for _, _, activity, _, _ in items}
+    assert (activities[1].average_heartrate, activities[1].max_heartrate) == (152.0, 181.0)
+    assert (activities[2].average_heartrate, activities[2].max_heartrate) == (None, None)
+
+
+def test_reanalysis_hr_from_laps_for_old_rows(run, db, make_user, make_bundle):
+    """심박 컬럼 추가 전에 저장된 세션은 랩 시간 가중 평균"""
+    user_id = make_user()
+    run(repo.add_train_sessions(db=db, user_id=user_id, bundles=[make_bundle(1)]))
+    run(db.execute(update(TrainSession).values(average_heartrate=None, max_heartrate=None)))
+    run(db.commit())
+
+    (_, _, activity, _, _), = run(TrainingAdapter(db=db).get_sessions_for_analysis(
+        version=None, after_id=None, limit=10))
+    assert activity.average_heartrate == 150.0
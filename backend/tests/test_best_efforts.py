@@ -0,0 +1,130 @@
+"""최고 기록 구간 (best_efforts) / 기록 예측 (predict_race_times)
+
+전수 조사 (샘플마다 구간 시작/끝 두고 선형 보간) 결과와 비교
+"""
+import math
+
+import numpy as np
+import pytest
+
+from config.constants import BEST_EFFORT_DISTANCES, RIEGEL_EXPONENT
+from domains.best_efforts import best_efforts, predict_race_times
+from schemas.models import BestEffortData, StreamArrays
+
+
+def _brute_force(distance:np.ndarray, time:np.ndarray, target:float):
+    """가장 빠른 target 구간 시간. 목표 거리보다 짧으면 None"""
+    d = np.maximum.accumulate(distance)
+    n = len(d)
+
+    def leave(x):  # 마지막으로 x 지점에 있던 시각
+        for i in range(n - 1, -1, -1):
+            if d[i] <= x:
+                if i == n - 1 or d[i + 1] == d[i]:
+                    return time[i]
+                return time[i] + (x - d[i]) / (d[i + 1] - d[i]) * (time[i + 1] - time[i])
+
+    def arrive(x):  # 처음 x 지점에 도착한 시각
+        for k in range(n):
+            if d[k] >= x:
+                if k == 0 or d[k] == d[k - 1]:
+                    return time[k]
+                return time[k - 1] + (x - d[k - 1]) / (d[k] - d[k - 1]) * (time[k] - time[k - 1])
+
+    best = None
+    for j in range(n):
+        if d[j] - target >= d[0]:
+            elapsed = time[j] - leave(d[j] - target)
+            best = elapsed if best is None else min(best, elapsed)
+        if d[j] + target <= d[-1]:
+            elapsed = arrive(d[j] + target) - time[j]
+            best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _random_stream(seed:int) -> StreamArrays:
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(300, 900))
+    time = np.cumsum(rng.choice([1.0, 1.0, 2.0, 5.0], n))
+    v = rng.uniform(2.0, 6.0, n)
+    v[rng.random(n) < 0.1] = 0  # 정지
+    distance = np.cumsum(v * np.diff(time, prepend=0))
+    glitch = rng.random(n) < 0.03
+    distance[glitch] -= rng.uniform(0, 30, glitch.sum())  # gps 튐 (누적거리 감소)
+    return StreamArrays(time=time, distance=distance)
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_matches_brute_force(seed):
+    stream = _random_stream(seed)
+    efforts = best_efforts(stream)
+    covered = stream.distance.max() - stream.distance[0]
+    assert [e.distance for e in efforts] == [t for t in BEST_EFFORT_DISTANCES if t <= covered]
+    for effort in efforts:
+        expected = _brute_force(stream.distance, stream.time, effort.distance)
+        assert effort.elapsed_time == pytest.approx(expected, abs=0.05 + 1e-9)
+        assert effort.name == BEST_EFFORT_DISTANCES[effort.distance]
+
+
+def test_fast_section_found():
+    # 3 m/s 로 10분, 5 m/s 로 5분
+    v = np.r_[np.full(600, 3.0), np.full(300, 5.0)]
+    stream = StreamArrays(time=np.arange(1, 901, dtype=np.float64), distance=np.cumsum(v))
+    efforts = {e.distance: e for e in best_efforts(stream)}
+    assert efforts[1000].elapsed_time == 200.0
+    assert 599 <= efforts[1000].start_offset <= 700  # 빠른 구간 (첫 샘플 기준 599초) 안
+    assert efforts[400].elapsed_time == 80.0
+    assert set(efforts) == {400, 1000}  # 3300m -> 5k 없음
+
+
+def test_decreasing_distance_ignored():
+    t = np.arange(200, dtype=np.float64)
+    distance = t * 4.0
+    distance[100] -= 50  # 한 샘플만 뒤로 튐
+    efforts = best_efforts(StreamArrays(time=t, distance=distance))
+    # 뒤로 간 샘플은 1초 정지 + 다음 샘플에서 8m -> 54m 를 1초에 간 것으로 보지 않음
+    assert efforts[0].distance == 400 and efforts[0].elapsed_time == 99.0
+    assert efforts[0].elapsed_time == _brute_force(distance, t, 400)
+
+
+@pytest.mark.parametrize("stream", [
+    None,
+    StreamArrays(time=np.arange(100.0)),
+    StreamArrays(time=np.array([0.0]), distance=np.array([0.0])),
+    StreamArrays(time=np.arange(100.0), distance=np.arange(100.0) * 3.9),  # 386m < 400m
+])
+def test_short_or_missing_stream(stream):
+    assert best_efforts(stream) == []
+
+
+def _record(distance:int, seconds:float) -> BestEffortData:
+    return BestEffortData(distance=distance, name=BEST_EFFORT_DISTANCES[distance],
+                          elapsed_time=seconds, start_offset=0)
+
+
+@pytest.mark.parametrize("records", [
+    [_record(5000, 1200)],
+    [_record(1000, 210), _record(10000, 2500)],
+    [_record(400, 75), _record(1000, 205), _record(5000, 1180), _record(10000, 2480),
+     _record(21097, 5500)],
+])
+def test_predictions_match_brute_force(records):
+    predictions = predict_race_times(records)
+    assert [p.distance for p in predictions] == list(BEST_EFFORT_DISTANCES)
+
+    for p in predictions:
+        # 자기 거리 빼고 로그 비율이 가장 가까운 기록 (하나뿐이면 그 기록)
+        candidates = [r for r in records if r.distance != p.distance] or records
+        best = None
+        for r in candidates:
+            gap = abs(math.log(p.distance / r.distance))
+            if best is None or gap < best[0]:
+                best = (gap, r)
+        base = best[1]
+        assert p.based_on == base.name
+        assert p.predicted_time == pytest.approx(
+            base.elapsed_time * (p.distance / base.distance) ** RIEGEL_EXPONENT, abs=0.05)
+
+
+def test_no_records_no_predictions():
+    assert predict_race_times([]) == []
@@ -0,0 +1,76 @@
+"""analyze_many 와 analyze 결과가 같은지 (reanalyze / replay 가 analyze_many 사용)"""
+import random
+from datetime import datetime
+
+import numpy as np
+
+from domains.data_analyzer import DataAnalyzer
+from schemas.models import ActivityData, LapData, StreamArrays
+
+
+def _laps(rng:random.Random):
+    kind = rng.choice(["none", "even", "interval", "random"])
+    if kind == "none":
+        return []
+    n = rng.randint(1, 14)
+    laps = []
+    for i in range(n):
+        if kind == "even":
+            speed = rng.uniform(2.5, 3.5)
+        elif kind == "interval":
+            speed = rng.uniform(4.5, 5.5) if i % 2 == 0 else rng.uniform(2.0, 2.8)
+        else:
+            speed = rng.choice([0.0, rng.uniform(1.5, 6.0)])
+        distance = 1000.0 if kind == "even" else rng.uniform(200, 2000)
+        laps.append(LapData(lap_index=i + 1,
+                            distance=distance,
+                            elapsed_time=int(distance / speed) if speed else 0,
+                            average_speed=speed,
+                            max_speed=speed * 1.2,
+                            average_heartrate=rng.choice([None, rng.uniform(100, 190)])))
+    return laps
+
+
+def _activity(rng:random.Random, i:int) -> ActivityData:
+    distance = rng.choice([None, 0.0, rng.uniform(1000, 30000)])
+    return ActivityData(activity_id=i,
+                        distance=distance,
+                        elapsed_time=rng.choice([0, rng.randint(600, 12000)]),
+                        sport_type="Run",
+                        start_date=datetime(2024, 1, 1),
+                        average_speed=rng.uniform(2.0, 5.0),
+                        average_heartrate=rng.choice([None, rng.uniform(60, 195)]))
+
+
+def _stream(rng:random.Random):
+    if rng.random() < 0.5:
+        return None
+    n = 1800
+    t = np.arange(n, dtype=float)
+    fast = (t // rng.choice([120, 180, 240])) % 2 == 0
+    v = np.where(fast, 4.8, 2.4) if rng.random() < 0.5 else np.full(n, 3.0)
+    return StreamArrays(time=t, velocity=v, distance=np.cumsum(v), heartrate=np.full(n, 150.0))
+
+
+def test_analyze_many_matches_analyze():
+    rng = random.Random(0)
+    for max_hr in (175, 190, 205):
+        analyzer = DataAnalyzer(max_hr=max_hr)
+        activities = [_activity(rng, i) for i in range(300)]
+        laps_list = [_laps(rng) for _ in activities]
+        streams = [_stream(rng) for _ in activities]
+
+        batch = analyzer.analyze_many(activities, laps_list, streams)
+        single = [analyzer.analyze(a, l, s) for a, l, s in zip(activities, laps_list, streams)]
+        assert batch == single
+
+
+def test_analyze_many_without_streams():
+    rng = random.Random(1)
+    analyzer = DataAnalyzer()
+    activities = [_activity(rng, i) for i in range(300)]
+    laps_list = [_laps(rng) for _ in activities]
+
+    batch = analyzer.analyze_many(activities, laps_list)
+    assert batch == [analyzer.analyze(a, l, None) for a, l in zip(activities, laps_list)]
+    assert analyzer.analyze_many([], []) == []
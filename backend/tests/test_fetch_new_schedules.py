@@ -0,0 +1,191 @@
+"""증분 동기화 (TrainSessionHandler.fetch_new_schedules)
+
+스트라바 호출은 가짜 어댑터, 저장은 테스트 db (TrainingAdapter)
+"""
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from adapters import TrainingAdapter
+from schemas.models import ActivityData, LapData, StreamArrays, TokenPayload
+from use_cases.train_session.handle_train_session import TrainSessionHandler, SYNC_PROVIDER
+
+
+def _activity(activity_id:int, ts:int, sport_type:str = "Run") -> ActivityData:
+    start = datetime.fromtimestamp(ts, tz=timezone.utc)
+    return ActivityData(activity_id=activity_id, provider="strava", distance=1800.0,
+                        elapsed_time=600, sport_type=sport_type,
+                        start_date=start.replace(tzinfo=None), start_date_utc=start,
+                        average_speed=3.0, average_heartrate=150.0)
+
+
+class FakeStrava:
+    """iter_activities 는 정해진 페이지를 순서대로. fail_on 활동의 랩 요청은 실패"""
+
+    def __init__(self, pages, fail_on=None, error:Exception = None):
+        self.pages = pages
+        self.fail_on = fail_on
+        self.error = error or RuntimeError("strava down")
+        self.after_dates = []
+        self.fetched = []
+
+    async def iter_activities(self, access_token:str, after_date=None):
+        self.after_dates.append(after_date)
+        for page in self.pages:
+            yield page
+
+    async def fetch_activity_lap(self, access_token:str, activity_id:int):
+        if activity_id == self.fail_on:
+            raise self.error
+        self.fetched.append(activity_id)
+        return [LapData(lap_index=1, distance=1800.0, elapsed_time=600, average_speed=3.0,
+                        max_speed=3.5, average_heartrate=150.0)]
+
+    async def fetch_activity_stream(self, access_token:str, activity_id:int):
+        t = np.arange(600, dtype=np.float64)
+        return StreamArrays(time=t, distance=t * 3.0, velocity=np.full(600, 3.0),
+                            heartrate=np.full(600, 150.0))
+
+
+class FakeAuth:
+    async def get_access_and_refresh_if_expired(self, payload):
+        return "token"
+
+
+class SpyTrainingAdapter(TrainingAdapter):
+    """이미 저장된 활동 조회 기록"""
+
+    def __init__(self, db):
+        super().__init__(db=db)
+        self.existing_queries = []
+
+    async def get_existing_activity_ids(self, provider, activity_ids):
+        self.existing_queries.append(sorted(activity_ids))
+        return await super().get_existing_activity_ids(provider=provider, activity_ids=activity_ids)
+
+
+@pytest.fixture
+def sync(run, db, make_user):
+    user_id = make_user()
+    payload = TokenPayload(user_id=user_id, exp=0, iat=0)
+    adapter = SpyTrainingAdapter(db)
+
+    def call(strava:FakeStrava, **kwargs):
+        handler = TrainSessionHandler(data_adapter=strava, db_adapter=adapter, auth_handler=FakeAuth())
+        return run(handler.fetch_new_schedules(payload=payload, **kwargs))
+
+    call.state = lambda: run(adapter.get_sync_state(user_id=user_id, provider=SYNC_PROVIDER))
+    call.saved_ids = lambda: run(adapter.get_existing_activity_ids(provider="strava",
+                                                                     activity_ids=list(range(1, 100))))
+    call.adapter = adapter
+    call.payload = payload
+    call.run = run
+    return call
+
+
+def test_cursor_is_max_start_over_pages(sync):
+    # 페이지 안/페이지 사이 순서가 섞여도 가장 최근 시작 시각
+    strava = FakeStrava([[_activity(1, 1_000_300), _activity(2, 1_001_000), _activity(3, 1_000_500)],
+                         [_activity(4, 1_000_700), _activity(5, 1_000_800)]])
+    progress = []
+
+    async def on_progress(**counts):
+        progress.append(counts)
+
+    assert sync(strava, progress=on_progress) is True
+    state = sync.state()
+    assert state.last_activity_at == 1_001_000
+    assert state.last_error is None and state.last_synced_at is not None
+    assert sync.saved_ids() == {1, 2, 3, 4, 5}
+    assert [(p["pages"], p["saved"]) for p in progress] == [(1, 3), (2, 5)]
+
+    # 다음 동기화는 커서부터
+    again = FakeStrava([[_activity(6, 1_002_000)]])
+    sync(again)
+    assert again.after_dates == [1_001_000]
+    assert sync.state().last_activity_at == 1_002_000
+
+
+def test_cursor_never_moves_back(sync):
+    sync(FakeStrava([[_activity(1, 2_000_000)]]))
+    # 과거 날짜 지정 -> 예전 활동만 받아도 커서 유지
+    strava = FakeStrava([[_activity(2, 1_500_000)]])
+    sync(strava, start_date=1_400_000)
+    assert strava.after_dates == [1_400_000]
+    assert sync.state().last_activity_at == 2_000_000
+
+
+def test_full_resync_ignores_cursor(sync):
+    sync(FakeStrava([[_activity(1, 2_000_000)]]))
+    strava = FakeStrava([[_activity(1, 2_000_000), _activity(2, 1_000_000)]])
+    sync(strava, full_resync=True)
+    assert strava.after_dates == [None]
+    assert sync.saved_ids() == {1, 2}
+    assert strava.fetched == [2]  # 이미 저장된 1 은 랩/스트림 요청 안함
+    assert sync.state().last_activity_at == 2_000_000
+
+
+def test_prefilter_skips_saved_and_non_runs(sync):
+    sync(FakeStrava([[_activity(1, 1_000_000), _activity(2, 1_000_100)]]))
+    sync.adapter.existing_queries.clear()
+
+    strava = FakeStrava([
+        [_activity(1, 1_000_000), _activity(3, 1_000_200, sport_type="Ride"), _activity(4, 1_000_300)],
+        [_activity(2, 1_000_100), _activity(5, 1_000_400, sport_type="Swim")],  # 새 러닝 없음
+        [_activity(6, 1_000_500, sport_type="Ride")],  # 러닝 없음 -> 조회 안함
+    ])
+    sync(strava, full_resync=True)
+    # 페이지당 한번, 러닝만
+    assert sync.adapter.existing_queries == [[1, 4], [2]]
+    assert strava.fetched == [4]
+    assert sync.saved_ids() == {1, 2, 4}
+    assert sync.state().last_activity_at == 1_000_500  # 건너뛴 활동도 커서에 반영
+
+
+@pytest.mark.parametrize("error, status, message", [
+    (RuntimeError("strava down"), 500, "strava down"),
+    (HTTPException(status_code=429, detail="rate limited"), 429, "rate limited"),
+])
+def test_failure_keeps_completed_pages_and_records_error(sync, error, status, message):
+    sync(FakeStrava([[_activity(1, 1_000_000)]]))
+    strava = FakeStrava([[_activity(2, 1_000_100), _activity(3, 1_000_200)],
+                         [_activity(4, 1_000_300)],
+                         [_activity(5, 1_000_400)]], fail_on=4, error=error)
+
+    with pytest.raises(HTTPException) as exc:
+        sync(strava)
+    assert exc.value.status_code == status
+
+    state = sync.state()
+    assert state.last_error == message
+    # 끝난 페이지 (2, 3) 까지 커서 전진, 실패한 페이지 이후는 안 받음
+    assert state.last_activity_at == 1_000_200
+    assert sync.saved_ids() == {1, 2, 3}
+
+    # 다시 시도하면 실패 지점부터, 성공하면 오류 지움
+    retry = FakeStrava([[_activity(4, 1_000_300)], [_activity(5, 1_000_400)]])
+    sync(retry)
+    assert retry.after_dates == [1_000_200]
+    state = sync.state()
+    assert state.last_error is None and state.last_activity_at == 1_000_400
+
+
+def test_token_failure_keeps_cursor(sync):
+    sync(FakeStrava([[_activity(1, 1_000_000)]]))
+
+    class NoToken:
+        async def get_access_and_refresh_if_expired(self, payload):
+            return None
+
+    handler = TrainSessionHandler(data_adapter=FakeStrava([]), db_adapter=sync.adapter,
+                                  auth_handler=NoToken())
+    with pytest.raises(HTTPException) as exc:
+        sync.run(handler.fetch_new_schedules(payload=sync.payload))
+    assert exc.value.status_code == 400
+
+    # 커서 읽기 전 실패 -> 오류만 기록, 커서는 그대로
+    state = sync.state()
+    assert state.last_error == "token returned None."
+    assert state.last_activity_at == 1_000_000
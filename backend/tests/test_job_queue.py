@@ -0,0 +1,219 @@
+"""수집 작업 큐 (InMemoryJobQueue) 와 워커 풀 (IngestWorkerPool)"""
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from infra.job_queue import InMemoryJobQueue
+from use_cases.train_session import ingest_worker
+from use_cases.train_session.ingest_worker import IngestWorkerPool
+
+
+class FakeHandler:
+    """fetch_new_schedules 대신 호출 기록. gate 가 열릴때까지 대기"""
+    gate: asyncio.Event
+    active: dict
+    max_active: dict
+    started: list
+    fail: dict = {}
+
+    def __init__(self, **kwargs):
+        ...
+
+    async def fetch_new_schedules(self, payload, start_date=None, full_resync=False, progress=None):
+        cls = type(self)
+        user_id = payload.user_id
+        cls.started.append(user_id)
+        cls.active[user_id] = cls.active.get(user_id, 0) + 1
+        cls.max_active[user_id] = max(cls.max_active.get(user_id, 0), cls.active[user_id])
+        try:
+            await progress(pages=1, saved=2)
+            await cls.gate.wait()
+            if user_id in cls.fail:
+                raise cls.fail[user_id]
+        finally:
+            cls.active[user_id] -= 1
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    FakeHandler.gate = asyncio.Event()
+    FakeHandler.active, FakeHandler.max_active, FakeHandler.started = {}, {}, []
+    FakeHandler.fail = {}
+    monkeypatch.setattr(ingest_worker, "TrainSessionHandler", FakeHandler)
+    return FakeHandler
+
+
+async def _until(cond, timeout:float = 2.0):
+    for _ in range(int(timeout / 0.01)):
+        if cond():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("timeout")
+
+
+def _pool(queue, workers=2):
+    return IngestWorkerPool(queue, SimpleNamespace(strava=None), workers=workers, name="test")
+
+
+def test_same_user_jobs_run_one_at_a_time(run, handler):
+    user_id = uuid4()
+
+    async def scenario():
+        queue = InMemoryJobQueue()
+        pool = _pool(queue, workers=2)
+        pool.start()
+        first = await queue.submit(user_id)
+        second = await queue.submit(user_id)
+
+        await _until(lambda: len(handler.started) == 1)
+        await asyncio.sleep(0.05)
+        # 두번째 작업은 꺼냈지만 락 대기 중
+        assert len(handler.started) == 1
+        assert (await queue.get(second.job_id)).status == "queued"
+
+        handler.gate.set()
+        await _until(lambda: len(handler.started) == 2)
+        for job in (first, second):
+            await _until(lambda: queue._jobs[job.job_id].status == "done")
+        await pool.stop()
+        return queue
+
+    queue = run(scenario())
+    assert handler.max_active[user_id] == 1
+    # 락을 쓰는 작업이 없으면 정리됨
+    assert queue._locks == {} and queue._lock_users == {}
+
+
+def test_different_users_run_in_parallel(run, handler):
+    users = [uuid4(), uuid4()]
+
+    async def scenario():
+        queue = InMemoryJobQueue()
+        pool = _pool(queue, workers=2)
+        pool.start()
+        for user_id in users:
+            await queue.submit(user_id)
+        # gate 가 닫힌 상태에서 둘 다 시작해야 함
+        await _until(lambda: sum(handler.active.values()) == 2)
+        handler.gate.set()
+        await _until(lambda: all(job.status == "done" for job in queue._jobs.values()))
+        await pool.stop()
+        return queue
+
+    queue = run(scenario())
+    assert set(handler.started) == set(users)
+    assert queue._locks == {} and queue._lock_users == {}
+
+
+def test_status_moves_queued_running_done(run, handler):
+    async def scenario():
+        queue = InMemoryJobQueue()
+        job = await queue.submit(uuid4())
+        assert job.status == "queued"
+
+        pool = _pool(queue, workers=1)
+        pool.start()
+        await _until(lambda: handler.started)
+        running = await queue.get(job.job_id)
+        handler.gate.set()
+        await _until(lambda: queue._jobs[job.job_id].status == "done")
+        await pool.stop()
+        return running, await queue.get(job.job_id)
+
+    running, done = run(scenario())
+    assert running.status == "running"
+    assert (running.pages, running.saved) == (1, 2)  # progress 콜백 반영
+    assert done.error is None and done.updated_at is not None
+
+
+@pytest.mark.parametrize("error, message", [
+    (HTTPException(status_code=400, detail="strava not connected"), "strava not connected"),
+    (RuntimeError("boom"), "internal server error"),
+])
+def test_failed_job_records_error_and_worker_keeps_going(run, handler, error, message):
+    bad, good = uuid4(), uuid4()
+    handler.fail[bad] = error
+
+    async def scenario():
+        queue = InMemoryJobQueue()
+        pool = _pool(queue, workers=1)
+        pool.start()
+        failed = await queue.submit(bad)
+        ok = await queue.submit(good)
+        handler.gate.set()
+        await _until(lambda: queue._jobs[ok.job_id].status == "done")
+        await pool.stop()
+        return await queue.get(failed.job_id), queue
+
+    failed, queue = run(scenario())
+    assert failed.status == "failed"
+    assert failed.error == message
+    assert queue._locks == {} and queue._lock_users == {}
+
+
+def test_user_lock_cleaned_up_when_waiter_cancelled(run):
+    user_id = uuid4()
+
+    async def scenario():
+        queue = InMemoryJobQueue()
+        holding = asyncio.Event()
+        release = asyncio.Event()
+
+        async def holder():
+            async with queue.user_lock(user_id):
+                holding.set()
+                await release.wait()
+
+        async def waiter():
+            async with queue.user_lock(user_id):
+                ...
+
+        held = asyncio.create_task(holder())
+        await holding.wait()
+        waiting = asyncio.create_task(waiter())
+        await asyncio.sleep(0)
+        assert queue._lock_users[user_id] == 2
+
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert queue._lock_users[user_id] == 1
+
+        release.set()
+        await held
+        return queue
+
+    queue = run(scenario())
+    assert queue._locks == {} and queue._lock_users == {}
+
+
+def test_redis_queue_recovers_unacked_jobs(run):
+    fakeredis = pytest.importorskip("fakeredis")
+    from infra.job_queue import RedisJobQueue
+
+    async def scenario():
+        queue = RedisJobQueue(fakeredis.FakeAsyncRedis(decode_responses=True))
+        first = await queue.submit(uuid4())
+        second = await queue.submit(uuid4())
+
+        # 첫 작업을 꺼낸 뒤 워커가 죽음 (ack 없음)
+        taken = await queue.next_job("w-0")
+        await queue.update(taken.job_id, status="running")
+        assert taken.job_id == first.job_id
+        assert await queue.redis.llen(queue.QUEUE_KEY) == 1
+
+        # 다시 시작 -> 처리중 작업이 큐 맨 앞으로
+        assert await queue.recover("w-0") == 1
+        assert (await queue.get(first.job_id)).status == "queued"
+        again = await queue.next_job("w-0")
+        await queue.ack("w-0", again.job_id)
+        after = await queue.next_job("w-0")
+        await queue.ack("w-0", after.job_id)
+        processing = await queue.redis.llen(queue.PROCESSING_KEY.format("w-0"))
+        return [first.job_id, second.job_id], [again.job_id, after.job_id], processing
+
+    submitted, taken, processing = run(scenario())
+    assert taken == submitted  # 복구한 작업 먼저, 순서 유지
+    assert processing == 0
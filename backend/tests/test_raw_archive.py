@@ -0,0 +1,128 @@
+"""스트라바 원본 보관소 (infra.raw_archive) / 보관 원본으로 재분석 (replay)"""
+import json
+from pathlib import Path
+
+import pytest
+from sqlmodel import select
+
+from adapters import TrainingAdapter
+from domains.data_analyzer import ANALYZER_VERSION
+from infra.db.orm.models import TrainSession
+from infra.raw_archive import RawArchive
+from infra.strava_codec import split_activities
+from use_cases.train_session.replay import classify_chunk, iter_archived, replay_to_db
+
+FIXTURES = Path(__file__).parent / "fixtures" / "strava"
+
+
+def _objects(root:Path):
+    return sorted(p.name for p in (root / "objects").rglob("*.zz"))
+
+
+def test_put_get_round_trip(tmp_path):
+    archive = RawArchive(tmp_path)
+    digest = archive.put("strava", 1, "laps", b'[{"lap_index":1}]')
+    assert archive.get("strava", 1, "laps") == b'[{"lap_index":1}]'
+    assert archive.get_index("strava", 1) == {"laps": digest}
+    assert archive.get("strava", 1, "streams") is None
+    assert archive.get("strava", 2, "laps") is None
+    assert archive.get_index("garmin", 1) == {}
+
+
+def test_same_content_stored_once(tmp_path):
+    archive = RawArchive(tmp_path)
+    raw = b'{"time":{"data":[0,1,2]}}'
+    first = archive.put("strava", 1, "streams", raw)
+    # 다시 받은 같은 응답, 다른 활동의 같은 내용 -> 객체 하나
+    assert archive.put("strava", 1, "streams", raw) == first
+    assert archive.put("strava", 2, "streams", raw) == first
+    assert _objects(tmp_path) == [f"{first}.zz"]
+    assert sorted(archive.iter_activity_ids("strava")) == [1, 2]
+
+    # 내용 바뀌면 새 객체, 인덱스는 새 해시
+    second = archive.put("strava", 1, "streams", raw + b" ")
+    assert second != first and len(_objects(tmp_path)) == 2
+    assert archive.get("strava", 1, "streams") == raw + b" "
+    assert archive.get("strava", 2, "streams") == raw
+
+
+def test_missing_object_is_none(tmp_path):
+    archive = RawArchive(tmp_path)
+    digest = archive.put("strava", 1, "activity", b'{"id":1}')
+    (tmp_path / "objects" / digest[:2] / f"{digest}.zz").unlink()
+    assert archive.get("strava", 1, "activity") is None
+
+
+def test_empty_archive_has_no_ids(tmp_path):
+    assert list(RawArchive(tmp_path / "nothing").iter_activity_ids("strava")) == []
+
+
+# ------------------------
+# replay
+# ------------------------
+@pytest.fixture
+def archived(tmp_path):
+    """fixture 응답 보관. 러닝 (랩/스트림 있음), 러닝 (스트림 없음), 자전거, db 에 없는 러닝"""
+    archive = RawArchive(tmp_path)
+    items = split_activities((FIXTURES / "activities.json").read_bytes())
+    run_id, virtual_id, ride_id = [activity_id for activity_id, _ in items]
+    laps = (FIXTURES / "laps.json").read_bytes()
+    streams = (FIXTURES / "streams.json").read_bytes()
+
+    for activity_id, raw in items:
+        archive.put("strava", activity_id, "activity", raw)
+    for activity_id in (run_id, ride_id):
+        archive.put("strava", activity_id, "laps", laps)
+        archive.put("strava", activity_id, "streams", streams)
+
+    unknown_id = run_id + 100
+    raw = json.loads(items[0][1])
+    raw["id"] = unknown_id
+    archive.put("strava", unknown_id, "activity", json.dumps(raw).encode())
+    archive.put("strava", unknown_id, "laps", laps)
+    archive.put("strava", unknown_id, "streams", streams)
+
+    archive.ids = {"run": run_id, "virtual": virtual_id, "ride": ride_id, "unknown": unknown_id}
+    return archive
+
+
+def test_iter_archived_skips_incomplete_and_non_runs(archived):
+    chunks = list(iter_archived(archived, chunk_size=1))
+    ids = sorted(activity.activity_id for chunk in chunks for activity, _, _ in chunk)
+    assert ids == sorted([archived.ids["run"], archived.ids["unknown"]])
+    assert all(len(chunk) == 1 for chunk in chunks)
+
+
+@pytest.mark.parametrize("batch_size", [1, 500])
+def test_replay_updates_stored_sessions(run, db, make_user, make_bundle, archived, batch_size):
+    user_id = make_user()
+    adapter = TrainingAdapter(db=db)
+    bundles = []
+    for i, key in enumerate(("run", "virtual"), start=1):
+        bundle = make_bundle(i)  # 시작 시각이 id 만큼 밀림 -> 실제 스트라바 id 는 나중에
+        bundle.activity.activity_id = archived.ids[key]
+        bundles.append(bundle)
+    run(adapter.save_sessions(user_id=user_id, bundles=bundles))
+    targets = run(adapter.get_activity_sessions(provider="strava",
+                                                activity_ids=list(archived.ids.values())))
+    assert set(targets) == {archived.ids["run"], archived.ids["virtual"]}
+    session_id = targets[archived.ids["run"]][0]
+    other_id = targets[archived.ids["virtual"]][0]
+    # 이전 분석기 결과
+    run(adapter.update_session_analyses(results=[
+        {"session_id": sid, "activity_title": "old", "analysis_result": "old", "analyzer_version": 0}
+        for sid in (session_id, other_id)]))
+
+    updated = run(replay_to_db(archive=archived, db_adapter=adapter, batch_size=batch_size))
+    assert updated == 1  # 스트림 없는 활동, db 에 없는 활동, 자전거는 제외
+
+    expected = classify_chunk([item for chunk in iter_archived(archived) for item in chunk], targets)
+    assert [r["session_id"] for r in expected] == [session_id]
+
+    db.expire_all()
+    rows = {row.id: row for row in run(db.execute(select(TrainSession))).scalars()}
+    row = rows[session_id]
+    assert (row.activity_title, row.analysis_result) == (expected[0]["activity_title"],
+                                                         expected[0]["analysis_result"])
+    assert row.analyzer_version == ANALYZER_VERSION
+    assert (rows[other_id].analysis_result, rows[other_id].analyzer_version) == ("old", 0)
@@ -0,0 +1,36 @@
+"""세션 세부 조회 (쿼리 수, 랩 순서, 소유자 확인)"""
+import pytest
+from fastapi import HTTPException
+
+from adapters import TrainingAdapter
+from infra.db.query_counter import count_queries
+
+
+def test_session_detail_two_queries(run, db, make_user, make_bundle):
+    user_id = make_user()
+    adapter = TrainingAdapter(db=db)
+    run(adapter.save_sessions(user_id=user_id, bundles=[make_bundle(1, laps=5)]))
+    session_id = run(adapter.get_sessions_by_date(user_id=user_id, start_date=0))[0].session_id
+
+    with count_queries() as counter:
+        detail = run(adapter.get_session_detail(user_id=user_id, session_id=session_id))
+
+    assert counter.count == 2, counter.statements
+    assert [lap.lap_index for lap in detail.laps] == [1, 2, 3, 4, 5]
+    assert len(detail.stream.heartrate) == 600
+    assert detail.zones.hr_zones == [0, 100, 300, 200, 0]
+
+
+def test_session_detail_other_user(run, db, make_user, make_bundle):
+    owner = make_user("owner@example.com")
+    other = make_user("other@example.com")
+    adapter = TrainingAdapter(db=db)
+    run(adapter.save_sessions(user_id=owner, bundles=[make_bundle(1)]))
+    session_id = run(adapter.get_sessions_by_date(user_id=owner, start_date=0))[0].session_id
+
+    with count_queries() as counter:
+        with pytest.raises(HTTPException) as exc:
+            run(adapter.get_session_detail(user_id=other, session_id=session_id))
+
+    assert exc.value.status_code == 400
+    assert counter.count == 1
@@ -0,0 +1,97 @@
+"""세션 목록 keyset 페이지 (GET /trainsession/fetch-schedules)"""
+import base64
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from adapters import TrainingAdapter
+from interfaces.api import train_session
+from schemas.models import TokenPayload
+from use_cases.auth.dependencies import get_current_user
+from use_cases.train_session.handle_train_session import TrainSessionHandler
+
+DAY = datetime(2024, 5, 1, 7)
+
+
+@pytest.fixture
+def api(run, db, make_user):
+    """목록 라우터만 올린 앱. 로그인/핸들러는 테스트 db 로 대체"""
+    user_id = make_user()
+    app = FastAPI()
+    app.include_router(train_session.router)
+    app.dependency_overrides[get_current_user] = lambda: TokenPayload(user_id=user_id, exp=0, iat=0)
+    app.dependency_overrides[train_session.get_handler] = lambda: TrainSessionHandler(
+        db_adapter=TrainingAdapter(db=db), data_adapter=None, auth_handler=None)
+
+    def get(**params):
+        async def call():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.get("/trainsession/fetch-schedules", params=params)
+        return run(call())
+
+    get.user_id = user_id
+    return get
+
+
+def _save(run, db, user_id, bundles):
+    run(TrainingAdapter(db=db).save_sessions(user_id=user_id, bundles=bundles))
+
+
+def _walk(get, limit:int, **params):
+    seen, pages, cursor = [], 0, None
+    while True:
+        res = get(limit=limit, cursor=cursor, **params) if cursor else get(limit=limit, **params)
+        assert res.status_code == 200
+        rows = res.json()
+        pages += 1
+        seen.extend(rows)
+        cursor = res.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return seen, pages
+        assert len(rows) == limit
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 11, 50])
+def test_walk_pages_with_same_date(api, run, db, make_bundle, limit):
+    bundles = []
+    for activity_id in range(1, 12):
+        bundle = make_bundle(activity_id)
+        # 7개는 같은 시각, 나머지는 그 전후
+        bundle.activity.start_date = DAY if activity_id <= 7 else DAY.replace(hour=activity_id)
+        bundles.append(bundle)
+    _save(run, db, api.user_id, bundles)
+
+    start = int(DAY.replace(hour=0, tzinfo=timezone.utc).timestamp())
+    seen, pages = _walk(api, limit=limit, date=start)
+
+    ids = [row["session_id"] for row in seen]
+    assert len(ids) == len(set(ids)) == 11  # 중복, 누락 없음
+    assert pages == -(-11 // limit)  # 한 개 더 읽어서 확인 -> 빈 마지막 페이지 없음
+    # 날짜, id 순
+    keys = [(row["train_date"], row["session_id"]) for row in seen]
+    assert keys == sorted(keys)
+
+
+def test_page_respects_end_date(api, run, db, make_bundle):
+    _save(run, db, api.user_id, [make_bundle(i) for i in range(1, 6)])  # DAY + i 시간
+    start = int(DAY.replace(tzinfo=timezone.utc).timestamp())
+    end = int(DAY.replace(hour=10, tzinfo=timezone.utc).timestamp())
+    seen, _ = _walk(api, limit=2, date=start, end_date=end)
+    assert len(seen) == 2  # 8시, 9시
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor!",
+    "한글",
+    base64.urlsafe_b64encode(b"garbage").decode(),
+    base64.urlsafe_b64encode(b"2024-05-01T07:00:00|nothex").decode(),
+    base64.urlsafe_b64encode(b"yesterday|" + b"0" * 32).decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe\xfd").decode(),
+])
+def test_malformed_cursor_is_400(api, cursor):
+    res = api(cursor=cursor)
+    assert res.status_code == 400
+    assert res.json()["detail"] == "invalid cursor"
@@ -0,0 +1,26 @@
+"""수집 저장 단계 (SessionWriter)"""
+from adapters import TrainingAdapter
+from use_cases.train_session.session_writer import SessionWriter
+
+
+def test_flush_counts_only_saved_rows(run, db, make_user, make_bundle):
+    user_id = make_user()
+    adapter = TrainingAdapter(db=db)
+    run(adapter.save_sessions(user_id=user_id, bundles=[make_bundle(1), make_bundle(2)]))
+
+    writer = SessionWriter(adapter, user_id, batch_size=10, flush_seconds=60)
+    for activity_id in (1, 2, 3):
+        assert run(writer.add(make_bundle(activity_id, laps=4))) == 0
+    assert run(writer.flush()) == 1
+
+    # 3번 활동만 저장됨 -> 세션 1 + 스트림 1 + 랩 4 + 존 1
+    assert writer.last_rows == 7
+
+
+def test_flush_on_batch_size(run, db, make_user, make_bundle):
+    user_id = make_user()
+    writer = SessionWriter(TrainingAdapter(db=db), user_id, batch_size=2, flush_seconds=60)
+
+    assert run(writer.add(make_bundle(1))) == 0
+    assert run(writer.add(make_bundle(2))) == 2
+    assert run(writer.flush()) == 0
@@ -0,0 +1,127 @@
+"""스트라바 응답 디코딩 (infra.strava_codec)
+
+fixtures/strava 는 실제 응답 형태 (필요 없는 필드, 정수로 온 실수, 심박 없는 활동 포함).
+msgspec 디코딩 + model_construct 결과가 같은 입력을 pydantic 으로 검증한 것과 같아야 함
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from infra.strava_codec import decode_activities, decode_activity, decode_laps, decode_stream, split_activities
+from schemas.models import ActivityData, LapData
+
+FIXTURES = Path(__file__).parent / "fixtures" / "strava"
+
+
+def _raw(name:str) -> bytes:
+    return (FIXTURES / f"{name}.json").read_bytes()
+
+
+def _double(value):
+    return value * 2 if value is not None else None
+
+
+def _validated_activity(a:dict) -> ActivityData:
+    return ActivityData.model_validate({
+        "activity_id": a["id"],
+        "provider": "strava",
+        "distance": a.get("distance"),
+        "elapsed_time": a["elapsed_time"],
+        "sport_type": a["sport_type"],
+        "start_date": a["start_date_local"],
+        "start_date_utc": a.get("start_date"),
+        "average_speed": a.get("average_speed"),
+        "max_speed": a.get("max_speed"),
+        "average_heartrate": a.get("average_heartrate"),
+        "max_heartrate": a.get("max_heartrate"),
+        "average_cadence": _double(a.get("average_cadence")),
+        "elevation_gain": a.get("total_elevation_gain"),
+    })
+
+
+def _validated_lap(lap:dict) -> LapData:
+    return LapData.model_validate({
+        "lap_index": lap["lap_index"],
+        "distance": lap["distance"],
+        "elapsed_time": lap["elapsed_time"],
+        "average_speed": lap["average_speed"],
+        "max_speed": lap["max_speed"],
+        "average_heartrate": lap.get("average_heartrate"),
+        "max_heartrate": lap.get("max_heartrate"),
+        "average_cadence": _double(lap.get("average_cadence")),
+        "elevation_gain": lap.get("total_elevation_gain"),
+    })
+
+
+def _assert_same_model(got, expected):
+    assert got == expected
+    # 값 타입까지 (정수로 온 실수 필드는 float, 시각은 tz 포함)
+    for field in type(expected).model_fields:
+        a, b = getattr(got, field), getattr(expected, field)
+        assert type(a) is type(b), field
+        if hasattr(b, "utcoffset"):
+            assert a.utcoffset() == b.utcoffset(), field
+
+
+def test_activities_match_validated():
+    raw = _raw("activities")
+    decoded = decode_activities(raw)
+    expected = [_validated_activity(a) for a in json.loads(raw)]
+    assert len(decoded) == len(expected) == 3
+    for got, want in zip(decoded, expected):
+        _assert_same_model(got, want)
+
+    # 심박/케이던스 없는 활동은 None
+    assert decoded[1].average_heartrate is None and decoded[1].average_cadence is None
+    assert decoded[1].max_speed == 3.0 and isinstance(decoded[1].max_speed, float)
+
+
+def test_split_activities_round_trip():
+    raw = _raw("activities")
+    items = split_activities(raw)
+    assert [activity_id for activity_id, _ in items] == [a["id"] for a in json.loads(raw)]
+    # 활동별 원본 -> 보관 후 다시 디코딩해도 목록 디코딩과 같음
+    for (activity_id, item), listed in zip(items, decode_activities(raw)):
+        assert json.loads(item)["id"] == activity_id
+        _assert_same_model(decode_activity(item), listed)
+
+
+def test_laps_match_validated():
+    raw = _raw("laps")
+    decoded = decode_laps(raw)
+    expected = [_validated_lap(lap) for lap in json.loads(raw)]
+    assert len(decoded) == 2
+    for got, want in zip(decoded, expected):
+        _assert_same_model(got, want)
+    assert decoded[1].average_cadence == 176.0
+
+
+def test_stream_channels():
+    raw = _raw("streams")
+    stream = decode_stream(raw)
+    src = json.loads(raw)
+    for field, key, scale in [("time", "time", 1), ("distance", "distance", 1),
+                              ("velocity", "velocity_smooth", 1), ("heartrate", "heartrate", 1),
+                              ("altitude", "altitude", 1), ("cadence", "cadence", 2)]:
+        arr = getattr(stream, field)
+        assert arr.dtype == np.float64
+        np.testing.assert_array_equal(arr, np.asarray(src[key]["data"], dtype=np.float64) * scale)
+
+
+def test_stream_missing_channels():
+    stream = decode_stream(b'{"time":{"data":[0,1,2]},"distance":{"data":[0.0,3.1,6.2]}}')
+    assert stream.heartrate is None and stream.cadence is None and stream.velocity is None
+    np.testing.assert_array_equal(stream.distance, [0.0, 3.1, 6.2])
+
+
+@pytest.mark.parametrize("raw", [
+    b'[{"id": 1, "elapsed_time": "long", "sport_type": "Run", "start_date_local": "2024-05-01T07:00:00Z"}]',
+    b'[{"id": 1, "elapsed_time": 600, "sport_type": "Run"}]',  # 시작 시각 없음
+    b'[{"id": 1, "elapsed_time": 600, "sport_type": "Run", "start_date_local": "yesterday"}]',
+])
+def test_invalid_activity_rejected(raw):
+    # model_construct 는 검증 안함 -> 디코더가 타입/필수 필드 검사
+    with pytest.raises(Exception):
+        decode_activities(raw)
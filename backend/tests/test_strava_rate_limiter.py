@@ -0,0 +1,212 @@
+"""스트라바 호출 스케줄러 (StravaRateLimiter)
+
+시계는 가짜 (time.monotonic / time.time 고정, 직접 진행), 응답은 httpx.MockTransport
+"""
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from infra import strava_rate_limiter as module
+from infra.strava_rate_limiter import StravaRateLimiter, INTERACTIVE, BACKGROUND, DAY, SHORT_WINDOW
+
+
+class FakeClock:
+    def __init__(self, wall:float):
+        self.mono = 1000.0
+        self.wall = wall
+
+    def advance(self, seconds:float) -> None:
+        self.mono += seconds
+        self.wall += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock(wall=DAY * 100 + 60)  # 자정 1분 뒤 (UTC)
+    monkeypatch.setattr(module, "time", SimpleNamespace(monotonic=lambda: clock.mono,
+                                                        time=lambda: clock.wall))
+    return clock
+
+
+@pytest.fixture
+def jitter(monkeypatch):
+    """random.uniform 인자 기록, 정해진 값 순서대로 반환"""
+    calls, values = [], []
+
+    def uniform(low, high):
+        calls.append((low, high))
+        return values.pop(0)
+
+    monkeypatch.setattr(module, "random", SimpleNamespace(uniform=uniform))
+    return SimpleNamespace(calls=calls, values=values)
+
+
+def _client(responses:list, seen:list) -> httpx.AsyncClient:
+    def handler(request:httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return responses.pop(0)
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def _until(cond, timeout:float = 2.0):
+    for _ in range(int(timeout / 0.005)):
+        if cond():
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError("timeout")
+
+
+def test_headers_update_buckets(run, clock):
+    limiter = StravaRateLimiter(short_limit=100, daily_limit=1000)
+    headers = {"X-RateLimit-Limit": "200,2000", "X-RateLimit-Usage": "195,10"}
+
+    async def call():
+        async with _client([httpx.Response(200, headers=headers)], []) as client:
+            return await limiter.request(client, "GET", "https://strava.test/a", user_key="u")
+
+    assert run(call()).status_code == 200
+    assert (limiter.short_limit, limiter.daily_limit) == (200, 2000)
+    assert limiter.tokens == 5  # 다른 프로세스 사용량까지 반영
+    assert limiter._blocked_until == 0
+
+
+@pytest.mark.parametrize("usage, wait", [
+    ("200,10", SHORT_WINDOW - 60),  # 15분 한도 -> 다음 15분 구간
+    ("10,2000", DAY - 60),          # 일 한도 -> 다음날 0시
+])
+def test_headers_block_until_next_window(clock, usage, wait):
+    limiter = StravaRateLimiter(short_limit=200, daily_limit=2000)
+    limiter._update_from_headers(httpx.Headers({"X-RateLimit-Limit": "200,2000",
+                                                "X-RateLimit-Usage": usage}))
+    assert limiter._blocked_until == pytest.approx(clock.mono + wait)
+
+
+@pytest.mark.parametrize("headers", [
+    {},
+    {"X-RateLimit-Limit": "200,2000"},
+    {"X-RateLimit-Limit": "abc", "X-RateLimit-Usage": "1,2"},
+])
+def test_missing_or_malformed_headers_ignored(clock, headers):
+    limiter = StravaRateLimiter(short_limit=100, daily_limit=1000)
+    limiter._update_from_headers(httpx.Headers(headers))
+    assert (limiter.short_limit, limiter.daily_limit, limiter.tokens) == (100, 1000, 100)
+
+
+def test_429_backoff_with_jitter_then_success(run, clock, jitter):
+    limiter = StravaRateLimiter(short_limit=100, daily_limit=1000,
+                                max_retries=3, backoff_base=0.01, backoff_max=0.03)
+    jitter.values.extend([0.5, 1.5, 1.0])
+    responses = [httpx.Response(429), httpx.Response(429), httpx.Response(429), httpx.Response(200)]
+    seen, delays = [], []
+
+    async def scenario():
+        async with _client(responses, seen) as client:
+            task = asyncio.create_task(
+                limiter.request(client, "GET", "https://strava.test/a", user_key="u"))
+            for attempt in range(3):
+                await _until(lambda: len(seen) == attempt + 1 and limiter._blocked_until > clock.mono)
+                delays.append(limiter._blocked_until - clock.mono)
+                clock.advance(delays[-1])  # 대기 시간 지나야 다시 호출
+            return await task
+
+    response = run(scenario())
+    assert response.status_code == 200
+    assert len(seen) == 4
+    assert jitter.calls == [(0.5, 1.5)] * 3
+    # base * 2^attempt (최대 backoff_max) * jitter
+    assert delays == pytest.approx([0.01 * 0.5, 0.02 * 1.5, 0.03 * 1.0])
+
+
+def test_429_gives_up_after_max_retries(run, clock, jitter):
+    limiter = StravaRateLimiter(short_limit=100, daily_limit=1000,
+                                max_retries=1, backoff_base=0.01)
+    jitter.values.append(1.0)
+    seen = []
+
+    async def scenario():
+        async with _client([httpx.Response(429), httpx.Response(429)], seen) as client:
+            task = asyncio.create_task(
+                limiter.request(client, "GET", "https://strava.test/a", user_key="u"))
+            await _until(lambda: len(seen) == 1 and limiter._blocked_until > clock.mono)
+            clock.advance(1)
+            return await task
+
+    assert run(scenario()).status_code == 429
+    assert len(seen) == 2
+
+
+def _enqueue(limiter, requests:list, granted:list) -> list:
+    """토큰 없는 상태에서 (user_key, priority) 순서대로 대기열에 넣기"""
+    tasks = []
+    for user_key, priority in requests:
+        task = asyncio.create_task(limiter._acquire(user_key=user_key, priority=priority))
+        task.add_done_callback(lambda _, key=(user_key, priority): granted.append(key))
+        tasks.append(task)
+    return tasks
+
+
+def _grant(limiter, count:int) -> None:
+    limiter.tokens = count
+    limiter._dispatch()
+
+
+def test_interactive_before_background(run, clock):
+    limiter = StravaRateLimiter(short_limit=100, daily_limit=1000)
+    limiter.tokens = 0
+    granted = []
+
+    async def scenario():
+        tasks = _enqueue(limiter, [("sync", BACKGROUND), ("sync", BACKGROUND),
+                                   ("alice", INTERACTIVE)], granted)
+        await asyncio.sleep(0)
+        _grant(limiter, 1)
+        await _until(lambda: len(granted) == 1)
+        # 나중에 들어온 사용자 요청도 먼저
+        assert granted == [("alice", INTERACTIVE)]
+
+        _enqueue(limiter, [("bob", INTERACTIVE)], granted)
+        await asyncio.sleep(0)
+        _grant(limiter, 3)
+        await asyncio.gather(*tasks)
+
+    run(scenario())
+    assert granted == [("alice", INTERACTIVE), ("bob", INTERACTIVE),
+                       ("sync", BACKGROUND), ("sync", BACKGROUND)]
+
+
+def test_round_robin_between_users(run, clock):
+    limiter = StravaRateLimiter(short_limit=100, daily_limit=1000)
+    limiter.tokens = 0
+    granted = []
+
+    async def scenario():
+        # a 가 먼저 4개를 쌓아도 b, c 가 번갈아 차례를 받음
+        tasks = _enqueue(limiter, [("a", BACKGROUND)] * 4 + [("b", BACKGROUND)] * 2
+                         + [("c", BACKGROUND)], granted)
+        await asyncio.sleep(0)
+        _grant(limiter, 7)
+        await asyncio.gather(*tasks)
+
+    run(scenario())
+    assert [key for key, _ in granted] == ["a", "b", "c", "a", "b", "a", "a"]
+
+
+def test_cancelled_waiter_skipped(run, clock):
+    limiter = StravaRateLimiter(short_limit=100, daily_limit=1000)
+    limiter.tokens = 0
+    granted = []
+
+    async def scenario():
+        tasks = _enqueue(limiter, [("a", INTERACTIVE), ("b", INTERACTIVE)], granted)
+        await asyncio.sleep(0)
+        tasks[0].cancel()
+        await asyncio.gather(tasks[0], return_exceptions=True)
+        granted.clear()
+        _grant(limiter, 1)
+        await tasks[1]
+
+    run(scenario())
+    assert granted == [("b", INTERACTIVE)]
+    assert limiter.tokens == 0  # 취소된 요청은 토큰을 쓰지 않음
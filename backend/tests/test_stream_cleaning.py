@@ -0,0 +1,159 @@
+"""스트림 정리 (clean_stream / resample_stream) 와 자동 구간 나누기 (segment_laps)"""
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from domains.segmentation import segment_laps
+from domains.stream_cleaning import clean_stream
+from domains.training_load import session_load
+from schemas.models import ActivityData, StreamArrays
+
+
+def _stream(n:int = 60, hr:float = 150.0, v:float = 3.0) -> StreamArrays:
+    t = np.arange(n, dtype=np.float64)
+    return StreamArrays(time=t, velocity=np.full(n, v), distance=t * v, heartrate=np.full(n, hr))
+
+
+def test_none_and_empty_stream():
+    assert clean_stream(None)[0] is None
+    stream, report = clean_stream(StreamArrays())
+    assert report.points_in == 0 and report.dropped == 0
+
+
+def test_duplicate_and_backward_samples_removed():
+    stream = _stream(6)
+    stream.time = np.array([0.0, 1.0, 1.0, 2.0, 1.5, 3.0])
+    out, report = clean_stream(stream, resample=None)
+    assert report.duplicates == 2
+    np.testing.assert_array_equal(out.time, [0, 1, 2, 3])
+    assert len(out.heartrate) == len(out.velocity) == 4
+    assert (report.points_in, report.points_out) == (6, 4)
+
+
+def test_channels_trimmed_to_shortest():
+    stream = _stream(10)
+    stream.heartrate = stream.heartrate[:8]
+    out, report = clean_stream(stream, resample=None)
+    assert report.points_in == 10 and report.points_out == 8
+    assert len(out.time) == len(out.velocity) == 8
+
+
+def test_hr_dropouts_and_nan_interpolated():
+    stream = _stream()
+    stream.heartrate[[10, 20, 30, 31]] = [0.0, 255.0, np.nan, np.nan]
+    out, report = clean_stream(stream, resample=None)
+    assert report.hr_dropouts == 4
+    assert np.isfinite(out.heartrate).all()
+    np.testing.assert_allclose(out.heartrate, 150.0)
+
+
+def test_hr_spike_interpolated():
+    stream = _stream()
+    stream.heartrate[25] = 190.0
+    out, report = clean_stream(stream, resample=None)
+    assert (report.hr_dropouts, report.hr_spikes) == (0, 1)
+    assert out.heartrate[25] == 150.0
+    assert report.dropped == 1
+
+
+def test_all_missing_hr_dropped():
+    stream = _stream()
+    stream.heartrate[:] = np.nan
+    out, _ = clean_stream(stream, resample=None)
+    assert out.heartrate is None
+
+
+def test_velocity_gaps_and_spikes_interpolated():
+    stream = _stream()
+    stream.velocity[[5, 15, 40]] = [np.nan, 20.0, 8.0]
+    out, report = clean_stream(stream, resample=None)
+    assert report.velocity_spikes == 3
+    np.testing.assert_allclose(out.velocity, 3.0)
+
+
+def test_pauses_zeroed():
+    stream = _stream()
+    stream.distance[20:30] = stream.distance[20]  # 멈춤 (거리 그대로)
+    stream.velocity[20:30] = 0.8  # velocity_smooth 가 늦게 떨어짐
+    stream.velocity[45] = 0.1  # 아주 느림
+    out, report = clean_stream(stream, resample=None)
+    # 20 번째는 거리가 아직 늘어난 샘플
+    assert report.paused == 10
+    assert (out.velocity[21:30] == 0).all() and out.velocity[45] == 0
+    assert out.velocity[20] > 0
+
+
+def test_nan_hr_does_not_poison_session_load():
+    stream = _stream()
+    stream.heartrate[10:15] = np.nan
+    activity = ActivityData(activity_id=1, elapsed_time=60, sport_type="Run",
+                            start_date=datetime(2024, 5, 1))
+    cleaned, _ = clean_stream(stream, resample=None)
+    load = session_load(activity, cleaned, max_hr=190)
+    assert load == session_load(activity, _stream(), max_hr=190)
+    # 정리 안 한 스트림도 nan 이 아닌 값
+    assert np.isfinite(session_load(activity, stream, max_hr=190))
+
+
+def test_resample_by_time_keeps_pause_gaps():
+    time = np.concatenate([np.arange(0, 20, 2.0), np.arange(100, 110, 2.0)])  # 2초 간격, 중간 80초 정지
+    stream = StreamArrays(time=time, distance=time * 3.0, velocity=np.full(len(time), 3.0),
+                          heartrate=np.full(len(time), 150.0))
+    out, report = clean_stream(stream, resample="time")
+    np.testing.assert_array_equal(out.time, np.concatenate([np.arange(0, 19), np.arange(100, 109)]))
+    np.testing.assert_allclose(out.distance, out.time * 3.0)
+    assert report.points_out == len(out.time)
+    assert report.dropped == 0  # 늘어난 점은 제거가 아님
+
+
+def test_resample_by_distance():
+    stream = _stream(40)  # 3m 간격
+    out, _ = clean_stream(stream, resample="distance")
+    np.testing.assert_allclose(out.distance, np.arange(0, 117 + 1e-9, 5.0))
+    np.testing.assert_allclose(out.time, out.distance / 3.0)
+
+
+def _intervals(reps:int, fast:float = 5.0, slow:float = 2.5, seconds:int = 120) -> StreamArrays:
+    v = np.concatenate([np.full(seconds, speed) for _ in range(reps) for speed in (fast, slow)])
+    t = np.arange(len(v), dtype=np.float64)
+    return StreamArrays(time=t, velocity=v, distance=np.cumsum(v) - v[0],
+                        heartrate=np.where(v > 4, 170.0, 140.0))
+
+
+def test_segment_laps_splits_intervals():
+    stream = _intervals(reps=4)
+    laps = segment_laps(stream)
+    assert len(laps) == 8
+    assert [lap.lap_index for lap in laps] == list(range(1, 9))
+    for k, lap in enumerate(laps):
+        fast = k % 2 == 0
+        assert lap.average_speed == pytest.approx(5.0 if fast else 2.5, rel=0.1)
+        assert lap.elapsed_time == pytest.approx(120, abs=10)
+        assert lap.average_heartrate == pytest.approx(170 if fast else 140, abs=5)
+    # 경계 샘플 공유 -> 구간 거리 합 = 전체 거리
+    assert sum(lap.distance for lap in laps) == pytest.approx(stream.distance[-1])
+
+
+@pytest.mark.parametrize("stream", [
+    None,
+    StreamArrays(velocity=np.full(600, 3.0)),  # 거리 없음
+    _intervals(reps=4, seconds=10),  # 너무 짧음
+    _stream(1200),  # 일정한 속도
+    StreamArrays(time=np.arange(600.0), velocity=np.r_[np.full(300, 5.0), np.full(300, 2.5)],
+                 distance=np.cumsum(np.r_[np.full(300, 5.0), np.full(300, 2.5)])),  # 구간 2개
+    _intervals(reps=1),  # 빠름, 느림 -> 구간 2개
+])
+def test_segment_laps_without_structure(stream):
+    assert segment_laps(stream) == []
+
+
+def test_segment_laps_three_segments_is_not_enough():
+    # 느림 -> 빠름 -> 느림
+    v = np.r_[np.full(200, 2.5), np.full(200, 5.0), np.full(200, 2.5)]
+    stream = StreamArrays(time=np.arange(600.0), velocity=v, distance=np.cumsum(v))
+    assert segment_laps(stream) == []
+    # 하나 더 있으면 구간 4개
+    v = np.r_[v, np.full(200, 5.0)]
+    stream = StreamArrays(time=np.arange(800.0), velocity=v, distance=np.cumsum(v))
+    assert len(segment_laps(stream)) == 4
@@ -0,0 +1,140 @@
+"""스트림 바이너리 포맷 (infra.stream_codec) 과 json -> 바이너리 변환"""
+import numpy as np
+import pytest
+from sqlmodel import select
+
+from adapters import TrainingAdapter
+from infra.db.orm.models import TrainSessionStream
+from infra.db.storage import activity_repo as repo
+from infra.stream_codec import encode_stream, decode_stream, HAS_MASK, _HEADER, _ENTRY
+from schemas.models import StreamArrays
+from use_cases.train_session.migrate_streams import migrate_streams
+
+
+def _entries(raw:bytes) -> list:
+    _, _, _, count, _ = _HEADER.unpack_from(raw, 0)
+    return [_ENTRY.unpack_from(raw, _HEADER.size + i * _ENTRY.size) for i in range(count)]
+
+
+def _version(raw:bytes) -> int:
+    return _HEADER.unpack_from(raw, 0)[1]
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_round_trip_all_channels(compress):
+    n = 500
+    t = np.arange(n, dtype=np.float64)
+    stream = StreamArrays(heartrate=140 + 10 * np.sin(t / 30),
+                          cadence=np.full(n, 172.5),
+                          distance=t * 3.21,
+                          velocity=np.full(n, 3.21),
+                          altitude=50 + np.cos(t / 50),
+                          time=t)
+    out = decode_stream(encode_stream(stream, compress=compress))
+    for name, scale in (("heartrate", 10), ("cadence", 10), ("distance", 10),
+                        ("velocity", 1000), ("altitude", 10), ("time", 10)):
+        np.testing.assert_allclose(getattr(out, name), getattr(stream, name), atol=0.5 / scale)
+
+
+def test_gaps_stay_nan():
+    hr = np.array([np.nan, np.nan, 150.0, 151.0, np.nan, np.nan, 149.0, np.inf, 148.0, np.nan])
+    velocity = np.full(len(hr), 3.0)
+    raw = encode_stream(StreamArrays(heartrate=hr, velocity=velocity))
+    out = decode_stream(raw)
+
+    expected = np.where(np.isfinite(hr), hr, np.nan)
+    np.testing.assert_array_equal(np.isnan(out.heartrate), np.isnan(expected))
+    np.testing.assert_allclose(out.heartrate[~np.isnan(expected)], expected[~np.isnan(expected)])
+    # 결측 없는 채널은 마스크 없음
+    codes = {cid: code for cid, code, _ in _entries(raw)}
+    assert codes[1] & HAS_MASK and not codes[4] & HAS_MASK
+    assert _version(raw) == 2
+    np.testing.assert_array_equal(out.velocity, velocity)
+
+
+def test_all_nan_channel():
+    out = decode_stream(encode_stream(StreamArrays(heartrate=np.full(9, np.nan), time=np.arange(9.0))))
+    assert len(out.heartrate) == 9 and np.isnan(out.heartrate).all()
+
+
+def test_empty_and_missing_channels():
+    stream = StreamArrays(heartrate=np.array([]), time=np.arange(3.0))
+    raw = encode_stream(stream)
+    out = decode_stream(raw)
+    assert out.heartrate is not None and len(out.heartrate) == 0
+    assert out.cadence is None and out.altitude is None
+    np.testing.assert_array_equal(out.time, [0, 1, 2])
+    assert _version(raw) == 1  # 결측 없으면 이전 버전으로도 읽을 수 있게
+
+    empty = decode_stream(encode_stream(StreamArrays()))
+    assert all(getattr(empty, name) is None for name in ("heartrate", "cadence", "distance",
+                                                         "velocity", "altitude", "time"))
+
+
+@pytest.mark.parametrize("step, code", [
+    (5.0, 1),          # 차분 50 (결측 뒤 100) -> int8
+    (1000.0, 2),       # 차분 10000 -> int16
+    (1e6, 4),          # 차분 1e7 -> int32
+    (1e9, 8),          # 차분 1e10 -> int64
+])
+@pytest.mark.parametrize("gap", [False, True])
+def test_smallest_int_dtype(step, code, gap):
+    distance = np.arange(20, dtype=np.float64) * step
+    if gap:
+        distance[5] = np.nan
+    raw = encode_stream(StreamArrays(distance=distance))
+    (cid, stored, _), = _entries(raw)
+    assert stored & ~HAS_MASK == code
+    assert bool(stored & HAS_MASK) == gap
+
+    out = decode_stream(raw)
+    np.testing.assert_array_equal(np.isnan(out.distance), np.isnan(distance))
+    np.testing.assert_allclose(out.distance[~np.isnan(distance)], distance[~np.isnan(distance)])
+
+
+def test_channel_filter():
+    raw = encode_stream(StreamArrays(heartrate=np.array([1.0, np.nan, 3.0]), time=np.arange(3.0)))
+    out = decode_stream(raw, channels=["time"])
+    assert out.heartrate is None
+    np.testing.assert_array_equal(out.time, [0, 1, 2])
+
+
+def test_rejects_unknown_blob():
+    with pytest.raises(ValueError):
+        decode_stream(b"JUNK" + bytes(20))
+
+
+def test_gaps_returned_as_null():
+    stream = decode_stream(encode_stream(StreamArrays(heartrate=np.array([150.0, np.nan]))))
+    assert stream.to_model().heartrate == [150.0, None]
+
+
+def test_migrate_streams_converts_json_rows(run, db, make_user, make_bundle):
+    user_id = make_user()
+    run(TrainingAdapter(db=db).save_sessions(user_id=user_id,
+                                             bundles=[make_bundle(i) for i in range(1, 4)]))
+    rows = run(db.execute(select(TrainSessionStream))).scalars().all()
+    # 이전 형식 (json 컬럼) 으로 되돌리기. 심박 끊김 포함
+    legacy = {}
+    for i, row in enumerate(rows):
+        legacy[row.session_id] = {"heartrate": [150.0, None, 152.0 + i],
+                                  "distance": [0.0, 3.0, 6.0],
+                                  "velocity": [3.0, 3.0, 3.0]}
+        row.data = None
+        for name, values in legacy[row.session_id].items():
+            setattr(row, name, values)
+    run(db.commit())
+
+    assert run(migrate_streams(db=db, batch_size=2)) == 3
+    assert run(migrate_streams(db=db, batch_size=2)) == 0  # 다시 실행해도 남은 행 없음
+
+    db.expire_all()
+    rows = run(db.execute(select(TrainSessionStream))).scalars().all()
+    for row in rows:
+        assert row.data is not None
+        assert row.heartrate is None and row.distance is None and row.velocity is None
+        arrays = repo.stream_row_to_arrays(row)
+        expected = legacy[row.session_id]
+        assert arrays.to_model().heartrate == expected["heartrate"]
+        np.testing.assert_allclose(arrays.distance, expected["distance"])
+        np.testing.assert_allclose(arrays.velocity, expected["velocity"])
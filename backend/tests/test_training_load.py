@@ -0,0 +1,110 @@
+"""일별 부하 증분 갱신 (save_sessions -> _update_load_series)
+
+과거 세션을 나중에 넣어도 영향받는 날부터 다시 계산 -> 전체 재계산과 같아야 함
+"""
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from adapters import TrainingAdapter
+from domains.training_load import load_series
+from infra.db.storage import train_load_repo
+
+
+def _bundle(make_bundle, activity_id:int, day:date, load:float):
+    bundle = make_bundle(activity_id)
+    bundle.activity.start_date = datetime.combine(day, datetime.min.time()) + timedelta(hours=7)
+    bundle.activity.training_load = load
+    return bundle
+
+
+def _stored(run, db, user_id):
+    rows = run(train_load_repo.get_load_series(db=db, user_id=user_id,
+                                               start_day=date(2000, 1, 1), end_day=date(2100, 1, 1)))
+    return [(row.day, row.load, row.atl, row.ctl, row.tsb) for row in rows]
+
+
+def _full(sessions:dict):
+    """전체 재계산 (첫 훈련일부터 0 에서 시작)"""
+    daily = {}
+    for day, load in sessions.values():
+        daily[day] = daily.get(day, 0.0) + load
+    series = load_series(start=min(daily), end=max(daily), daily_loads=daily)
+    return [(row.day, row.load, row.atl, row.ctl, row.tsb) for row in series]
+
+
+def _assert_same(stored, full):
+    assert [row[0] for row in stored] == [row[0] for row in full]
+    for got, expected in zip(stored, full):
+        assert got[1:] == pytest.approx(expected[1:], abs=1e-9)
+
+
+def test_older_session_recomputes_from_its_day(run, db, make_user, make_bundle):
+    user_id = make_user()
+    adapter = TrainingAdapter(db=db)
+    day0 = date(2024, 5, 10)
+    sessions = {1: (day0, 80.0), 2: (day0 + timedelta(days=3), 120.0), 3: (day0 + timedelta(days=7), 60.0)}
+    run(adapter.save_sessions(user_id=user_id,
+                              bundles=[_bundle(make_bundle, i, d, l) for i, (d, l) in sessions.items()]))
+    _assert_same(_stored(run, db, user_id), _full(sessions))
+    before = {row[0]: row for row in _stored(run, db, user_id)}
+
+    # 사이에 낀 과거 세션 -> 그날부터 끝까지 바뀜, 이전 날은 그대로
+    sessions[4] = (day0 + timedelta(days=1), 150.0)
+    run(adapter.save_sessions(user_id=user_id, bundles=[_bundle(make_bundle, 4, *sessions[4])]))
+    after = _stored(run, db, user_id)
+    _assert_same(after, _full(sessions))
+    assert after[0] == before[day0]
+    assert all(row[2] != before[row[0]][2] for row in after if row[0] >= sessions[4][0])
+
+    # 같은 날 세션 추가 -> 하루 부하 합
+    sessions[5] = (day0 + timedelta(days=3), 30.0)
+    run(adapter.save_sessions(user_id=user_id, bundles=[_bundle(make_bundle, 5, *sessions[5])]))
+    _assert_same(_stored(run, db, user_id), _full(sessions))
+
+    # 첫 훈련일보다 이른 세션 -> 처음부터 다시
+    sessions[6] = (day0 - timedelta(days=20), 90.0)
+    run(adapter.save_sessions(user_id=user_id, bundles=[_bundle(make_bundle, 6, *sessions[6])]))
+    stored = _stored(run, db, user_id)
+    _assert_same(stored, _full(sessions))
+    assert stored[0][0] == sessions[6][0]
+
+
+def test_batch_with_mixed_days_and_duplicates(run, db, make_user, make_bundle):
+    user_id = make_user()
+    adapter = TrainingAdapter(db=db)
+    day0 = date(2024, 6, 1)
+    sessions = {1: (day0 + timedelta(days=5), 100.0), 2: (day0 + timedelta(days=9), 40.0)}
+    run(adapter.save_sessions(user_id=user_id,
+                              bundles=[_bundle(make_bundle, i, d, l) for i, (d, l) in sessions.items()]))
+
+    # 한 배치에 더 새로운 날, 과거 날, 이미 저장된 활동이 섞임 -> 가장 이른 새 세션 날부터 한번
+    sessions[3] = (day0 + timedelta(days=12), 70.0)
+    sessions[4] = (day0 + timedelta(days=2), 55.0)
+    saved = run(adapter.save_sessions(user_id=user_id, bundles=[
+        _bundle(make_bundle, 3, *sessions[3]),
+        _bundle(make_bundle, 1, day0 + timedelta(days=5), 999.0),  # 중복 -> 무시
+        _bundle(make_bundle, 4, *sessions[4]),
+    ]))
+    assert saved == [True, False, True]
+    _assert_same(_stored(run, db, user_id), _full(sessions))
+
+
+def test_api_series_continues_decay_after_last_day(run, db, make_user, make_bundle):
+    user_id = make_user()
+    adapter = TrainingAdapter(db=db)
+    day0 = date(2024, 7, 1)
+    sessions = {1: (day0, 100.0), 2: (day0 + timedelta(days=2), 50.0)}
+    run(adapter.save_sessions(user_id=user_id,
+                              bundles=[_bundle(make_bundle, i, d, l) for i, (d, l) in sessions.items()]))
+
+    def ts(d:date) -> int:
+        return int(datetime.combine(d, datetime.min.time(), tzinfo=timezone.utc).timestamp())
+
+    end = day0 + timedelta(days=10)
+    series = run(adapter.get_load_series(user_id=user_id, start_date=ts(day0), end_date=ts(end)))
+    daily = {d: l for d, l in sessions.values()}
+    expected = load_series(start=day0, end=end - timedelta(days=1), daily_loads=daily)
+    assert [row.day for row in series] == [row.day for row in expected]
+    for got, row in zip(series, expected):
+        assert (got.atl, got.ctl, got.tsb) == pytest.approx((row.atl, row.ctl, row.tsb))